@@ -0,0 +1,90 @@
+"""bench_import module.
+
+Cold-start benchmark of the :mod:`xpylib` facade: every target is imported
+in a fresh interpreter run with ``-X importtime``, and the cumulative time
+of the modules it loads, the interpreter startup excluded, is reported.
+
+Run from the root project's directory::
+
+    PYTHONPATH=src python benchmarks/bench_import.py
+
+The budgets enforced by the tests are in ``tests/test_xpylib.py``.
+"""
+
+import statistics
+import subprocess
+import sys
+
+TARGETS = {
+    "xpylib": "import xpylib",
+    "xpylib.FsMgr": "import xpylib; xpylib.FsMgr",
+    "xpylib.JsonMgr": "import xpylib; xpylib.JsonMgr",
+    "xpylib.ConfMgr": "import xpylib; xpylib.ConfMgr",
+    "xpylib.runc": "import xpylib; xpylib.runc",
+    "xpylib.measure": "import xpylib; xpylib.measure",
+}
+
+
+def import_times(_code: str) -> dict[str, int]:
+    """
+    Run ``_code`` in a fresh interpreter and return its top-level imports.
+
+    :param _code: Python statements.
+    :type _code: str
+    :return: Cumulative import time in microseconds of every module
+             imported at the top level, by name.
+    :rtype: dict[str, int]
+    :raises subprocess.CalledProcessError: If ``_code`` fails.
+    """
+    l_proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    l_times = {}
+    for iline in l_proc.stderr.splitlines():
+        if not iline.startswith("import time:"):
+            continue
+        _, l_cumulative, l_name = iline[len("import time:") :].split("|")
+        # Nested imports are indented, and already in their parent's time.
+        if l_cumulative.strip().isdigit() and not l_name.startswith("  "):
+            l_times[l_name.strip()] = int(l_cumulative)
+    return l_times
+
+
+def cold_start(_code: str, _repeat: int = 5) -> list[int]:
+    """
+    Return the import times of ``_code``, startup excluded, in microseconds.
+
+    :param _code: Python statements.
+    :type _code: str
+    :param _repeat: Number of interpreter runs.
+    :type _repeat: int
+    :return: One total per run.
+    :rtype: list[int]
+    """
+    l_startup = set(import_times("pass"))
+    return [
+        sum(
+            itime
+            for iname, itime in import_times(_code).items()
+            if iname not in l_startup
+        )
+        for _ in range(_repeat)
+    ]
+
+
+def main(_repeat: int = 5) -> None:
+    """Run the benchmark."""
+    print(f"{'target':<18} {'min':>10} {'median':>10}")
+    for iname, icode in TARGETS.items():
+        l_times = cold_start(icode, _repeat)
+        print(
+            f"{iname:<18} {min(l_times) / 1e3:>7.2f} ms "
+            f"{statistics.median(l_times) / 1e3:>7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
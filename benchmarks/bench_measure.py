@@ -0,0 +1,45 @@
+"""bench_measure module.
+
+Micro-benchmark of the per-call overhead of :func:`metric.observer.measure`.
+
+Run from the root project's directory::
+
+    PYTHONPATH=src python benchmarks/bench_measure.py
+"""
+
+import timeit
+
+from metric.observer import measure
+from metric.registry import Registry
+
+BUDGET_NS = 1000
+
+
+def noop() -> None:
+    """Do nothing."""
+
+
+def per_call_ns(_func: callable, _number: int) -> float:
+    """Return the best per-call duration of ``_func`` in nanoseconds."""
+    l_best = min(timeit.repeat(_func, number=_number, repeat=7))
+    return l_best / _number * 1e9
+
+
+def main(_number: int = 200000) -> int:
+    """Run the benchmark, return ``1`` if the overhead exceeds the budget."""
+    l_measured = measure(noop, _registry=Registry())
+    l_sampled = measure(noop, _registry=Registry(), _sample=100)
+
+    l_base = per_call_ns(noop, _number)
+    l_wrapped = per_call_ns(l_measured, _number)
+    l_overhead = l_wrapped - l_base
+
+    print(f"plain call          {l_base:>8.1f} ns")
+    print(f"measured call       {l_wrapped:>8.1f} ns")
+    print(f"sampled call 1/100  {per_call_ns(l_sampled, _number):>8.1f} ns")
+    print(f"measure overhead    {l_overhead:>8.1f} ns (budget {BUDGET_NS} ns)")
+    return int(l_overhead > BUDGET_NS)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
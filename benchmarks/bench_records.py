@@ -0,0 +1,82 @@
+"""bench_records module.
+
+Memory and attribute-access benchmark of the compact record decoding of
+:class:`typehdr.recordhdr.RecordHdr`, against plain ``dict`` objects.
+
+Run from the root project's directory::
+
+    PYTHONPATH=src python benchmarks/bench_records.py
+"""
+
+import gc
+import json
+import timeit
+import tracemalloc
+
+from typehdr.recordhdr import NAMEDTUPLE, SLOTS, RecordHdr
+
+FIELDS = ("id", "name", "value", "enabled", "port")
+
+
+def make_doc(_count: int) -> str:
+    """Return a JSON array of ``_count`` same-shaped objects."""
+    return json.dumps(
+        [
+            {
+                "id": iindex,
+                "name": f"host-{iindex:06d}",
+                "value": iindex * 0.25,
+                "enabled": iindex % 2 == 0,
+                "port": 1024 + iindex % 1000,
+            }
+            for iindex in range(_count)
+        ]
+    )
+
+
+def memory(_func: callable) -> tuple[object, int, int]:
+    """Return the result of ``_func``, its retained and peak bytes."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        l_result = _func()
+        l_current, l_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return l_result, l_current, l_peak
+
+
+def main(_count: int = 200000) -> None:
+    """Run the benchmark."""
+    l_doc = make_doc(_count)
+    l_layouts = {
+        "dict": lambda: json.loads(l_doc),
+        "slots": lambda: RecordHdr.loads(l_doc, FIELDS, SLOTS),
+        "namedtuple": lambda: RecordHdr.loads(l_doc, FIELDS, NAMEDTUPLE),
+        "columns": lambda: RecordHdr.to_columns(
+            RecordHdr.loads(l_doc, FIELDS, NAMEDTUPLE)
+        ),
+    }
+    l_sums = {
+        "dict": lambda d: sum(i["value"] for i in d),
+        "slots": lambda d: sum(i.value for i in d),
+        "namedtuple": lambda d: sum(i.value for i in d),
+        "columns": lambda d: sum(d["value"]),
+    }
+
+    print(f"{_count} records, {len(l_doc) / 2**20:.1f} MiB of JSON")
+    print(f"{'layout':<12} {'retained':>10} {'peak':>10} {'sum(value)':>12}")
+    for iname, iload in l_layouts.items():
+        l_data, l_retained, l_peak = memory(iload)
+        l_time = min(
+            timeit.repeat(lambda: l_sums[iname](l_data), number=1, repeat=5)
+        )
+        print(
+            f"{iname:<12} {l_retained / 2**20:>7.1f} MiB "
+            f"{l_peak / 2**20:>6.1f} MiB {l_time * 1e3:>9.2f} ms"
+        )
+        del l_data
+
+
+if __name__ == "__main__":
+    main()
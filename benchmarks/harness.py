@@ -0,0 +1,227 @@
+"""harness module.
+
+Timing, baseline storage and regression detection for the benchmark suite,
+see ``suite.py``.
+"""
+
+import math
+import platform
+import statistics
+import sys
+import time
+
+from fio.jsonmgr import JsonMgr
+
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_ALPHA = 0.01
+
+
+def sample(
+    _func: callable, _repeat: int = 10, _min_time: float = 0.05
+) -> list[float]:
+    """
+    Time ``_func`` and return ``_repeat`` per-call durations in seconds.
+
+    The number of calls per sample is raised until a sample lasts at least
+    ``_min_time`` seconds, so short functions are not dominated by the
+    resolution of the clock. The calibration samples are discarded.
+
+    :param _func: Callable without arguments.
+    :type _func: Callable
+    :param _repeat: Number of samples.
+    :type _repeat: int
+    :param _min_time: Minimum duration of a sample in seconds.
+    :type _min_time: float
+    :return: Mean duration of a call in every sample.
+    :rtype: list[float]
+    """
+    l_number = 1
+    while _time(_func, l_number) < _min_time:
+        l_number *= 2
+
+    return [_time(_func, l_number) / l_number for _ in range(_repeat)]
+
+
+def _time(_func: callable, _number: int) -> float:
+    """Return the duration of ``_number`` calls of ``_func``."""
+    l_start = time.perf_counter()
+    for _ in range(_number):
+        _func()
+    return time.perf_counter() - l_start
+
+
+def mann_whitney(_a: list[float], _b: list[float]) -> float:
+    """
+    Return the one-sided p-value that ``_b`` tends to exceed ``_a``.
+
+    Mann-Whitney U test with the normal approximation, corrected for ties
+    and continuity. Being rank-based, it is not thrown off by the outliers
+    that scheduling noise adds to timings.
+
+    :param _a: Baseline samples.
+    :type _a: list[float]
+    :param _b: New samples.
+    :type _b: list[float]
+    :return: Probability of the observed ranks if ``_b`` is not slower.
+    :rtype: float
+    """
+    l_n1 = len(_a)
+    l_n2 = len(_b)
+    if not l_n1 or not l_n2:
+        return 1.0
+
+    l_values = sorted(
+        [(ivalue, 0) for ivalue in _a] + [(ivalue, 1) for ivalue in _b]
+    )
+    l_ranks = [0.0] * len(l_values)
+    l_ties = 0.0
+    l_start = 0
+    while l_start < len(l_values):
+        l_end = l_start
+        while (
+            l_end + 1 < len(l_values)
+            and l_values[l_end + 1][0] == l_values[l_start][0]
+        ):
+            l_end += 1
+        l_count = l_end - l_start + 1
+        l_ties += l_count**3 - l_count
+        for iindex in range(l_start, l_end + 1):
+            l_ranks[iindex] = (l_start + l_end) / 2 + 1
+        l_start = l_end + 1
+
+    l_rank_b = sum(
+        irank for irank, (_, igroup) in zip(l_ranks, l_values) if igroup
+    )
+    l_u = l_rank_b - l_n2 * (l_n2 + 1) / 2
+    l_n = l_n1 + l_n2
+    l_var = l_n1 * l_n2 / 12 * ((l_n + 1) - l_ties / (l_n * (l_n - 1)))
+    if l_var <= 0:
+        return 1.0
+
+    l_z = (l_u - l_n1 * l_n2 / 2 - 0.5) / math.sqrt(l_var)
+    return 1 - statistics.NormalDist().cdf(l_z)
+
+
+def compare(
+    _baseline: dict,
+    _current: dict,
+    _threshold: float = DEFAULT_THRESHOLD,
+    _alpha: float = DEFAULT_ALPHA,
+) -> list[dict]:
+    """
+    Compare two runs, benchmark by benchmark.
+
+    A benchmark regresses when its median is more than ``_threshold``
+    slower than the baseline one and the slowdown is significant at level
+    ``_alpha``, see :func:`mann_whitney`. It improves in the symmetric case.
+
+    :param _baseline: Baseline run, see :func:`save`.
+    :type _baseline: dict
+    :param _current: New run.
+    :type _current: dict
+    :param _threshold: Relative slowdown tolerated, e.g. ``0.10``.
+    :type _threshold: float
+    :param _alpha: Significance level.
+    :type _alpha: float
+    :return: One row per benchmark present in both runs, with the ``name``,
+             ``base`` and ``current`` medians, the ``ratio``, the ``p``
+             value and the ``status``: ``regression``, ``improvement`` or
+             ``same``.
+    :rtype: list[dict]
+    """
+    l_rows = []
+    for iname, icurrent in _current["results"].items():
+        l_base = _baseline["results"].get(iname)
+        if l_base is None:
+            continue
+
+        l_ratio = icurrent["median"] / l_base["median"]
+        l_slower = mann_whitney(l_base["samples"], icurrent["samples"])
+        l_faster = mann_whitney(icurrent["samples"], l_base["samples"])
+        if l_ratio > 1 + _threshold and l_slower < _alpha:
+            l_status, l_p = "regression", l_slower
+        elif l_ratio < 1 - _threshold and l_faster < _alpha:
+            l_status, l_p = "improvement", l_faster
+        else:
+            l_status, l_p = "same", min(l_slower, l_faster)
+
+        l_rows.append(
+            {
+                "name": iname,
+                "base": l_base["median"],
+                "current": icurrent["median"],
+                "ratio": l_ratio,
+                "p": l_p,
+                "status": l_status,
+            }
+        )
+    return l_rows
+
+
+def new_run(_profile: str) -> dict:
+    """
+    Return an empty run, describing the machine it is recorded on.
+
+    :param _profile: Name of the workload profile.
+    :type _profile: str
+    :return: Run with ``meta`` and empty ``results``.
+    :rtype: dict
+    """
+    return {
+        "meta": {
+            "profile": _profile,
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": {},
+    }
+
+
+def add_result(_run: dict, _name: str, _samples: list[float]) -> dict:
+    """
+    Store the samples of a benchmark into a run.
+
+    :param _run: Run being recorded.
+    :type _run: dict
+    :param _name: Name of the benchmark.
+    :type _name: str
+    :param _samples: Per-call durations in seconds.
+    :type _samples: list[float]
+    :return: The stored result, with its ``median``, ``min`` and ``stdev``.
+    :rtype: dict
+    """
+    l_result = _run["results"][_name] = {
+        "median": statistics.median(_samples),
+        "min": min(_samples),
+        "stdev": statistics.stdev(_samples) if len(_samples) > 1 else 0.0,
+        "samples": _samples,
+    }
+    return l_result
+
+
+def save(_filepath: str, _run: dict) -> None:
+    """
+    Write a run to a baseline file.
+
+    :param _filepath: Path of the baseline JSON file.
+    :type _filepath: str
+    :param _run: Run to write.
+    :type _run: dict
+    """
+    JsonMgr(_filepath).write(_run)
+
+
+def load(_filepath: str) -> dict:
+    """
+    Read a run from a baseline file.
+
+    :param _filepath: Path of the baseline JSON file.
+    :type _filepath: str
+    :return: The stored run.
+    :rtype: dict
+    :raises FileNotFoundError: If the file does not exist.
+    """
+    return JsonMgr(_filepath).read()
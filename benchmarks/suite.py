@@ -0,0 +1,371 @@
+"""suite module.
+
+Benchmark suite of the xpylib hot paths, with a regression gate.
+
+The synthetic workloads are generated deterministically into a work
+directory and reused by later runs:
+
+- directory trees searched by ``FsMgr``
+- JSON documents read by ``JsonMgr`` and ``ConfMgr``
+- ``runc`` spawns
+- ``StrHdr``/``ListHdr`` tokenization
+
+Three profiles scale the workloads: ``quick`` (10k entries, up to 1 MB),
+``full`` (up to 100k entries and 100 MB) and ``huge`` (1M entries, 1 GB),
+the last one needing several GB of disk and memory.
+
+Record a baseline, then compare a later run against it from the root
+project's directory::
+
+    PYTHONPATH=src python benchmarks/suite.py --save baseline.json
+    PYTHONPATH=src python benchmarks/suite.py --compare baseline.json
+
+The comparison exits with status ``1`` when a benchmark is significantly
+slower than the baseline by more than ``--threshold``.
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import tempfile
+
+from functools import partial
+
+import harness
+
+from cli.clihdr import runc
+from config.confmgr import ConfMgr
+from fio.jsonmgr import JsonMgr
+from fs.fsmgr import FsMgr
+from typehdr.listhdr import ListHdr
+from typehdr.strhdr import StrHdr
+
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+
+PROFILES = {
+    "quick": {"trees": [10_000], "jsons": [KB, MB], "spawns": True},
+    "full": {
+        "trees": [10_000, 100_000],
+        "jsons": [KB, MB, 100 * MB],
+        "spawns": True,
+    },
+    "huge": {"trees": [1_000_000], "jsons": [GB], "spawns": False},
+}
+
+CMDS = [
+    "git rev-parse --abbrev-ref HEAD",
+    "cat '/var/lib/app/some file.json'",
+    'echo \'{"status": "ok", "count": 3}\'',
+    'ssh -o "ConnectTimeout 5" host-042 uname -a',
+    "find . -name '*.py' -newer setup.cfg -print0",
+]
+
+_FANOUT = 10
+_FILES_PER_DIR = 9
+_SEED = 42
+
+
+def make_tree(_root: str, _entries: int) -> str:
+    """
+    Generate a directory tree of about ``_entries`` files and directories.
+
+    Every directory holds :data:`_FILES_PER_DIR` files and up to
+    :data:`_FANOUT` sub-directories, breadth first. The last generated
+    directory holds a ``needle.txt`` file, so a search for it walks the
+    whole tree.
+
+    :param _root: Parent directory of the tree.
+    :type _root: str
+    :param _entries: Approximate number of entries.
+    :type _entries: int
+    :return: Path of the tree, reused if already complete.
+    :rtype: str
+    """
+    l_tree = os.path.join(_root, f"tree-{_entries}")
+    if os.path.exists(os.path.join(l_tree, ".complete")):
+        return l_tree
+    shutil.rmtree(l_tree, ignore_errors=True)
+
+    l_dirs = [l_tree]
+    l_created = 0
+    l_index = 0
+    os.makedirs(l_tree)
+    while l_created < _entries:
+        l_dir = l_dirs[l_index]
+        l_index += 1
+        for ifile in range(_FILES_PER_DIR):
+            with open(os.path.join(l_dir, f"f{ifile}.txt"), "w"):
+                pass
+        for isub in range(_FANOUT):
+            l_sub = os.path.join(l_dir, f"d{isub}")
+            os.mkdir(l_sub)
+            l_dirs.append(l_sub)
+        l_created += _FILES_PER_DIR + _FANOUT
+
+    with open(os.path.join(l_dirs[-1], "needle.txt"), "w"):
+        pass
+    with open(os.path.join(l_tree, ".complete"), "w"):
+        pass
+    return l_tree
+
+
+def make_json(_root: str, _size: int) -> str:
+    """
+    Generate a JSON document of about ``_size`` bytes.
+
+    The document is an object holding an ``items`` array of records, with
+    strings, numbers, booleans and nested lists, written in chunks so that
+    generating 1 GB does not need 1 GB of memory.
+
+    :param _root: Directory of the document.
+    :type _root: str
+    :param _size: Approximate size in bytes.
+    :type _size: int
+    :return: Path of the document, reused if already generated.
+    :rtype: str
+    """
+    l_path = os.path.join(_root, f"doc-{_size}.json")
+    if os.path.exists(l_path):
+        return l_path
+
+    l_random = random.Random(_SEED)
+    l_tmp = l_path + ".tmp"
+    with open(l_tmp, "w", encoding="utf-8") as l_file:
+        l_file.write('{"version": 1, "items": [')
+        l_written = 0
+        l_index = 0
+        while l_written < _size:
+            l_chunk = ",".join(
+                _record(l_random, l_index + ioffset)
+                for ioffset in range(1000)
+            )
+            if l_index:
+                l_chunk = "," + l_chunk
+            l_file.write(l_chunk)
+            l_written += len(l_chunk)
+            l_index += 1000
+        l_file.write("]}")
+    os.replace(l_tmp, l_path)
+    return l_path
+
+
+def _record(_random: random.Random, _index: int) -> str:
+    """Return one JSON record of the generated documents."""
+    l_enabled = "true" if _random.random() < 0.5 else "false"
+    l_tags = f'"t{_random.randrange(100)}", "t{_random.randrange(100)}"'
+    return (
+        f'{{"id": {_index}, "name": "item-{_index:08d}", '
+        f'"value": {_random.random():.6f}, "enabled": {l_enabled}, '
+        f'"tags": [{l_tags}]}}'
+    )
+
+
+def workloads(_profile: str, _workdir: str) -> list[tuple[str, callable]]:
+    """
+    Return the benchmarks of a profile.
+
+    The data of a benchmark is generated by its setup callable, so that
+    only the benchmarks selected, e.g. with ``--filter``, generate theirs.
+
+    :param _profile: Name of the profile, see :data:`PROFILES`.
+    :type _profile: str
+    :param _workdir: Directory of the generated data.
+    :type _workdir: str
+    :return: ``(name, setup)`` pairs, ``setup()`` generating the data and
+             returning the callable to time.
+    :rtype: list[tuple[str, callable]]
+    """
+    l_profile = PROFILES[_profile]
+    l_benches = []
+
+    for ientries in l_profile["trees"]:
+        l_tree = partial(make_tree, _workdir, ientries)
+        l_benches.append(
+            (
+                f"fsmgr.get_absolute_path[{ientries}]",
+                lambda t=l_tree: partial(
+                    FsMgr.get_absolute_path, "needle.txt", t()
+                ),
+            )
+        )
+        l_benches.append(
+            (
+                f"fsmgr.get_absolute_paths[{ientries}]",
+                lambda t=l_tree: partial(
+                    FsMgr.get_absolute_paths, t(), "needle.txt"
+                ),
+            )
+        )
+
+    for isize in l_profile["jsons"]:
+        l_doc = partial(make_json, _workdir, isize)
+        l_label = _size_label(isize)
+        l_benches.append(
+            (f"jsonmgr.read[{l_label}]", lambda d=l_doc: JsonMgr(d()).read)
+        )
+        l_benches.append(
+            (
+                f"confmgr.load[{l_label}]",
+                lambda d=l_doc: partial(ConfMgr.load, d()),
+            )
+        )
+
+    if l_profile["spawns"]:
+        # The commands print JSON, so the decoding of the output is timed too.
+        l_benches.append(
+            ("runc.spawn[list]", lambda: partial(runc, ["echo", "{}"]))
+        )
+        l_benches.append(
+            ("runc.spawn[str]", lambda: partial(runc, "echo '{}'"))
+        )
+
+    l_benches.append(
+        (
+            "strhdr.tokenize",
+            lambda: lambda: [
+                StrHdr.tokenize.__wrapped__(icmd) for icmd in CMDS
+            ],
+        )
+    )
+    l_benches.append(
+        (
+            "listhdr.mutate",
+            lambda: lambda: [
+                ListHdr.mutate(icmd.split(), StrHdr.detect_embedded_str)
+                for icmd in CMDS
+            ],
+        )
+    )
+    l_benches.append(("listhdr.pipeline", _pipeline))
+    l_benches.append(
+        (
+            "strhdr.classify[tokens]",
+            lambda: partial(StrHdr.classify, _tokens()),
+        )
+    )
+    l_benches.append(
+        (
+            "strhdr.classify[text]",
+            lambda: partial(StrHdr.classify, " ".join(_tokens())),
+        )
+    )
+    l_benches.append(
+        (
+            "strhdr.embedded_spans",
+            lambda: partial(StrHdr.embedded_spans, " ".join(_tokens())),
+        )
+    )
+    return l_benches
+
+
+def _tokens() -> list[str]:
+    """Return the tokens of the tokenization benchmarks."""
+    return [itoken for icmd in CMDS for itoken in icmd.split()] * 1000
+
+
+def _pipeline() -> callable:
+    """Return the benchmark of a :meth:`ListHdr.pipeline` run."""
+    l_pipeline = (
+        ListHdr.pipeline()
+        .map(str.strip)
+        .filter(None)
+        .unquote(StrHdr.detect_embedded_str)
+    )
+    return partial(l_pipeline.run, _tokens())
+
+
+def _size_label(_size: int) -> str:
+    """Return a short human-readable size, e.g. ``1MB``."""
+    for iunit, ilabel in ((GB, "GB"), (MB, "MB"), (KB, "KB")):
+        if _size >= iunit:
+            return f"{_size // iunit}{ilabel}"
+    return f"{_size}B"
+
+
+def report(_rows: list[dict]) -> None:
+    """Print the comparison rows of :func:`harness.compare`."""
+    print(f"{'benchmark':<36} {'base':>10} {'now':>10} {'ratio':>7} {'p':>8}")
+    for irow in _rows:
+        print(
+            f"{irow['name']:<36} {_duration(irow['base']):>10} "
+            f"{_duration(irow['current']):>10} {irow['ratio']:>7.3f} "
+            f"{irow['p']:>8.4f}  {irow['status']}"
+        )
+
+
+def _duration(_seconds: float) -> str:
+    """Return a duration with a readable unit."""
+    for iscale, iunit in ((1, "s"), (1e-3, "ms"), (1e-6, "us")):
+        if _seconds >= iscale:
+            return f"{_seconds / iscale:.2f}{iunit}"
+    return f"{_seconds / 1e-9:.0f}ns"
+
+
+def main(_argv: list[str] | None = None) -> int:
+    """
+    Run the suite, return ``1`` if a regression was detected.
+
+    :param _argv: Command-line arguments, ``sys.argv`` by default.
+    :type _argv: list[str], optional
+    :return: Exit status.
+    :rtype: int
+    """
+    l_parser = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    l_parser.add_argument("--profile", choices=PROFILES, default="quick")
+    l_parser.add_argument("--filter", default="", help="regex on the names")
+    l_parser.add_argument("--repeat", type=int, default=10)
+    l_parser.add_argument("--min-time", type=float, default=0.05)
+    l_parser.add_argument(
+        "--workdir",
+        default=os.path.join(tempfile.gettempdir(), "xpylib-bench"),
+    )
+    l_parser.add_argument("--save", help="write the run to this baseline")
+    l_parser.add_argument("--compare", help="baseline to compare against")
+    l_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=harness.DEFAULT_THRESHOLD,
+        help="relative slowdown tolerated, e.g. 0.10",
+    )
+    l_parser.add_argument("--alpha", type=float, default=harness.DEFAULT_ALPHA)
+    l_args = l_parser.parse_args(_argv)
+
+    os.makedirs(l_args.workdir, exist_ok=True)
+    l_filter = re.compile(l_args.filter)
+    l_run = harness.new_run(l_args.profile)
+
+    for iname, isetup in workloads(l_args.profile, l_args.workdir):
+        if not l_filter.search(iname):
+            continue
+        l_result = harness.add_result(
+            l_run,
+            iname,
+            harness.sample(isetup(), l_args.repeat, l_args.min_time),
+        )
+        print(
+            f"{iname:<36} median {_duration(l_result['median']):>10}  "
+            f"min {_duration(l_result['min']):>10}"
+        )
+
+    if l_args.save:
+        harness.save(l_args.save, l_run)
+    if not l_args.compare:
+        return 0
+
+    l_rows = harness.compare(
+        harness.load(l_args.compare),
+        l_run,
+        l_args.threshold,
+        l_args.alpha,
+    )
+    print()
+    report(l_rows)
+    return int(any(irow["status"] == "regression" for irow in l_rows))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
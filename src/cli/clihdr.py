@@ -1,17 +1,47 @@
 """clihdr module."""
 
+import io
+import json
+import os
+import selectors
+import signal
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from collections import deque
+from collections.abc import Iterator
+from functools import partial
+from typing import TYPE_CHECKING
 
 from multipledispatch import dispatch
 
-from typehdr.listhdr import ListHdr
+from cli.cmdcache import CmdCache
+from cli.spillmgr import DEFAULT_THRESHOLD, SpillMgr
+from cli.usagemgr import USAGE_MGR, Usage, UsageMgr
 from typehdr.strhdr import StrHdr
-from typehdr.jsonhdr import json_str_to_dict
+from typehdr.jsonhdr import TOLERANT, json_str_to_dict
+
+if TYPE_CHECKING:
+    import asyncio
+
+_CHUNK = 64 * 1024
+_STDERR_TAIL = 100
+_SIGPIPE_STATUS = -getattr(signal, "SIGPIPE", 0) or None
+# ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+_MAXRSS_UNIT = 1 if sys.platform == "darwin" else 1024
 
 
 @dispatch(list)
-@json_str_to_dict
-def runc(_cmd: list[str]) -> object:
+@json_str_to_dict(_strategy=TOLERANT)
+def runc(
+    _cmd: list[str],
+    *,
+    _cache: CmdCache | None = None,
+    _usage: UsageMgr | None = None,
+) -> object:
     r"""
     Execute a command provided as a list of arguments.
 
@@ -21,10 +51,24 @@ def runc(_cmd: list[str]) -> object:
 
     The returned stdout is automatically post-processed by
     :func:`json_str_to_dict`, which converts JSON output into a Python object
-    when possible.
+    when possible. Plain-text output is recognized from its first character
+    and returned unchanged, without a parsing attempt.
+
+    When a :class:`CmdCache` is given, the stdout of a previous identical
+    invocation is reused instead of spawning the command again.
+
+    When a :class:`UsageMgr` is given, or when the default registry
+    :data:`USAGE_MGR` is enabled, the wall time, CPU times and maximum
+    resident set size of the child process, read with :func:`os.wait4`, and
+    its output sizes are recorded into the registry. CPU times and memory
+    are only available on platforms providing :func:`os.wait4`.
 
     :param _cmd: Command and arguments to execute.
     :type _cmd: list[str]
+    :param _cache: Cache of the outputs of idempotent commands.
+    :type _cache: CmdCache, optional
+    :param _usage: Registry recording the resources used by the command.
+    :type _usage: UsageMgr, optional
 
     :return: Standard output of the executed command, or a parsed JSON object
              if the output is valid JSON.
@@ -49,25 +93,23 @@ def runc(_cmd: list[str]) -> object:
         print(result)
         # {'status': 'ok'}
     """
-    result = subprocess.run(
-        _cmd,
-        capture_output=True,
-        text=True,
-        check=True,
-    )
-
-    return result.stdout
+    return _run(_cmd, _cache, _usage)
 
 
 @dispatch(str)
-@json_str_to_dict
-def runc(_cmd: str) -> object:  # noqa: F811
+@json_str_to_dict(_strategy=TOLERANT)
+def runc(  # noqa: F811
+    _cmd: str,
+    *,
+    _cache: CmdCache | None = None,
+    _usage: UsageMgr | None = None,
+) -> object:
     r"""
     Execute a command provided as a string.
 
     This overload accepts a single cmd string, which is split into arguments
-    and processed using :class:`ListHdr` and :class:`StrHdr` to detect and
-    preserve embedded strings (such as quoted arguments).
+    by :meth:`StrHdr.tokenize` following POSIX shell quoting rules, so that
+    quoted arguments containing spaces are preserved as single arguments.
 
     The processed command is then executed using :func:`subprocess.run` with
     output captured as text.
@@ -78,6 +120,10 @@ def runc(_cmd: str) -> object:  # noqa: F811
 
     :param _cmd: Command to execute as a single string.
     :type _cmd: str
+    :param _cache: Cache of the outputs of idempotent commands.
+    :type _cache: CmdCache, optional
+    :param _usage: Registry recording the resources used by the command.
+    :type _usage: UsageMgr, optional
 
     :return: Standard output of the executed command, or a parsed JSON object
              if the output is valid JSON.
@@ -107,13 +153,794 @@ def runc(_cmd: str) -> object:  # noqa: F811
         print(result)
         # {'count': 3}
     """
-    _cmd = ListHdr.mutate(_cmd.split(), StrHdr.detect_embedded_str)
+    return _run(_tokenize(_cmd), _cache, _usage)
+
+
+def _positional_error(_name: str) -> callable:
+    """
+    Return an overload rejecting the positional options of ``_name``.
+
+    ``multipledispatch`` dispatches on every positional argument, so the
+    options of the overloaded functions are keyword-only: without this
+    overload, passing one positionally would raise a misleading
+    :class:`NotImplementedError` about a missing signature.
+    """
+
+    def reject(*_args) -> None:
+        raise TypeError(
+            f"{_name}() takes 1 positional argument but {len(_args)} were "
+            "given"
+        )
+
+    return reject
+
+
+runc.add((object, object, [object]), _positional_error("runc"))
+
+
+def _run(
+    _argv: list[str], _cache: CmdCache | None, _usage: UsageMgr | None
+) -> str:
+    """Run ``_argv``, or reuse its cached stdout, and return the stdout."""
+    if _cache is None:
+        return _exec(_argv, _usage)
+
+    l_key = _cache.key(_argv)
+    l_stdout = _cache.get(l_key)
+    if l_stdout is None:
+        l_stdout = _exec(_argv, _usage)
+        _cache.put(l_key, l_stdout)
+    return l_stdout
+
+
+def _exec(_argv: list[str], _usage: UsageMgr | None = None) -> str:
+    """Run ``_argv`` in a child process and return its stdout."""
+    if _usage is None and USAGE_MGR.is_enabled():
+        _usage = USAGE_MGR
+    if _usage is not None:
+        return _exec_usage(_argv, _usage)
 
     result = subprocess.run(
-        _cmd,
+        _argv,
         capture_output=True,
         text=True,
         check=True,
     )
 
     return result.stdout
+
+
+def _exec_usage(_argv: list[str], _usage: UsageMgr) -> str:
+    """Run ``_argv`` like :func:`_exec`, recording its resource usage."""
+    l_start = time.perf_counter()
+    l_proc = subprocess.Popen(
+        _argv, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        if hasattr(os, "wait4"):
+            l_out, l_err = _read_pipes(l_proc)
+            _, l_status, l_rusage = os.wait4(l_proc.pid, 0)
+            l_proc.returncode = os.waitstatus_to_exitcode(l_status)
+            l_cpu = (l_rusage.ru_utime, l_rusage.ru_stime)
+            l_maxrss = l_rusage.ru_maxrss * _MAXRSS_UNIT
+        else:
+            l_out, l_err = l_proc.communicate()
+            l_cpu = (0.0, 0.0)
+            l_maxrss = 0
+    except BaseException:
+        l_proc.kill()
+        l_proc.wait()
+        raise
+    l_wall = time.perf_counter() - l_start
+
+    _usage.record(
+        os.path.basename(_argv[0]),
+        Usage(
+            l_wall,
+            *l_cpu,
+            l_maxrss,
+            len(l_out),
+            len(l_err),
+            l_proc.returncode,
+        ),
+    )
+
+    l_stdout = _decode(l_out)
+    if l_proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            l_proc.returncode, _argv, l_stdout, _decode(l_err)
+        )
+    return l_stdout
+
+
+def _decode(_data: bytes) -> str:
+    """Decode captured output like ``subprocess.run(text=True)`` does."""
+    # Locale encoding and universal newlines, as the text pipes of Popen.
+    return io.TextIOWrapper(io.BytesIO(_data)).read()
+
+
+def _read_pipes(_proc: subprocess.Popen) -> tuple[bytes, bytes]:
+    """Read stdout and stderr of ``_proc`` to EOF, without reaping it."""
+    l_data = {_proc.stdout: [], _proc.stderr: []}
+    with selectors.DefaultSelector() as l_selector:
+        for ipipe in l_data:
+            l_selector.register(ipipe, selectors.EVENT_READ)
+
+        while l_selector.get_map():
+            for ikey, _ in l_selector.select():
+                l_chunk = os.read(ikey.fd, _CHUNK)
+                if l_chunk:
+                    l_data[ikey.fileobj].append(l_chunk)
+                else:
+                    l_selector.unregister(ikey.fileobj)
+                    ikey.fileobj.close()
+
+    return b"".join(l_data[_proc.stdout]), b"".join(l_data[_proc.stderr])
+
+
+@dispatch(list)
+def runc_stream(
+    _cmd: list[str],
+    *,
+    _json_lines: bool = False,
+    _bufsize: int = io.DEFAULT_BUFFER_SIZE,
+) -> Iterator[object]:
+    r"""
+    Execute a command and iterate over its stdout lines as they arrive.
+
+    Unlike :func:`runc`, the output is never accumulated: each line is
+    yielded as soon as the child process writes it, so memory use stays
+    constant and the first result is available before the command ends.
+    At most ``_bufsize`` bytes of stdout are read ahead; beyond that the
+    pipe applies back-pressure to the child.
+
+    Stderr is drained concurrently by a helper thread, so a chatty child
+    cannot block on a full stderr pipe. Only its last lines are kept, to be
+    reported if the command fails.
+
+    With ``_json_lines``, every non-blank line is decoded as one JSON value
+    (JSON Lines / NDJSON), instead of being yielded as a string.
+
+    The child process is started on the first iteration. Closing the
+    iterator early kills the child.
+
+    :param _cmd: Command and arguments to execute.
+    :type _cmd: list[str]
+    :param _json_lines: Decode each line as a JSON value.
+    :type _json_lines: bool, optional
+    :param _bufsize: Size in bytes of the stdout read buffer.
+    :type _bufsize: int, optional
+
+    :return: Iterator over stdout lines (including the line terminator), or
+             over decoded JSON values with ``_json_lines``.
+    :rtype: Iterator[object]
+
+    :raises subprocess.CalledProcessError: Once the output is exhausted, if
+        the command exited with a non-zero status code.
+    :raises json.JSONDecodeError: If ``_json_lines`` is set and a line is not
+        valid JSON.
+
+    *Examples*
+
+    .. code-block:: python
+
+        from clihdr import runc_stream
+
+        for line in runc_stream(["tail", "-n", "100", "app.log"]):
+            print(line, end="")
+
+        for event in runc_stream(["kubectl", "get", "events", "-o", "json",
+                                  "--watch"], _json_lines=True):
+            handle(event)
+    """
+    return _stream(_cmd, _json_lines, _bufsize)
+
+
+@dispatch(str)
+def runc_stream(  # noqa: F811
+    _cmd: str,
+    *,
+    _json_lines: bool = False,
+    _bufsize: int = io.DEFAULT_BUFFER_SIZE,
+) -> Iterator[object]:
+    r"""
+    Execute a command string and iterate over its stdout lines.
+
+    The command string is split into arguments exactly like the string
+    overload of :func:`runc`, then streamed as the list overload of
+    :func:`runc_stream` does.
+
+    :param _cmd: Command to execute as a single string.
+    :type _cmd: str
+    :param _json_lines: Decode each line as a JSON value.
+    :type _json_lines: bool, optional
+    :param _bufsize: Size in bytes of the stdout read buffer.
+    :type _bufsize: int, optional
+
+    :return: Iterator over stdout lines, or over decoded JSON values with
+             ``_json_lines``.
+    :rtype: Iterator[object]
+
+    :raises subprocess.CalledProcessError: Once the output is exhausted, if
+        the command exited with a non-zero status code.
+    """
+    return _stream(_tokenize(_cmd), _json_lines, _bufsize)
+
+
+runc_stream.add(
+    (object, object, [object]), _positional_error("runc_stream")
+)
+
+
+def _stream(
+    _argv: list[str], _json_lines: bool, _bufsize: int
+) -> Iterator[object]:
+    """Yield the stdout lines of ``_argv``, see :func:`runc_stream`."""
+    l_proc = subprocess.Popen(
+        _argv,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=_bufsize,
+    )
+    l_stderr = deque(maxlen=_STDERR_TAIL)
+    l_drain = threading.Thread(
+        target=_drain, args=(l_proc.stderr, l_stderr), daemon=True
+    )
+    l_drain.start()
+    try:
+        for iline in l_proc.stdout:
+            if not _json_lines:
+                yield iline
+            elif not iline.isspace():
+                yield json.loads(iline)
+
+        l_proc.wait()
+        l_drain.join()
+        if l_proc.returncode != 0:
+            raise subprocess.CalledProcessError(
+                l_proc.returncode, _argv, None, "".join(l_stderr)
+            )
+    finally:
+        if l_proc.poll() is None:
+            l_proc.kill()
+            l_proc.wait()
+        l_proc.stdout.close()
+
+
+def _drain(_pipe: io.TextIOBase, _tail: deque) -> None:
+    """Consume ``_pipe`` until EOF, keeping only its last lines."""
+    with _pipe:
+        _tail.extend(_pipe)
+
+
+@dispatch(list)
+def runc_spill(
+    _cmd: list[str], *, _threshold: int = DEFAULT_THRESHOLD
+) -> SpillMgr:
+    r"""
+    Execute a command whose output may be too large to hold in memory.
+
+    The stdout of the command is read in chunks into a :class:`SpillMgr`,
+    which keeps it in memory up to ``_threshold`` bytes and streams it into
+    a temporary file beyond. Peak memory use therefore stays roughly
+    constant whatever the size of the output.
+
+    No JSON post-processing is applied eagerly: the returned handle exposes
+    the raw output as a memory-mapped buffer, decodes it as JSON on first
+    access with :meth:`SpillMgr.json`, or streams it element by element with
+    :meth:`SpillMgr.iter_items`. The handle should be closed, preferably by
+    using it as a context manager, to remove the temporary file.
+
+    :param _cmd: Command and arguments to execute.
+    :type _cmd: list[str]
+    :param _threshold: Output size in bytes above which stdout is spilled to
+                       a temporary file.
+    :type _threshold: int, optional
+
+    :return: Handle over the standard output of the executed command.
+    :rtype: SpillMgr
+
+    :raises subprocess.CalledProcessError: If the command exits with a
+        non-zero status code.
+
+    *Examples*
+
+    .. code-block:: python
+
+        from clihdr import runc_spill
+
+        with runc_spill(["cat", "huge.json"], _threshold=16 << 20) as out:
+            for record in out.iter_items():
+                process(record)
+    """
+    return _spill(_cmd, _threshold)
+
+
+@dispatch(str)
+def runc_spill(  # noqa: F811
+    _cmd: str, *, _threshold: int = DEFAULT_THRESHOLD
+) -> SpillMgr:
+    r"""
+    Execute a command string whose output may be too large for memory.
+
+    The command string is split into arguments exactly like the string
+    overload of :func:`runc`, then executed as the list overload of
+    :func:`runc_spill` does.
+
+    :param _cmd: Command to execute as a single string.
+    :type _cmd: str
+    :param _threshold: Output size in bytes above which stdout is spilled to
+                       a temporary file.
+    :type _threshold: int, optional
+
+    :return: Handle over the standard output of the executed command.
+    :rtype: SpillMgr
+
+    :raises subprocess.CalledProcessError: If the command exits with a
+        non-zero status code.
+    """
+    return _spill(_tokenize(_cmd), _threshold)
+
+
+runc_spill.add(
+    (object, object, [object]), _positional_error("runc_spill")
+)
+
+
+def _spill(_argv: list[str], _threshold: int) -> SpillMgr:
+    """Run ``_argv``, reading its stdout into a :class:`SpillMgr`."""
+    l_out = SpillMgr(_threshold)
+    with tempfile.TemporaryFile() as l_err:
+        l_proc = subprocess.Popen(
+            _argv, stdout=subprocess.PIPE, stderr=l_err
+        )
+        try:
+            with l_proc.stdout:
+                for ichunk in iter(partial(l_proc.stdout.read, _CHUNK), b""):
+                    l_out.write(ichunk)
+            l_proc.wait()
+        except BaseException:
+            l_proc.kill()
+            l_proc.wait()
+            l_out.close()
+            raise
+
+        if l_proc.returncode != 0:
+            l_out.close()
+            l_err.seek(0)
+            raise subprocess.CalledProcessError(
+                l_proc.returncode,
+                _argv,
+                None,
+                l_err.read().decode(errors="replace"),
+            )
+
+    l_out.seal()
+    return l_out
+
+
+class PipelineError(subprocess.CalledProcessError):
+    """
+    Raised by :func:`runc_pipe` when a stage of the pipeline fails.
+
+    The inherited ``returncode``, ``cmd`` and ``stderr`` attributes describe
+    the last failing stage, as the ``pipefail`` shell option would, and
+    ``output`` holds the stdout of the final stage.
+
+    :ivar returncodes: Exit status of every stage, in pipeline order.
+    :vartype returncodes: list[int]
+    """
+
+    def __init__(
+        self,
+        _returncodes: list[int],
+        _index: int,
+        _cmd: list[str],
+        _output: str,
+        _stderr: str,
+    ):
+        """
+        Initialize the error from the failing stage ``_index``.
+
+        :param _returncodes: Exit status of every stage.
+        :type _returncodes: list[int]
+        :param _index: Position of the reported failing stage.
+        :type _index: int
+        :param _cmd: Command of the failing stage.
+        :type _cmd: list[str]
+        :param _output: Standard output of the final stage.
+        :type _output: str
+        :param _stderr: Standard error of the failing stage.
+        :type _stderr: str
+        """
+        super().__init__(_returncodes[_index], _cmd, _output, _stderr)
+        self.returncodes = _returncodes
+
+    def __str__(self) -> str:
+        """Describe the failure with the status of every stage."""
+        return f"{super().__str__()} Stage statuses: {self.returncodes}."
+
+
+@json_str_to_dict(_strategy=TOLERANT)
+def runc_pipe(_stages: list[list[str] | str]) -> object:
+    r"""
+    Execute a pipeline of commands, as ``cmd1 | cmd2 | cmd3`` would.
+
+    Each stage is started with :class:`subprocess.Popen` and its stdin is
+    connected directly to the stdout of the previous stage through an OS
+    pipe. No shell is involved and intermediate data never enters the
+    Python process: only the stdout of the final stage is captured.
+
+    Stages are given as lists of arguments or as strings, which are split
+    like the string overload of :func:`runc`. The stderr of every stage is
+    spooled to a temporary file, so no stage can block on a full stderr
+    pipe.
+
+    The returned stdout is automatically post-processed by
+    :func:`json_str_to_dict`, which converts JSON output into a Python object
+    when possible.
+
+    A stage other than the last one that is terminated by ``SIGPIPE``, e.g.
+    the producer of ``yes | head -n 1``, is not considered as failed.
+
+    :param _stages: Commands of the pipeline, in order.
+    :type _stages: list[list[str] | str]
+
+    :return: Standard output of the final stage, or a parsed JSON object if
+             the output is valid JSON.
+    :rtype: object
+
+    :raises PipelineError: If a stage exits with a non-zero status code. Its
+        ``returncodes`` attribute reports the status of every stage.
+    :raises ValueError: If ``_stages`` is empty.
+
+    *Examples*
+
+    .. code-block:: python
+
+        from clihdr import runc_pipe
+
+        count = runc_pipe([["find", "/var/log", "-name", "*.gz"],
+                           ["wc", "-l"]])
+        print(count)
+        # 42
+
+        result = runc_pipe(["curl -s https://example.org/api/items",
+                            "jq '.items | length'"])
+    """
+    if len(_stages) == 0:
+        raise ValueError("Pipeline has no stage")
+
+    l_argvs = [
+        _tokenize(istage) if isinstance(istage, str) else istage
+        for istage in _stages
+    ]
+    l_last = len(l_argvs) - 1
+    l_procs = []
+    l_errs = []
+    try:
+        l_stdin = None
+        for iindex, iargv in enumerate(l_argvs):
+            l_errs.append(tempfile.TemporaryFile())
+            l_procs.append(
+                subprocess.Popen(
+                    iargv,
+                    stdin=l_stdin,
+                    stdout=subprocess.PIPE,
+                    stderr=l_errs[-1],
+                    text=iindex == l_last,
+                )
+            )
+            if l_stdin is not None:
+                l_stdin.close()
+            l_stdin = l_procs[-1].stdout
+
+        l_out, _ = l_procs[-1].communicate()
+        l_returncodes = [iproc.wait() for iproc in l_procs]
+
+        l_failed = [
+            iindex
+            for iindex, icode in enumerate(l_returncodes)
+            if icode != 0 and (iindex == l_last or icode != _SIGPIPE_STATUS)
+        ]
+        if l_failed:
+            l_index = l_failed[-1]
+            l_errs[l_index].seek(0)
+            l_err = l_errs[l_index].read().decode(errors="replace")
+            raise PipelineError(
+                l_returncodes, l_index, l_argvs[l_index], l_out, l_err
+            )
+        return l_out
+    finally:
+        for iproc in l_procs:
+            if iproc.poll() is None:
+                iproc.kill()
+                iproc.wait()
+            iproc.stdout.close()
+        for ierr in l_errs:
+            ierr.close()
+
+
+def _tokenize(_cmd: str) -> list[str]:
+    """Split a command string into arguments, honouring shell quoting."""
+    return list(StrHdr.tokenize(_cmd))
+
+
+def runc_many(
+    _cmds: list[list[str] | str],
+    _max_workers: int | None = None,
+    _fail_fast: bool = False,
+) -> list[object]:
+    r"""
+    Execute several commands concurrently with bounded parallelism.
+
+    Each command is dispatched to :func:`runc` on a worker thread, so both
+    the list and the string overloads are accepted and the usual
+    :func:`json_str_to_dict` post-processing is applied to every output.
+    At most ``_max_workers`` child processes run at the same time.
+
+    Results are returned in the order of ``_cmds``, regardless of the order
+    in which the commands complete. When ``_fail_fast`` is ``False``, a
+    command that fails does not stop the others: the exception it raised
+    (e.g. :class:`subprocess.CalledProcessError`, which carries the exit code
+    and the captured stderr) is stored in its slot of the result list.
+
+    When ``_fail_fast`` is ``True``, the first failure cancels every command
+    that has not been started yet and is re-raised. Commands already running
+    are allowed to finish.
+
+    :param _cmds: Commands to execute, each as a list of arguments or a
+                  single string.
+    :type _cmds: list[list[str] | str]
+    :param _max_workers: Maximum number of commands running concurrently.
+                         Defaults to the :class:`ThreadPoolExecutor` default.
+    :type _max_workers: int, optional
+    :param _fail_fast: Cancel the remaining commands and raise on the first
+                       error.
+    :type _fail_fast: bool, optional
+
+    :return: One entry per command, in input order: the output (or parsed
+             JSON object) on success, the raised exception on failure.
+    :rtype: list[object]
+
+    :raises Exception: The first error raised by a command, only when
+        ``_fail_fast`` is ``True``.
+
+    *Examples*
+
+    .. code-block:: python
+
+        from clihdr import runc_many
+
+        results = runc_many(
+            [["cat", "a.json"], "cat b.json", ["false"]],
+            _max_workers=8,
+        )
+        # [{...}, {...}, CalledProcessError(1, ['false'])]
+
+        for res in results:
+            if isinstance(res, Exception):
+                print("failed:", res)
+    """
+    # concurrent.futures loads logging: keep it off the import of runc.
+    from concurrent.futures import (  # pylint: disable=C0415
+        ThreadPoolExecutor,
+        as_completed,
+    )
+
+    with ThreadPoolExecutor(max_workers=_max_workers) as l_executor:
+        l_futures = [l_executor.submit(runc, icmd) for icmd in _cmds]
+
+        if _fail_fast:
+            for ifuture in as_completed(l_futures):
+                l_error = ifuture.exception()
+                if l_error is not None:
+                    l_executor.shutdown(wait=False, cancel_futures=True)
+                    raise l_error
+
+        l_results = []
+        for ifuture in l_futures:
+            l_error = ifuture.exception()
+            l_results.append(ifuture.result() if l_error is None else l_error)
+        return l_results
+
+
+@dispatch(list)
+@json_str_to_dict(_strategy=TOLERANT)
+async def arunc(
+    _cmd: list[str],
+    *,
+    _timeout: float | None = None,
+    _semaphore: "asyncio.Semaphore | None" = None,
+) -> object:
+    r"""
+    Execute a command provided as a list of arguments without blocking.
+
+    Coroutine counterpart of :func:`runc`. The command is started with
+    :func:`asyncio.create_subprocess_exec`, so the event loop keeps running
+    while the child process is alive and no thread is consumed per command.
+
+    The returned stdout is automatically post-processed by
+    :func:`json_str_to_dict`, which converts JSON output into a Python object
+    when possible.
+
+    If ``_timeout`` expires, or if the awaiting task is cancelled, the child
+    process is killed and reaped before the exception propagates.
+
+    :param _cmd: Command and arguments to execute.
+    :type _cmd: list[str]
+    :param _timeout: Maximum number of seconds to wait for the command.
+    :type _timeout: float, optional
+    :param _semaphore: Semaphore acquired for the whole lifetime of the child
+                       process, used to bound the number of commands in
+                       flight.
+    :type _semaphore: asyncio.Semaphore, optional
+
+    :return: Standard output of the executed command, or a parsed JSON object
+             if the output is valid JSON.
+    :rtype: object
+
+    :raises subprocess.CalledProcessError: If the command exits with a
+        non-zero status code.
+    :raises subprocess.TimeoutExpired: If the command does not complete
+        within ``_timeout`` seconds.
+
+    *Examples*
+
+    .. code-block:: python
+
+        import asyncio
+
+        from clihdr import arunc
+
+        result = asyncio.run(arunc(["echo", '{"status": "ok"}']))
+        print(result)
+        # {'status': 'ok'}
+    """
+    if _semaphore is None:
+        return await _aexec(_cmd, _timeout)
+
+    async with _semaphore:
+        return await _aexec(_cmd, _timeout)
+
+
+@dispatch(str)
+@json_str_to_dict(_strategy=TOLERANT)
+async def arunc(  # noqa: F811
+    _cmd: str,
+    *,
+    _timeout: float | None = None,
+    _semaphore: "asyncio.Semaphore | None" = None,
+) -> object:
+    r"""
+    Execute a command provided as a string without blocking.
+
+    The command string is split into arguments exactly like the string
+    overload of :func:`runc`, then executed as the list overload of
+    :func:`arunc` does.
+
+    :param _cmd: Command to execute as a single string.
+    :type _cmd: str
+    :param _timeout: Maximum number of seconds to wait for the command.
+    :type _timeout: float, optional
+    :param _semaphore: Semaphore bounding the number of commands in flight.
+    :type _semaphore: asyncio.Semaphore, optional
+
+    :return: Standard output of the executed command, or a parsed JSON object
+             if the output is valid JSON.
+    :rtype: object
+
+    :raises subprocess.CalledProcessError: If the command exits with a
+        non-zero status code.
+    :raises subprocess.TimeoutExpired: If the command does not complete
+        within ``_timeout`` seconds.
+    """
+    _cmd = _tokenize(_cmd)
+
+    if _semaphore is None:
+        return await _aexec(_cmd, _timeout)
+
+    async with _semaphore:
+        return await _aexec(_cmd, _timeout)
+
+
+arunc.add((object, object, [object]), _positional_error("arunc"))
+
+
+async def _aexec(_argv: list[str], _timeout: float | None) -> str:
+    """Run ``_argv`` in a child process and return its decoded stdout."""
+    # asyncio is the bulk of the import time: only the coroutines load it.
+    import asyncio  # pylint: disable=C0415
+
+    l_proc = await asyncio.create_subprocess_exec(
+        *_argv,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        l_out, l_err = await asyncio.wait_for(l_proc.communicate(), _timeout)
+    except TimeoutError as e:
+        await _akill(l_proc)
+        raise subprocess.TimeoutExpired(_argv, _timeout) from e
+    except asyncio.CancelledError:
+        await _akill(l_proc)
+        raise
+
+    l_stdout = _decode(l_out)
+    if l_proc.returncode != 0:
+        raise subprocess.CalledProcessError(
+            l_proc.returncode, _argv, l_stdout, _decode(l_err)
+        )
+    return l_stdout
+
+
+async def _akill(_proc: "asyncio.subprocess.Process") -> None:
+    """Kill ``_proc`` if it is still running and reap it."""
+    if _proc.returncode is None:
+        _proc.kill()
+    await _proc.wait()
+
+
+async def arunc_many(
+    _cmds: list[list[str] | str],
+    _limit: int = 64,
+    _timeout: float | None = None,
+    _fail_fast: bool = False,
+) -> list[object]:
+    r"""
+    Execute several commands concurrently on the running event loop.
+
+    Every command is handed to :func:`arunc` and all of them are awaited
+    together. An :class:`asyncio.Semaphore` keeps at most ``_limit`` child
+    processes alive at the same time, so thousands of commands can be
+    scheduled without spawning a thread per command.
+
+    Results are returned in the order of ``_cmds``. When ``_fail_fast`` is
+    ``False``, the exception raised by a failing command is stored in its
+    slot. When ``_fail_fast`` is ``True``, the first failure cancels the
+    remaining commands, whose child processes are killed, and is re-raised.
+
+    :param _cmds: Commands to execute, each as a list of arguments or a
+                  single string.
+    :type _cmds: list[list[str] | str]
+    :param _limit: Maximum number of commands running concurrently.
+    :type _limit: int, optional
+    :param _timeout: Per-command timeout in seconds.
+    :type _timeout: float, optional
+    :param _fail_fast: Cancel the remaining commands and raise on the first
+                       error.
+    :type _fail_fast: bool, optional
+
+    :return: One entry per command, in input order: the output (or parsed
+             JSON object) on success, the raised exception on failure.
+    :rtype: list[object]
+
+    *Examples*
+
+    .. code-block:: python
+
+        import asyncio
+
+        from clihdr import arunc_many
+
+        cmds = [["ssh", host, "cat /etc/os-release"] for host in hosts]
+        results = asyncio.run(arunc_many(cmds, _limit=100, _timeout=30))
+    """
+    import asyncio  # pylint: disable=C0415
+
+    l_semaphore = asyncio.Semaphore(_limit)
+    l_tasks = [
+        asyncio.ensure_future(
+            arunc(icmd, _timeout=_timeout, _semaphore=l_semaphore)
+        )
+        for icmd in _cmds
+    ]
+    try:
+        return await asyncio.gather(*l_tasks, return_exceptions=not _fail_fast)
+    finally:
+        l_pending = [itask for itask in l_tasks if not itask.done()]
+        for itask in l_pending:
+            itask.cancel()
+        if l_pending:
+            await asyncio.wait(l_pending)
@@ -0,0 +1,252 @@
+"""cmdcache module."""
+
+import json
+import os
+import threading
+import time
+
+from collections import OrderedDict
+
+from fio.jsonmgr import JsonMgr
+
+
+class CmdCache:
+    r"""
+    Memoizing cache for the output of idempotent commands.
+
+    A :class:`CmdCache` is passed to :func:`cli.clihdr.runc` through its
+    ``_cache`` parameter. The raw stdout of a successful command is stored
+    under a key made of:
+
+    - the argument list of the command
+    - the current working directory
+    - the values of the environment variables listed in ``_env``
+
+    A later call with the same key returns the stored stdout without
+    spawning a process. Because the raw stdout is cached, the JSON
+    post-processing of :func:`runc` is applied to cached results exactly as
+    to fresh ones. Failing commands are never cached.
+
+    Entries expire ``_ttl`` seconds after they were stored, and the least
+    recently used entry is evicted once ``_maxsize`` entries are held. When
+    ``_filepath`` is given, the cache is loaded from that JSON file and
+    written back to it whenever a new entry is stored, so it survives across
+    process runs. The file is replaced atomically, so a concurrent reader
+    never sees a partial file, and a file that cannot be read, e.g. after a
+    crash, is treated as an empty cache.
+
+    Only cache commands that are read-only and whose output depends solely
+    on the key, e.g. ``git rev-parse HEAD`` or ``uname -a``.
+
+    :param _maxsize: Maximum number of entries kept.
+    :type _maxsize: int
+    :param _ttl: Lifetime of an entry in seconds. ``None`` never expires.
+    :type _ttl: float, optional
+    :param _env: Names of the environment variables that are part of the key.
+    :type _env: tuple[str, ...]
+    :param _filepath: Path of the JSON file used to persist the cache.
+    :type _filepath: str, optional
+
+    **Examples**
+
+    .. code-block:: python
+
+        from clihdr import runc
+        from cmdcache import CmdCache
+
+        cache = CmdCache(_maxsize=256, _ttl=60, _env=("GIT_DIR",))
+
+        head = runc("git rev-parse HEAD", _cache=cache)
+        head = runc("git rev-parse HEAD", _cache=cache)  # no process spawned
+
+        print(cache.stats())
+        # {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 256}
+
+    Persisting across runs::
+
+        cache = CmdCache(_ttl=3600, _filepath="/tmp/inventory-cache.json")
+        hosts = runc(["inventory", "list", "--json"], _cache=cache)
+    """
+
+    def __init__(
+        self,
+        _maxsize: int = 128,
+        _ttl: float | None = None,
+        _env: tuple[str, ...] = (),
+        _filepath: str | None = None,
+    ):
+        """
+        Initialize the cache, loading ``_filepath`` if it exists.
+
+        :param _maxsize: Maximum number of entries kept.
+        :type _maxsize: int
+        :param _ttl: Lifetime of an entry in seconds.
+        :type _ttl: float, optional
+        :param _env: Environment variables that are part of the key.
+        :type _env: tuple[str, ...]
+        :param _filepath: Path of the JSON file used to persist the cache.
+        :type _filepath: str, optional
+
+        :raises ValueError: If ``_maxsize`` is lower than 1.
+        """
+        if _maxsize < 1:
+            raise ValueError(f"Cache size must be positive, got {_maxsize}")
+
+        self.maxsize_ = _maxsize
+        self.ttl_ = _ttl
+        self.env_ = tuple(_env)
+        self.json_mgr_ = None if _filepath is None else JsonMgr(_filepath)
+        self.entries_ = OrderedDict()
+        self.hits_ = 0
+        self.misses_ = 0
+        self.lock_ = threading.Lock()
+        self.save_lock_ = threading.Lock()
+
+        if _filepath is not None and os.path.exists(_filepath):
+            try:
+                self.load()
+            except (OSError, ValueError):
+                # A cache is only an optimization: start empty.
+                self.entries_.clear()
+
+    def key(self, _argv: list[str]) -> str:
+        """
+        Build the cache key of a command in the current context.
+
+        :param _argv: Command and arguments.
+        :type _argv: list[str]
+        :return: Key combining the arguments, the working directory and the
+                 selected environment variables.
+        :rtype: str
+        """
+        l_env = [os.environ.get(iname) for iname in self.env_]
+        return json.dumps([_argv, os.getcwd(), l_env])
+
+    def get(self, _key: str) -> str | None:
+        """
+        Return the stdout stored under ``_key``, counting a hit or a miss.
+
+        :param _key: Key built by :meth:`key`.
+        :type _key: str
+        :return: The cached stdout, or ``None`` if the key is absent or its
+                 entry has expired.
+        :rtype: str | None
+        """
+        with self.lock_:
+            l_entry = self.entries_.get(_key)
+            if l_entry is not None and self._expired(l_entry):
+                del self.entries_[_key]
+                l_entry = None
+
+            if l_entry is None:
+                self.misses_ += 1
+                return None
+
+            self.entries_.move_to_end(_key)
+            self.hits_ += 1
+            return l_entry[0]
+
+    def put(self, _key: str, _stdout: str) -> None:
+        """
+        Store ``_stdout`` under ``_key``, evicting the oldest entry if full.
+
+        The cache file, if any, is rewritten.
+
+        :param _key: Key built by :meth:`key`.
+        :type _key: str
+        :param _stdout: Raw standard output of the command.
+        :type _stdout: str
+        """
+        with self.lock_:
+            self.entries_[_key] = [_stdout, time.time()]
+            self.entries_.move_to_end(_key)
+            while len(self.entries_) > self.maxsize_:
+                self.entries_.popitem(last=False)
+
+        if self.json_mgr_ is not None:
+            self.save()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Return the hit and miss counters and the current size.
+
+        :return: Dictionary with the ``hits``, ``misses``, ``size`` and
+                 ``maxsize`` keys.
+        :rtype: dict[str, int]
+        """
+        with self.lock_:
+            return {
+                "hits": self.hits_,
+                "misses": self.misses_,
+                "size": len(self.entries_),
+                "maxsize": self.maxsize_,
+            }
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self.lock_:
+            self.entries_.clear()
+            self.hits_ = 0
+            self.misses_ = 0
+
+    def save(self) -> None:
+        """
+        Write the live entries to the cache file, atomically.
+
+        The entries are written to a temporary file next to the cache file
+        and renamed over it, so that threads and processes sharing the file
+        never leave it truncated.
+
+        :raises ValueError: If the cache has no file.
+        :raises FileNotFoundError: If the directory of the file does not
+            exist.
+        """
+        if self.json_mgr_ is None:
+            raise ValueError("Cache has no file to save to")
+
+        l_filepath = self.json_mgr_.filepath_
+        l_tmp = f"{l_filepath}.{os.getpid()}.tmp"
+        # The entries are read under the save lock, so the last file written
+        # holds the latest entries.
+        with self.save_lock_:
+            with self.lock_:
+                l_entries = [
+                    [ikey, *ientry]
+                    for ikey, ientry in self.entries_.items()
+                    if not self._expired(ientry)
+                ]
+            try:
+                with open(l_tmp, "w", encoding="utf-8") as l_file:
+                    json.dump(l_entries, l_file, ensure_ascii=False)
+                os.replace(l_tmp, l_filepath)
+            finally:
+                if os.path.exists(l_tmp):
+                    os.remove(l_tmp)
+
+    def load(self) -> None:
+        """
+        Replace the entries with the live ones read from the cache file.
+
+        :raises ValueError: If the cache has no file, or if the file is not
+            a valid cache file.
+        :raises FileNotFoundError: If the cache file does not exist.
+        """
+        if self.json_mgr_ is None:
+            raise ValueError("Cache has no file to load from")
+
+        l_entries = self.json_mgr_.read()
+        with self.lock_:
+            self.entries_.clear()
+            try:
+                for ikey, istdout, istamp in l_entries[-self.maxsize_ :]:
+                    if not self._expired([istdout, istamp]):
+                        self.entries_[ikey] = [istdout, istamp]
+            except (TypeError, ValueError) as e:
+                l_filepath = self.json_mgr_.filepath_
+                raise ValueError(
+                    f"File '{l_filepath}' is not a valid cache"
+                ) from e
+
+    def _expired(self, _entry: list) -> bool:
+        """Tell whether an entry is older than the time to live."""
+        return self.ttl_ is not None and time.time() - _entry[1] > self.ttl_
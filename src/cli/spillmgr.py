@@ -0,0 +1,320 @@
+"""spillmgr module."""
+
+import codecs
+import json
+import mmap
+import re
+import tempfile
+
+DEFAULT_THRESHOLD = 64 * 1024 * 1024
+
+_SKIP_RE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL_RE = re.compile(r"[0-9eE.+-]*\Z")
+_UNSET = object()
+
+
+class SpillMgr:
+    r"""
+    Output buffer that spills to a temporary file above a size threshold.
+
+    Bytes are appended with :meth:`write`. As long as the total size stays
+    below ``_threshold`` they are kept in memory; once it is exceeded, the
+    content is moved to an anonymous temporary file and every further write
+    goes to disk, so memory use no longer grows with the output.
+
+    After :meth:`seal`, the content is exposed without copying through
+    :meth:`buffer`, which memory-maps the temporary file when the output has
+    been spilled. JSON content can then be:
+
+    - decoded on first access with :meth:`json`, the result being kept
+    - streamed value by value with :meth:`iter_items`, keeping only one
+      value in memory at a time
+
+    The temporary file is removed by :meth:`close`, or when the manager is
+    used as a context manager and the ``with`` block exits.
+
+    :param _threshold: Size in bytes above which the content is spilled.
+    :type _threshold: int
+
+    **Examples**
+
+    .. code-block:: python
+
+        from clihdr import runc_spill
+
+        with runc_spill("kubectl get pods -A -o json") as out:
+            print(len(out), out.is_spilled())
+            for pod in out.iter_items("items"):
+                print(pod["metadata"]["name"])
+
+    Decoding on first access::
+
+        with runc_spill("cat inventory.json", _threshold=1 << 20) as out:
+            hosts = out.json()["hosts"]
+    """
+
+    def __init__(self, _threshold: int = DEFAULT_THRESHOLD):
+        """
+        Initialize an empty in-memory buffer.
+
+        :param _threshold: Size in bytes above which the content is spilled.
+        :type _threshold: int
+        """
+        self.threshold_ = _threshold
+        self.chunks_ = bytearray()
+        self.file_ = None
+        self.mmap_ = None
+        self.size_ = 0
+        self.data_ = _UNSET
+
+    def __enter__(self) -> "SpillMgr":
+        """Return the manager itself."""
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        """Release the temporary file."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the size of the content in bytes."""
+        return self.size_
+
+    def write(self, _chunk: bytes) -> None:
+        """
+        Append a chunk of bytes, spilling to disk past the threshold.
+
+        :param _chunk: Bytes to append.
+        :type _chunk: bytes
+        """
+        self.size_ += len(_chunk)
+        if self.file_ is None and self.size_ <= self.threshold_:
+            self.chunks_ += _chunk
+            return
+
+        if self.file_ is None:
+            self.file_ = tempfile.TemporaryFile()
+            self.file_.write(self.chunks_)
+            self.chunks_ = bytearray()
+        self.file_.write(_chunk)
+
+    def seal(self) -> None:
+        """Mark the content complete and map the temporary file, if any."""
+        if self.file_ is not None and self.mmap_ is None:
+            self.file_.flush()
+            self.mmap_ = mmap.mmap(
+                self.file_.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+    def is_spilled(self) -> bool:
+        """
+        Tell whether the content has been moved to a temporary file.
+
+        :return: ``True`` if the threshold was exceeded.
+        :rtype: bool
+        """
+        return self.file_ is not None
+
+    def buffer(self) -> memoryview:
+        """
+        Return a read-only view of the content, without copying it.
+
+        The view must be released before :meth:`close` is called.
+
+        :return: View over the memory-mapped file or the in-memory buffer.
+        :rtype: memoryview
+        """
+        self.seal()
+        if self.mmap_ is not None:
+            return memoryview(self.mmap_)
+        return memoryview(self.chunks_).toreadonly()
+
+    def text(self, _encoding: str = "utf-8") -> str:
+        """
+        Decode the whole content as text.
+
+        :param _encoding: Encoding of the content.
+        :type _encoding: str
+        :return: The decoded content.
+        :rtype: str
+        """
+        with self.buffer() as l_view:
+            return str(l_view, _encoding)
+
+    def json(self) -> object:
+        """
+        Decode the whole content as one JSON document, on first access.
+
+        The decoded object is kept, later calls return it directly.
+
+        :return: The decoded JSON document.
+        :rtype: object
+        :raises json.JSONDecodeError: If the content is not valid JSON.
+        """
+        if self.data_ is _UNSET:
+            with self.buffer() as l_view:
+                self.data_ = json.loads(l_view.tobytes())
+        return self.data_
+
+    def iter_items(
+        self, _key: str | None = None, _chunk_size: int = 1024 * 1024
+    ) -> object:
+        """
+        Stream the JSON values of the content one at a time.
+
+        If the content is a JSON array, its elements are yielded. If
+        ``_key`` is given, the content must be a JSON object and the
+        elements of its ``_key`` array member are yielded instead. Any other
+        content is read as a sequence of JSON documents, such as JSON Lines,
+        and every document is yielded.
+
+        The content is decoded ``_chunk_size`` bytes at a time, so memory use
+        is bounded by the chunk size plus the size of the largest value.
+        Spilled content is read from the temporary file rather than through
+        the memory map, so the pages already decoded do not stay resident.
+
+        :param _key: Name of the top-level member holding the array.
+        :type _key: str, optional
+        :param _chunk_size: Number of bytes decoded per step.
+        :type _chunk_size: int
+        :return: Generator over the decoded values.
+        :rtype: Iterator[object]
+        :raises json.JSONDecodeError: If the content is not valid JSON.
+        :raises ValueError: If the array is not terminated, or ``_key`` does
+            not name an array member.
+        """
+        l_reader = _JsonReader(self._chunks(_chunk_size))
+        if _key is not None:
+            l_reader.seek_member(_key)
+        yield from l_reader.values()
+
+    def _chunks(self, _chunk_size: int) -> object:
+        """Yield the content ``_chunk_size`` bytes at a time."""
+        self.seal()
+        if self.file_ is not None:
+            for ioffset in range(0, self.size_, _chunk_size):
+                self.file_.seek(ioffset)
+                yield self.file_.read(_chunk_size)
+            return
+
+        for ioffset in range(0, self.size_, _chunk_size):
+            yield bytes(self.chunks_[ioffset : ioffset + _chunk_size])
+
+    def close(self) -> None:
+        """Release the memory buffer and remove the temporary file."""
+        if self.mmap_ is not None:
+            self.mmap_.close()
+            self.mmap_ = None
+        if self.file_ is not None:
+            self.file_.close()
+            self.file_ = None
+        self.chunks_ = bytearray()
+        self.data_ = _UNSET
+
+
+class _JsonReader:
+    """Incremental reader of JSON values over chunks of bytes."""
+
+    def __init__(self, _chunks: object):
+        """Start reading the ``_chunks`` iterator."""
+        self.chunks_ = _chunks
+        self.utf8_ = codecs.getincrementaldecoder("utf-8")()
+        self.decoder_ = json.JSONDecoder()
+        self.text_ = ""
+        self.pos_ = 0
+
+    def more(self, _size: int = 0) -> bool:
+        """Decode chunks until ``_size`` characters are pending, or one."""
+        l_parts = [self.text_[self.pos_ :]]
+        l_pending = len(l_parts[0])
+        for ichunk in self.chunks_:
+            l_parts.append(self.utf8_.decode(ichunk))
+            l_pending += len(l_parts[-1])
+            if l_pending >= _size:
+                break
+        if len(l_parts) == 1:
+            self.utf8_.decode(b"", True)
+            return False
+
+        self.text_ = "".join(l_parts)
+        self.pos_ = 0
+        return True
+
+    def peek(self, _skip: re.Pattern) -> str:
+        """Skip the characters matched by ``_skip``, return the next one."""
+        while True:
+            self.pos_ = _skip.match(self.text_, self.pos_).end()
+            if self.pos_ < len(self.text_):
+                return self.text_[self.pos_]
+            if not self.more():
+                return ""
+
+    def decode(self) -> object:
+        """Decode the value starting at the next non-blank character."""
+        self.peek(_SKIP_RE)
+        while True:
+            try:
+                l_value, l_end = self.decoder_.raw_decode(
+                    self.text_, self.pos_
+                )
+            except json.JSONDecodeError:
+                # The value may be truncated: at least double the pending
+                # text, so a large value is decoded a few times only.
+                if self.more(2 * (len(self.text_) - self.pos_)):
+                    continue
+                raise
+            # A number reaching the end of the text may be truncated.
+            if _NUMBER_TAIL_RE.match(self.text_, l_end) and self.more():
+                continue
+            self.pos_ = l_end
+            return l_value
+
+    def seek_member(self, _key: str) -> None:
+        """Move to the array held by the ``_key`` member of the object."""
+        if self.peek(_SKIP_RE) != "{":
+            raise ValueError(f"Expected a JSON object holding '{_key}'")
+        self.pos_ += 1
+
+        l_next = self.peek(_SKIP_RE)
+        while l_next != "}":
+            if l_next != '"':
+                raise ValueError("Expected a JSON object key")
+            l_name = self.decode()
+            if self.peek(_SKIP_RE) != ":":
+                raise ValueError("Expected ':' after a JSON object key")
+            self.pos_ += 1
+            if l_name == _key and self.peek(_SKIP_RE) == "[":
+                return
+            self.decode()
+            l_next = self.separator("}")
+
+        raise ValueError(f"No array member '{_key}' in the JSON object")
+
+    def values(self) -> object:
+        """Yield the elements of the array, or the successive documents."""
+        if self.peek(_SKIP_RE) != "[":
+            while self.peek(_SKIP_RE) != "":
+                yield self.decode()
+            return
+
+        self.pos_ += 1
+        l_next = self.peek(_SKIP_RE)
+        while l_next != "]":
+            if l_next == "":
+                raise ValueError("Unterminated JSON array")
+            yield self.decode()
+            l_next = self.separator("]")
+
+    def separator(self, _close: str) -> str:
+        """Consume one ``,``, return the next character or ``_close``."""
+        l_next = self.peek(_SKIP_RE)
+        if l_next == _close:
+            return l_next
+        if l_next == "":
+            raise ValueError(f"Unterminated JSON, expected '{_close}'")
+        if l_next != ",":
+            raise ValueError(f"Expected ',' or '{_close}' in JSON")
+        self.pos_ += 1
+        l_next = self.peek(_SKIP_RE)
+        if l_next in (_close, ""):
+            raise ValueError("Expected a JSON value after ','")
+        return l_next
@@ -0,0 +1,214 @@
+"""usagemgr module."""
+
+import threading
+
+
+class Usage:
+    """
+    Resources consumed by one command invocation.
+
+    :ivar wall_: Wall-clock duration in seconds.
+    :ivar utime_: User CPU time of the child process in seconds.
+    :ivar stime_: System CPU time of the child process in seconds.
+    :ivar maxrss_: Maximum resident set size of the child process in bytes.
+    :ivar out_bytes_: Number of bytes written to stdout.
+    :ivar err_bytes_: Number of bytes written to stderr.
+    :ivar returncode_: Exit status of the child process.
+    """
+
+    __slots__ = (
+        "wall_",
+        "utime_",
+        "stime_",
+        "maxrss_",
+        "out_bytes_",
+        "err_bytes_",
+        "returncode_",
+    )
+
+    def __init__(
+        self,
+        _wall: float,
+        _utime: float,
+        _stime: float,
+        _maxrss: int,
+        _out_bytes: int,
+        _err_bytes: int,
+        _returncode: int,
+    ):
+        """
+        Initialize the record of one invocation.
+
+        :param _wall: Wall-clock duration in seconds.
+        :type _wall: float
+        :param _utime: User CPU time in seconds.
+        :type _utime: float
+        :param _stime: System CPU time in seconds.
+        :type _stime: float
+        :param _maxrss: Maximum resident set size in bytes.
+        :type _maxrss: int
+        :param _out_bytes: Number of bytes written to stdout.
+        :type _out_bytes: int
+        :param _err_bytes: Number of bytes written to stderr.
+        :type _err_bytes: int
+        :param _returncode: Exit status of the child process.
+        :type _returncode: int
+        """
+        self.wall_ = _wall
+        self.utime_ = _utime
+        self.stime_ = _stime
+        self.maxrss_ = _maxrss
+        self.out_bytes_ = _out_bytes
+        self.err_bytes_ = _err_bytes
+        self.returncode_ = _returncode
+
+
+class UsageMgr:
+    r"""
+    Registry aggregating the resources consumed by commands, per command.
+
+    :func:`cli.clihdr.runc` records a :class:`Usage` into a registry when
+    one is passed through its ``_usage`` parameter, or into the default
+    registry :data:`USAGE_MGR` once it has been enabled. Usages are
+    aggregated per command name, i.e. the base name of the executable, so
+    the heaviest external tools can be found at runtime without touching the
+    call sites.
+
+    For every command name the registry keeps:
+
+    - ``calls`` and ``errors`` (non-zero exit statuses)
+    - ``wall``, ``utime`` and ``stime``: total durations in seconds
+    - ``maxrss``: the largest resident set size seen, in bytes
+    - ``out_bytes`` and ``err_bytes``: total output sizes
+
+    **Examples**
+
+    .. code-block:: python
+
+        from clihdr import runc
+        from usagemgr import USAGE_MGR
+
+        USAGE_MGR.enable()
+        runc(["git", "status", "--porcelain"])
+
+        for name, stats in USAGE_MGR.top("wall", 5):
+            print(name, stats["calls"], stats["wall"])
+
+    Measuring a single call::
+
+        mgr = UsageMgr()
+        runc("du -sh /var", _usage=mgr)
+        print(mgr.get("du"))
+    """
+
+    def __init__(self):
+        """Initialize an empty, disabled registry."""
+        self.enabled_ = False
+        self.stats_ = {}
+        self.lock_ = threading.Lock()
+
+    def enable(self) -> None:
+        """Record every :func:`runc` invocation into this registry."""
+        self.enabled_ = True
+
+    def disable(self) -> None:
+        """Stop recording invocations that do not name this registry."""
+        self.enabled_ = False
+
+    def is_enabled(self) -> bool:
+        """
+        Tell whether every invocation is recorded.
+
+        :return: ``True`` if :meth:`enable` was called.
+        :rtype: bool
+        """
+        return self.enabled_
+
+    def record(self, _name: str, _usage: Usage) -> None:
+        """
+        Add one invocation of the ``_name`` command to the aggregates.
+
+        :param _name: Name of the command.
+        :type _name: str
+        :param _usage: Resources consumed by the invocation.
+        :type _usage: Usage
+        """
+        with self.lock_:
+            l_stats = self.stats_.get(_name)
+            if l_stats is None:
+                l_stats = self.stats_[_name] = dict.fromkeys(_KEYS, 0)
+
+            l_stats["calls"] += 1
+            l_stats["errors"] += _usage.returncode_ != 0
+            l_stats["wall"] += _usage.wall_
+            l_stats["utime"] += _usage.utime_
+            l_stats["stime"] += _usage.stime_
+            l_stats["maxrss"] = max(l_stats["maxrss"], _usage.maxrss_)
+            l_stats["out_bytes"] += _usage.out_bytes_
+            l_stats["err_bytes"] += _usage.err_bytes_
+
+    def get(self, _name: str) -> dict[str, float] | None:
+        """
+        Return the aggregates of a command.
+
+        :param _name: Name of the command.
+        :type _name: str
+        :return: A copy of the aggregates, or ``None`` if the command was
+                 never recorded.
+        :rtype: dict[str, float] | None
+        """
+        with self.lock_:
+            l_stats = self.stats_.get(_name)
+            return None if l_stats is None else dict(l_stats)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """
+        Return the aggregates of every command.
+
+        :return: A copy of the aggregates, keyed by command name.
+        :rtype: dict[str, dict[str, float]]
+        """
+        with self.lock_:
+            return {
+                iname: dict(istats) for iname, istats in self.stats_.items()
+            }
+
+    def top(
+        self, _key: str = "wall", _n: int = 10
+    ) -> list[tuple[str, dict[str, float]]]:
+        """
+        Return the commands with the highest value of an aggregate.
+
+        :param _key: Aggregate to sort on, e.g. ``wall`` or ``maxrss``.
+        :type _key: str
+        :param _n: Number of commands returned.
+        :type _n: int
+        :return: ``(name, aggregates)`` pairs, in decreasing order.
+        :rtype: list[tuple[str, dict[str, float]]]
+        :raises ValueError: If ``_key`` is not an aggregate.
+        """
+        if _key not in _KEYS:
+            raise ValueError(f"Unknown usage key '{_key}'")
+
+        l_items = self.snapshot().items()
+        return sorted(l_items, key=lambda i: i[1][_key], reverse=True)[:_n]
+
+    def reset(self) -> None:
+        """Forget every recorded invocation."""
+        with self.lock_:
+            self.stats_.clear()
+
+
+_KEYS = (
+    "calls",
+    "errors",
+    "wall",
+    "utime",
+    "stime",
+    "maxrss",
+    "out_bytes",
+    "err_bytes",
+)
+
+USAGE_MGR = UsageMgr()
+"""Default registry, recording every invocation once enabled."""
@@ -5,6 +5,8 @@ This module provides a minimal JSON file reader and writer.
 
 import json
 
+from typehdr.recordhdr import SLOTS, RecordHdr
+
 
 class JsonMgr:
     r"""
@@ -94,6 +96,42 @@ class JsonMgr:
         except ValueError as e:
             raise ValueError(str(e)) from e
 
+    def read_records(
+        self, _fields: tuple[str, ...] | None = None, _kind: str = SLOTS
+    ) -> object:
+        """
+        Read JSON data from the file, decoding objects into compact records.
+
+        Large arrays of same-shaped objects then take a fraction of the
+        memory of ``dict`` objects, see :class:`RecordHdr`.
+
+        :param _fields: Keys of the objects decoded as records, the objects
+                        of arrays of same-shaped objects if ``None``.
+        :type _fields: tuple[str, ...], optional
+        :param _kind: ``SLOTS`` or ``NAMEDTUPLE``.
+        :type _kind: str
+        :returns: Parsed JSON data, holding records.
+        :rtype: object
+
+        :raises FileNotFoundError: If the file does not exist.
+        :raises ValueError: If the file contains invalid JSON, or the record
+            shape is invalid.
+
+        **Example**
+
+        .. code-block:: python
+
+            hosts = JsonMgr("inventory.json").read_records(("name", "ip"))
+            print(hosts[0].name)
+        """
+        try:
+            with open(self.filepath_, "r", encoding="utf-8") as f:
+                return RecordHdr.load(f, _fields, _kind)
+        except FileNotFoundError as e:
+            raise FileNotFoundError(str(e)) from e
+        except ValueError as e:
+            raise ValueError(str(e)) from e
+
     def write(self, _data: object, _options: object | None = None) -> None:
         """
         Serialize and write data to a JSON file.
@@ -0,0 +1,215 @@
+"""aggregator module."""
+
+import multiprocessing
+import multiprocessing.pool
+import os
+import threading
+
+from multiprocessing import util
+
+from metric.exporter import Flusher
+from metric.registry import REGISTRY, Registry
+
+DEFAULT_INTERVAL = 1.0
+# Forking copies the locks held by the threads of the parent, e.g. the
+# merging thread of the aggregator, into a child without those threads.
+DEFAULT_CONTEXT = (
+    "forkserver"
+    if "forkserver" in multiprocessing.get_all_start_methods()
+    else "spawn"
+)
+
+
+def queue_sink(_queue: object) -> callable:
+    """
+    Return a :class:`Flusher` sink pushing every delta to a queue.
+
+    Empty deltas are not pushed. A message is ``(pid, dump)``, ``dump``
+    being the state of the delta registry, see :meth:`Registry.dump`.
+
+    :param _queue: Queue shared with the aggregating process.
+    :type _queue: multiprocessing.Queue
+    :return: Callable taking the cumulative and the delta registries.
+    :rtype: Callable
+    """
+
+    def sink(_cumulative: Registry, _delta: Registry) -> None:
+        l_dump = _delta.dump()
+        if l_dump:
+            _queue.put((os.getpid(), l_dump))
+
+    return sink
+
+
+def worker_init(
+    _queue: object,
+    _interval: float = DEFAULT_INTERVAL,
+    _registry: Registry | None = None,
+) -> Flusher:
+    """
+    Start pushing the metrics of the current process to an aggregator.
+
+    Meant as the ``initializer`` of a process pool, see
+    :meth:`Aggregator.initargs`. A :class:`Flusher` pushes the values
+    recorded since its previous flush every ``_interval`` seconds, and one
+    last time when the process exits normally. Values inherited from the
+    parent through ``fork`` are not pushed.
+
+    :param _queue: Queue of the aggregator.
+    :type _queue: multiprocessing.Queue
+    :param _interval: Seconds between two pushes.
+    :type _interval: float
+    :param _registry: Registry to push, :data:`REGISTRY` by default.
+    :type _registry: Registry, optional
+    :return: The started flusher.
+    :rtype: Flusher
+    """
+    l_flusher = Flusher(_interval, _registry, [queue_sink(_queue)])
+    # The first delta is computed against the values inherited on fork.
+    l_flusher.cumulative_ = l_flusher.registry_.copy()
+    l_flusher.start()
+    # Pool workers leave through os._exit: atexit handlers would not run.
+    # The last push must precede the finalizer closing the queue, of
+    # priority 10.
+    util.Finalize(None, l_flusher.stop, exitpriority=100)
+    return l_flusher
+
+
+class Aggregator:
+    r"""
+    Merger of the metrics recorded by worker processes.
+
+    Workers started with :func:`worker_init` push the values recorded by
+    :func:`metric.observer.measure` to the queue of the aggregator at a
+    fixed interval, as deltas of their registry, so a measured call costs
+    no inter-process communication. A thread of the parent process merges
+    every delta into ``_registry``, which then holds the statistics of the
+    whole pool, next to those of the parent itself.
+
+    Values recorded after the last push of a worker that is killed, e.g.
+    by ``Pool.terminate``, are lost: close and join pools instead.
+
+    :param _registry: Registry receiving the merged values,
+                      :data:`REGISTRY` by default.
+    :type _registry: Registry, optional
+    :param _context: Multiprocessing start method, :data:`DEFAULT_CONTEXT`
+                     by default: ``forkserver`` where available, ``spawn``
+                     otherwise. ``fork`` is unsafe here: a worker forked
+                     while a thread of the parent holds the lock of a
+                     histogram inherits it locked, and blocks on its first
+                     measured call.
+    :type _context: str, optional
+
+    **Examples**
+
+    .. code-block:: python
+
+        from aggregator import Aggregator
+        from registry import REGISTRY
+
+        with Aggregator() as agg:
+            with agg.pool(8) as pool:
+                pool.map(work, items)
+                pool.close()
+                pool.join()
+        print(REGISTRY.snapshot())
+
+    With :class:`concurrent.futures.ProcessPoolExecutor`::
+
+        agg = Aggregator()
+        agg.start()
+        with ProcessPoolExecutor(
+            mp_context=agg.context_,
+            initializer=worker_init,
+            initargs=agg.initargs(),
+        ) as executor:
+            list(executor.map(work, items))
+        agg.stop()
+    """
+
+    def __init__(
+        self,
+        _registry: Registry | None = None,
+        _context: str | None = DEFAULT_CONTEXT,
+    ):
+        """
+        Initialize a stopped aggregator and its queue.
+
+        :param _registry: Registry receiving the merged values.
+        :type _registry: Registry, optional
+        :param _context: Multiprocessing start method, the platform default
+                         if ``None``.
+        :type _context: str, optional
+        """
+        self.registry_ = REGISTRY if _registry is None else _registry
+        self.context_ = multiprocessing.get_context(_context)
+        self.queue_ = self.context_.Queue()
+        self.workers_ = set()
+        self.messages_ = 0
+        self.thread_ = None
+
+    def __enter__(self) -> "Aggregator":
+        """Start the aggregator."""
+        self.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        """Merge the pending deltas and stop the aggregator."""
+        self.stop()
+
+    def start(self) -> None:
+        """Start merging the deltas pushed by the workers."""
+        if self.thread_ is not None:
+            return
+
+        self.thread_ = threading.Thread(
+            target=self._run, name="metric-aggregator", daemon=True
+        )
+        self.thread_.start()
+
+    def stop(self) -> None:
+        """Merge the deltas pushed so far, then stop merging."""
+        if self.thread_ is None:
+            return
+
+        self.queue_.put(None)
+        self.thread_.join()
+        self.thread_ = None
+
+    def initargs(self, _interval: float = DEFAULT_INTERVAL) -> tuple:
+        """
+        Return the pool ``initargs`` of :func:`worker_init`.
+
+        :param _interval: Seconds between two pushes of a worker.
+        :type _interval: float
+        :return: Arguments of :func:`worker_init`.
+        :rtype: tuple
+        """
+        return self.queue_, _interval
+
+    def pool(
+        self,
+        _processes: int | None = None,
+        _interval: float = DEFAULT_INTERVAL,
+    ) -> multiprocessing.pool.Pool:
+        """
+        Create a process pool whose workers push their metrics here.
+
+        :param _processes: Number of workers, the CPU count by default.
+        :type _processes: int, optional
+        :param _interval: Seconds between two pushes of a worker.
+        :type _interval: float
+        :return: The pool.
+        :rtype: multiprocessing.pool.Pool
+        """
+        return self.context_.Pool(
+            _processes, worker_init, self.initargs(_interval)
+        )
+
+    def _run(self) -> None:
+        """Merge the queued deltas until the stop sentinel."""
+        for imessage in iter(self.queue_.get, None):
+            l_pid, l_dump = imessage
+            self.registry_.merge(l_dump)
+            self.workers_.add(l_pid)
+            self.messages_ += 1
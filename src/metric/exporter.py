@@ -0,0 +1,477 @@
+"""exporter module."""
+
+import json
+import os
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fio.jsonmgr import JsonMgr
+from metric.registry import (
+    DURATION,
+    FIRST_ITEM,
+    ITEMS,
+    NET_BYTES,
+    PEAK_BYTES,
+    REGISTRY,
+    Histogram,
+    Registry,
+    bucket_index,
+)
+
+DEFAULT_METRIC = "xpylib_measure"
+
+# Prometheus histogram families: kind of the histograms, help, scale from
+# the recorded unit and inclusive bucket boundaries, 2**k - 1 in the
+# recorded unit.
+_NS_BOUNDS = tuple((1 << ik) - 1 for ik in range(10, 38, 2))
+_BYTES_BOUNDS = tuple((1 << ik) - 1 for ik in range(10, 42, 2))
+FAMILIES = {
+    "duration_seconds": (
+        DURATION,
+        "Durations of the calls measured by metric.observer.measure.",
+        1e-9,
+        _NS_BOUNDS,
+    ),
+    "first_item_seconds": (
+        FIRST_ITEM,
+        "Time to the first item of the measured generators.",
+        1e-9,
+        _NS_BOUNDS,
+    ),
+    "items": (
+        ITEMS,
+        "Items produced by the measured generators.",
+        1,
+        tuple((1 << ik) - 1 for ik in range(0, 32, 2)),
+    ),
+    "peak_bytes": (
+        PEAK_BYTES,
+        "Peak memory allocated by the measured calls.",
+        1,
+        _BYTES_BOUNDS,
+    ),
+    "net_bytes": (
+        NET_BYTES,
+        "Memory allocated and kept by the measured calls.",
+        1,
+        _BYTES_BOUNDS,
+    ),
+}
+
+_FORMATS = ("prometheus", "json")
+_PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_JSON_TYPE = "application/json"
+
+
+def to_prometheus(
+    _registry: Registry | None = None, _metric: str = DEFAULT_METRIC
+) -> str:
+    """
+    Render a registry in the Prometheus text exposition format.
+
+    Histograms are grouped into one histogram family per kind of value,
+    named after ``_metric`` and the unit, see :data:`FAMILIES`:
+
+    - ``{_metric}_duration_seconds``: durations of the measured calls
+    - ``{_metric}_first_item_seconds``: time to the first item of the
+      measured generators, histograms of kind ``first_item``
+    - ``{_metric}_items``: items produced, histograms of kind ``items``
+    - ``{_metric}_peak_bytes`` and ``{_metric}_net_bytes``: memory of the
+      calls, histograms of kinds ``peak_bytes`` and ``net_bytes``
+
+    Every histogram becomes one series of its family, labelled with the
+    name of the measured function; histograms of another kind are left
+    out. Durations, recorded in nanoseconds, are
+    written in seconds. Every series has the same fixed ``le`` boundaries,
+    powers of 4 of the recorded unit, empty or not, so that ``rate()`` and
+    ``histogram_quantile()`` always combine the same buckets. The
+    ``+Inf`` bucket, the ``_sum`` and the ``_count`` samples follow.
+
+    :param _registry: Registry to render, :data:`REGISTRY` by default.
+    :type _registry: Registry, optional
+    :param _metric: Prefix of the metric families.
+    :type _metric: str
+    :return: The exposition text, ending with a newline.
+    :rtype: str
+
+    **Example**
+
+    With ``_metric="app"``:
+
+    .. code-block:: text
+
+        # TYPE app_duration_seconds histogram
+        app_duration_seconds_bucket{name="app.parse",le="1.023e-06"} 0
+        app_duration_seconds_bucket{name="app.parse",le="4.095e-06"} 0
+        app_duration_seconds_bucket{name="app.parse",le="1.6383e-05"} 1
+        ...
+        app_duration_seconds_bucket{name="app.parse",le="+Inf"} 1
+        app_duration_seconds_sum{name="app.parse"} 5.12e-06
+        app_duration_seconds_count{name="app.parse"} 1
+    """
+    l_registry = REGISTRY if _registry is None else _registry
+    l_series = {}
+    l_histograms = l_registry.copy().histograms_
+    for (iname, ikind), ihist in sorted(l_histograms.items()):
+        l_series.setdefault(ikind, []).append((iname, ihist))
+
+    l_lines = []
+    for ifamily, (ikind, ihelp, iscale, ibounds) in FAMILIES.items():
+        if ikind not in l_series:
+            continue
+        l_family = f"{_metric}_{ifamily}"
+        l_lines.append(f"# HELP {l_family} {ihelp}")
+        l_lines.append(f"# TYPE {l_family} histogram")
+        for iname, ihist in l_series[ikind]:
+            l_label = f'name="{_escape(iname)}"'
+            for ile, icount in _cumulative(ihist, ibounds):
+                l_lines.append(
+                    f"{l_family}_bucket{{{l_label},"
+                    f'le="{_number(ile, iscale)}"}} {icount}'
+                )
+            l_lines.append(
+                f'{l_family}_bucket{{{l_label},le="+Inf"}} {ihist.count_}'
+            )
+            l_lines.append(
+                f"{l_family}_sum{{{l_label}}} "
+                f"{_number(ihist.sum_, iscale)}"
+            )
+            l_lines.append(f"{l_family}_count{{{l_label}}} {ihist.count_}")
+
+    return "\n".join(l_lines) + "\n"
+
+
+def _cumulative(
+    _hist: Histogram, _bounds: tuple[int, ...]
+) -> list[tuple[int, int]]:
+    """Return the count of values up to every inclusive bound."""
+    l_counts = []
+    l_seen = 0
+    l_start = 0
+    for ibound in _bounds:
+        # Powers of 2 start a bucket: the buckets below hold values up to
+        # the bound, without estimation.
+        l_end = bucket_index(ibound + 1)
+        l_seen += sum(_hist.counts_[l_start:l_end])
+        l_start = l_end
+        l_counts.append((ibound, l_seen))
+    return l_counts
+
+
+def _number(_value: int, _scale: float) -> str:
+    """Return a value in the unit of its family."""
+    if _scale == 1:
+        return str(_value)
+    return f"{_value * _scale:.9g}"
+
+
+def to_json(_registry: Registry | None = None) -> dict:
+    """
+    Return a JSON-serializable snapshot of a registry.
+
+    :param _registry: Registry to snapshot, :data:`REGISTRY` by default.
+    :type _registry: Registry, optional
+    :return: Dictionary with the ``timestamp`` of the snapshot, in seconds
+             since the epoch, and the ``metrics`` statistics keyed by
+             histogram name, see :meth:`Registry.snapshot`.
+    :rtype: dict
+    """
+    l_registry = REGISTRY if _registry is None else _registry
+    return {"timestamp": time.time(), "metrics": l_registry.snapshot()}
+
+
+def write(
+    _filepath: str,
+    _registry: Registry | None = None,
+    _format: str = "prometheus",
+) -> None:
+    """
+    Write a registry to a file, atomically.
+
+    The content is written to a temporary file next to ``_filepath`` and
+    renamed over it, so a reader, e.g. the node exporter textfile collector,
+    never sees a partial file.
+
+    :param _filepath: Path of the file.
+    :type _filepath: str
+    :param _registry: Registry to write, :data:`REGISTRY` by default.
+    :type _registry: Registry, optional
+    :param _format: ``prometheus`` or ``json``.
+    :type _format: str
+    :raises ValueError: If the format is unknown.
+    :raises FileNotFoundError: If the directory of the file does not exist.
+    """
+    if _format not in _FORMATS:
+        raise ValueError(f"Unknown metrics format '{_format}'")
+
+    l_tmp = f"{_filepath}.{os.getpid()}.tmp"
+    try:
+        if _format == "json":
+            JsonMgr(l_tmp).write(to_json(_registry))
+        else:
+            with open(l_tmp, "w", encoding="utf-8") as l_file:
+                l_file.write(to_prometheus(_registry))
+        os.replace(l_tmp, _filepath)
+    finally:
+        if os.path.exists(l_tmp):
+            os.remove(l_tmp)
+
+
+def file_sink(
+    _filepath: str, _format: str = "prometheus", _delta: bool = False
+) -> callable:
+    """
+    Return a :class:`Flusher` sink writing every flush to a file.
+
+    :param _filepath: Path of the file, rewritten on every flush.
+    :type _filepath: str
+    :param _format: ``prometheus`` or ``json``.
+    :type _format: str
+    :param _delta: Write the values of the last interval instead of the
+                   cumulative ones.
+    :type _delta: bool
+    :return: Callable taking the cumulative and the delta registries.
+    :rtype: Callable
+    :raises ValueError: If the format is unknown.
+    """
+    if _format not in _FORMATS:
+        raise ValueError(f"Unknown metrics format '{_format}'")
+
+    def sink(_cumulative: Registry, _delta_registry: Registry) -> None:
+        write(_filepath, _delta_registry if _delta else _cumulative, _format)
+
+    return sink
+
+
+class Flusher:
+    r"""
+    Background thread taking periodic snapshots of a registry.
+
+    Every ``_interval`` seconds the flusher copies the registry, computes
+    the values recorded since the previous flush and passes both to every
+    sink as ``sink(cumulative, delta)``. The copies are taken histogram by
+    histogram, each lock being held only while a bucket array is copied, so
+    the measured functions are not blocked by exporting.
+
+    The latest snapshots are kept in :attr:`cumulative_` and
+    :attr:`delta_`, e.g. for :func:`serve`. A sink raising an exception
+    does not stop the thread; the exception is kept in :attr:`error_`.
+
+    :param _interval: Seconds between two flushes.
+    :type _interval: float
+    :param _registry: Registry to flush, :data:`REGISTRY` by default.
+    :type _registry: Registry, optional
+    :param _sinks: Callables receiving the cumulative and delta registries.
+    :type _sinks: Iterable[Callable], optional
+
+    **Examples**
+
+    .. code-block:: python
+
+        from exporter import Flusher, file_sink, serve
+
+        flusher = Flusher(
+            15.0,
+            _sinks=[
+                file_sink("/var/lib/node_exporter/app.prom"),
+                file_sink("interval.json", "json", _delta=True),
+            ],
+        )
+        flusher.start()
+        server = serve(9464, _flusher=flusher)
+        ...
+        server.shutdown()
+        flusher.stop()  # flushes one last time
+    """
+
+    def __init__(
+        self,
+        _interval: float = 10.0,
+        _registry: Registry | None = None,
+        _sinks: object = (),
+    ):
+        """
+        Initialize a stopped flusher.
+
+        :param _interval: Seconds between two flushes.
+        :type _interval: float
+        :param _registry: Registry to flush, :data:`REGISTRY` by default.
+        :type _registry: Registry, optional
+        :param _sinks: Callables receiving the cumulative and delta
+                       registries.
+        :type _sinks: Iterable[Callable], optional
+        :raises ValueError: If the interval is not positive.
+        """
+        if _interval <= 0:
+            raise ValueError(f"Flush interval must be positive: {_interval}")
+
+        self.interval_ = _interval
+        self.registry_ = REGISTRY if _registry is None else _registry
+        self.sinks_ = list(_sinks)
+        self.cumulative_ = Registry()
+        self.delta_ = Registry()
+        self.error_ = None
+        self.lock_ = threading.Lock()
+        self.stop_ = threading.Event()
+        self.thread_ = None
+
+    def __enter__(self) -> "Flusher":
+        """Start the flusher."""
+        self.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        """Stop the flusher, flushing one last time."""
+        self.stop()
+
+    def start(self) -> None:
+        """Start the background thread, if not already running."""
+        if self.thread_ is not None and self.thread_.is_alive():
+            return
+
+        self.stop_.clear()
+        self.thread_ = threading.Thread(
+            target=self._run, name="metric-flusher", daemon=True
+        )
+        self.thread_.start()
+
+    def stop(self, _flush: bool = True) -> None:
+        """
+        Stop the background thread.
+
+        :param _flush: Flush one last time once the thread is stopped.
+        :type _flush: bool
+        """
+        self.stop_.set()
+        if self.thread_ is not None:
+            self.thread_.join()
+            self.thread_ = None
+        if _flush:
+            self.flush()
+
+    def is_running(self) -> bool:
+        """
+        Tell whether the background thread is running.
+
+        :return: ``True`` between :meth:`start` and :meth:`stop`.
+        :rtype: bool
+        """
+        return self.thread_ is not None and self.thread_.is_alive()
+
+    def flush(self) -> tuple[Registry, Registry]:
+        """
+        Snapshot the registry now and pass the snapshots to every sink.
+
+        :return: The cumulative registry and the values recorded since the
+                 previous flush.
+        :rtype: tuple[Registry, Registry]
+        :raises Exception: Whatever a sink raises, after every sink ran.
+        """
+        with self.lock_:
+            l_cumulative = self.registry_.copy()
+            l_delta = l_cumulative.delta(self.cumulative_)
+            self.cumulative_ = l_cumulative
+            self.delta_ = l_delta
+
+            l_error = None
+            for isink in self.sinks_:
+                try:
+                    isink(l_cumulative, l_delta)
+                except Exception as e:  # pylint: disable=broad-except
+                    l_error = e
+            if l_error is not None:
+                raise l_error
+        return l_cumulative, l_delta
+
+    def _run(self) -> None:
+        """Flush every interval until stopped."""
+        while not self.stop_.wait(self.interval_):
+            try:
+                self.flush()
+            except Exception as e:  # pylint: disable=broad-except
+                self.error_ = e
+
+
+def serve(
+    _port: int = 9464,
+    _registry: Registry | None = None,
+    _flusher: Flusher | None = None,
+    _host: str = "127.0.0.1",
+) -> ThreadingHTTPServer:
+    """
+    Serve the metrics over HTTP from a background thread.
+
+    The server answers:
+
+    - ``/metrics``: the Prometheus text exposition format
+    - ``/metrics.json``: the JSON snapshot, see :func:`to_json`
+    - ``/delta`` and ``/delta.json``: the values of the last interval of
+      ``_flusher``, only when a flusher is given
+
+    With a flusher, the snapshots of its last flush are served instead of
+    the live registry, so scraping costs no copy. The server listens on the
+    loopback interface by default; call ``shutdown()`` on the returned
+    server to stop it.
+
+    :param _port: TCP port, ``0`` picking a free one.
+    :type _port: int
+    :param _registry: Registry served without a flusher, :data:`REGISTRY`
+                      by default.
+    :type _registry: Registry, optional
+    :param _flusher: Flusher whose snapshots are served.
+    :type _flusher: Flusher, optional
+    :param _host: Address to listen on.
+    :type _host: str
+    :return: The running server, its address in ``server_address``.
+    :rtype: ThreadingHTTPServer
+    :raises OSError: If the address cannot be bound.
+    """
+    l_registry = REGISTRY if _registry is None else _registry
+
+    def registries() -> dict[str, Registry]:
+        if _flusher is None:
+            return {"/metrics": l_registry}
+        return {"/metrics": _flusher.cumulative_, "/delta": _flusher.delta_}
+
+    class Handler(BaseHTTPRequestHandler):
+        """Handler of the metrics endpoints."""
+
+        def do_GET(self) -> None:  # pylint: disable=invalid-name
+            """Answer with the requested metrics."""
+            l_path, _, l_ext = self.path.partition("?")[0].partition(".")
+            l_target = registries().get(l_path)
+            if l_target is None or l_ext not in ("", "json"):
+                self.send_error(404)
+                return
+
+            if l_ext == "json":
+                l_body = json.dumps(to_json(l_target)).encode()
+                l_type = _JSON_TYPE
+            else:
+                l_body = to_prometheus(l_target).encode()
+                l_type = _PROMETHEUS_TYPE
+
+            self.send_response(200)
+            self.send_header("Content-Type", l_type)
+            self.send_header("Content-Length", str(len(l_body)))
+            self.end_headers()
+            self.wfile.write(l_body)
+
+        def log_message(self, *_args) -> None:
+            """Keep the requests out of stderr."""
+
+    l_server = ThreadingHTTPServer((_host, _port), Handler)
+    l_server.daemon_threads = True
+    threading.Thread(
+        target=l_server.serve_forever, name="metric-server", daemon=True
+    ).start()
+    return l_server
+
+
+def _escape(_value: str) -> str:
+    """Escape a Prometheus label value."""
+    return (
+        _value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
@@ -0,0 +1,449 @@
+"""registry module."""
+
+import threading
+
+# Every power of two is split into 2**_SUB_BITS buckets, which bounds the
+# relative error of a bucket to 1 / 2**_SUB_BITS.
+_SUB_BITS = 2
+_SUB_COUNT = 1 << _SUB_BITS
+_BUCKETS = (64 - _SUB_BITS + 1) << _SUB_BITS
+_EMPTY_MIN = 1 << 64
+
+# Kinds of value recorded by a histogram. A measured function owns one
+# histogram of every kind it records, all under the name of the function.
+DURATION = "duration"
+FIRST_ITEM = "first_item"
+ITEMS = "items"
+PEAK_BYTES = "peak_bytes"
+NET_BYTES = "net_bytes"
+KINDS = (DURATION, FIRST_ITEM, ITEMS, PEAK_BYTES, NET_BYTES)
+
+
+def bucket_index(_value: int) -> int:
+    """
+    Return the histogram bucket of a non-negative integer value.
+
+    Values below ``4`` have a bucket of their own. Above, every power of two
+    is split into 4 buckets of equal width, so a bucket spans at most 25%
+    of its lower bound.
+
+    :param _value: Value to classify, lower than ``2**64``.
+    :type _value: int
+    :return: Index of the bucket holding ``_value``.
+    :rtype: int
+    """
+    l_bits = _value.bit_length()
+    if l_bits <= _SUB_BITS:
+        return _value
+    l_octave = (l_bits - _SUB_BITS) << _SUB_BITS
+    return l_octave + (_value >> (l_bits - _SUB_BITS - 1)) - _SUB_COUNT
+
+
+def bucket_bounds(_index: int) -> tuple[int, int]:
+    """
+    Return the range of values held by a bucket.
+
+    :param _index: Index of the bucket.
+    :type _index: int
+    :return: ``(lower, upper)`` bounds, the upper one being exclusive.
+    :rtype: tuple[int, int]
+    """
+    if _index < _SUB_COUNT:
+        return _index, _index + 1
+    l_shift = (_index >> _SUB_BITS) - 1
+    l_mantissa = (_index & (_SUB_COUNT - 1)) + _SUB_COUNT
+    return l_mantissa << l_shift, (l_mantissa + 1) << l_shift
+
+
+class Histogram:
+    r"""
+    Log-bucketed histogram of non-negative integer values.
+
+    Values, typically durations in nanoseconds, are counted in a fixed array
+    of logarithmic buckets allocated once, so recording a value does not
+    allocate any container. The exact count, sum, minimum and maximum are
+    kept alongside; percentiles are estimated from the buckets, with a
+    relative error below 25%.
+
+    Recording is thread-safe.
+
+    :param _name: Name of the histogram.
+    :type _name: str
+    :param _kind: Kind of the recorded values, one of :data:`KINDS`.
+    :type _kind: str
+
+    **Examples**
+
+    >>> h = Histogram("parse")
+    >>> for v in (100, 200, 300):
+    ...     h.record(v)
+    >>> h.count_, h.sum_, h.min_, h.max_
+    (3, 600, 100, 300)
+    >>> h.percentile(0.5)
+    207
+    """
+
+    __slots__ = (
+        "name_",
+        "kind_",
+        "counts_",
+        "count_",
+        "sum_",
+        "min_",
+        "max_",
+        "lock_",
+    )
+
+    def __init__(self, _name: str, _kind: str = DURATION):
+        """
+        Initialize an empty histogram.
+
+        :param _name: Name of the histogram.
+        :type _name: str
+        :param _kind: Kind of the recorded values, one of :data:`KINDS`.
+        :type _kind: str
+        """
+        self.name_ = _name
+        self.kind_ = _kind
+        self.counts_ = [0] * _BUCKETS
+        self.count_ = 0
+        self.sum_ = 0
+        self.min_ = _EMPTY_MIN
+        self.max_ = 0
+        self.lock_ = threading.Lock()
+
+    def record(self, _value: int) -> None:
+        """
+        Add one value to the histogram.
+
+        :param _value: Non-negative value, lower than ``2**64``.
+        :type _value: int
+        """
+        # Inlined bucket_index, with the constants spelled out: this is the
+        # hot path of every measured call.
+        l_bits = _value.bit_length()
+        if l_bits <= 2:
+            l_index = _value
+        else:
+            l_index = ((l_bits - 2) << 2) + (_value >> (l_bits - 3)) - 4
+
+        with self.lock_:
+            self.counts_[l_index] += 1
+            self.count_ += 1
+            self.sum_ += _value
+            if _value < self.min_:
+                self.min_ = _value
+            if _value > self.max_:
+                self.max_ = _value
+
+    def percentile(self, _q: float) -> int:
+        """
+        Estimate the value below which a fraction ``_q`` of values fall.
+
+        The estimate is the middle of the bucket holding the percentile,
+        clamped to the exact minimum and maximum.
+
+        :param _q: Fraction between ``0`` and ``1``, e.g. ``0.99``.
+        :type _q: float
+        :return: Estimated percentile, ``0`` if the histogram is empty.
+        :rtype: int
+        """
+        with self.lock_:
+            if self.count_ == 0:
+                return 0
+            l_rank = max(1, round(_q * self.count_))
+            l_seen = 0
+            for iindex, icount in enumerate(self.counts_):
+                l_seen += icount
+                if l_seen >= l_rank:
+                    break
+            l_lower, l_upper = bucket_bounds(iindex)
+            l_value = (l_lower + l_upper - 1) // 2
+            return min(max(l_value, self.min_), self.max_)
+
+    def snapshot(self) -> dict[str, int | float]:
+        """
+        Return the statistics of the histogram.
+
+        :return: Dictionary with the ``count``, ``sum``, ``min``, ``max``,
+                 ``mean``, ``p50``, ``p95`` and ``p99`` keys.
+        :rtype: dict[str, int | float]
+        """
+        with self.lock_:
+            l_count = self.count_
+            l_sum = self.sum_
+            l_min = self.min_ if l_count else 0
+            l_max = self.max_
+        return {
+            "count": l_count,
+            "sum": l_sum,
+            "min": l_min,
+            "max": l_max,
+            "mean": l_sum / l_count if l_count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+    def copy(self) -> "Histogram":
+        """
+        Return a consistent copy of the histogram.
+
+        The lock is held only while the bucket array is copied, so taking a
+        copy barely delays the threads recording values.
+
+        :return: A new histogram with the same values.
+        :rtype: Histogram
+        """
+        l_copy = Histogram(self.name_, self.kind_)
+        with self.lock_:
+            l_copy.counts_[:] = self.counts_
+            l_copy.count_ = self.count_
+            l_copy.sum_ = self.sum_
+            l_copy.min_ = self.min_
+            l_copy.max_ = self.max_
+        return l_copy
+
+    def delta(self, _previous: "Histogram | None") -> "Histogram":
+        """
+        Return the values recorded since an earlier copy.
+
+        The minimum and maximum of the difference are estimated from its
+        buckets, clamped to the exact minimum and maximum of the histogram.
+
+        :param _previous: Earlier copy of the histogram, ``None`` meaning
+                          every value.
+        :type _previous: Histogram | None
+        :return: A new histogram holding the difference, or a copy of the
+                 histogram if it has been reset since ``_previous``.
+        :rtype: Histogram
+        """
+        l_delta = self.copy()
+        if _previous is None or _previous.count_ > l_delta.count_:
+            return l_delta
+
+        l_counts = l_delta.counts_
+        for iindex, icount in enumerate(_previous.counts_):
+            if icount:
+                l_counts[iindex] -= icount
+        l_delta.count_ -= _previous.count_
+        l_delta.sum_ -= _previous.sum_
+
+        l_used = [iindex for iindex, icount in enumerate(l_counts) if icount]
+        if not l_used:
+            l_delta.min_ = _EMPTY_MIN
+            l_delta.max_ = 0
+            return l_delta
+        l_delta.min_ = max(bucket_bounds(l_used[0])[0], l_delta.min_)
+        l_delta.max_ = min(bucket_bounds(l_used[-1])[1] - 1, l_delta.max_)
+        return l_delta
+
+    def dump(self) -> tuple:
+        """
+        Return the state of the histogram as plain, picklable data.
+
+        :return: ``(buckets, count, sum, min, max)``, ``buckets`` mapping
+                 the index of every non-empty bucket to its count.
+        :rtype: tuple
+        """
+        with self.lock_:
+            l_buckets = {
+                iindex: icount
+                for iindex, icount in enumerate(self.counts_)
+                if icount
+            }
+            return l_buckets, self.count_, self.sum_, self.min_, self.max_
+
+    def merge(self, _dump: tuple) -> None:
+        """
+        Add the values of another histogram to this one.
+
+        :param _dump: State of the other histogram, from :meth:`dump`.
+        :type _dump: tuple
+        """
+        l_buckets, l_count, l_sum, l_min, l_max = _dump
+        with self.lock_:
+            for iindex, icount in l_buckets.items():
+                self.counts_[iindex] += icount
+            self.count_ += l_count
+            self.sum_ += l_sum
+            if l_min < self.min_:
+                self.min_ = l_min
+            if l_max > self.max_:
+                self.max_ = l_max
+
+    def reset(self) -> None:
+        """Forget every recorded value."""
+        with self.lock_:
+            self.counts_[:] = [0] * _BUCKETS
+            self.count_ = 0
+            self.sum_ = 0
+            self.min_ = _EMPTY_MIN
+            self.max_ = 0
+
+
+class Registry:
+    r"""
+    In-process registry of named histograms.
+
+    :func:`metric.observer.measure` records the duration of every call of a
+    decorated function, in nanoseconds, into the histogram named after the
+    function in :data:`REGISTRY`, unless another registry is given.
+
+    **Examples**
+
+    .. code-block:: python
+
+        from observer import measure
+        from registry import REGISTRY
+
+        @measure
+        def parse(data):
+            ...
+
+        parse(payload)
+        print(REGISTRY.snapshot())
+        # {'app.parse': {'count': 1, 'sum': 5120, 'min': 5120, ...}}
+
+    Histograms are keyed by name and kind, so the histograms derived from a
+    measured function, e.g. the peak bytes of its calls, are told apart
+    from its durations without parsing their names.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.histograms_ = {}
+        self.lock_ = threading.Lock()
+
+    def histogram(self, _name: str, _kind: str = DURATION) -> Histogram:
+        """
+        Return the histogram of a name and kind, creating it if needed.
+
+        :param _name: Name of the histogram.
+        :type _name: str
+        :param _kind: Kind of the recorded values, one of :data:`KINDS`.
+        :type _kind: str
+        :return: The histogram.
+        :rtype: Histogram
+        """
+        l_histogram = self.histograms_.get((_name, _kind))
+        if l_histogram is None:
+            with self.lock_:
+                l_histogram = self.histograms_.setdefault(
+                    (_name, _kind), Histogram(_name, _kind)
+                )
+        return l_histogram
+
+    def get(self, _name: str, _kind: str = DURATION) -> Histogram | None:
+        """
+        Return the histogram of a name and kind.
+
+        :param _name: Name of the histogram.
+        :type _name: str
+        :param _kind: Kind of the recorded values, one of :data:`KINDS`.
+        :type _kind: str
+        :return: The histogram, or ``None`` if it does not exist.
+        :rtype: Histogram | None
+        """
+        return self.histograms_.get((_name, _kind))
+
+    def snapshot(
+        self, _kind: str | None = None
+    ) -> dict[str, dict[str, int | float]]:
+        """
+        Return the statistics of every histogram.
+
+        Durations are keyed by the name of their histogram, the other kinds
+        by the name followed by the kind, e.g. ``app.parse.peak_bytes``.
+
+        :param _kind: Only return the histograms of this kind, keyed by
+                      name alone.
+        :type _kind: str, optional
+        :return: Statistics of the histograms, see
+                 :meth:`Histogram.snapshot`.
+        :rtype: dict[str, dict[str, int | float]]
+        """
+        with self.lock_:
+            l_histograms = list(self.histograms_.values())
+        if _kind is not None:
+            return {
+                ihist.name_: ihist.snapshot()
+                for ihist in l_histograms
+                if ihist.kind_ == _kind
+            }
+        return {
+            _label(ihist.name_, ihist.kind_): ihist.snapshot()
+            for ihist in l_histograms
+        }
+
+    def copy(self) -> "Registry":
+        """
+        Return a copy of every histogram, see :meth:`Histogram.copy`.
+
+        :return: A new registry holding the copies.
+        :rtype: Registry
+        """
+        with self.lock_:
+            l_histograms = list(self.histograms_.items())
+        l_copy = Registry()
+        for ikey, ihist in l_histograms:
+            l_copy.histograms_[ikey] = ihist.copy()
+        return l_copy
+
+    def delta(self, _previous: "Registry | None") -> "Registry":
+        """
+        Return the values recorded since an earlier copy of the registry.
+
+        :param _previous: Earlier copy, from :meth:`copy`, ``None`` meaning
+                          every value.
+        :type _previous: Registry | None
+        :return: A new registry holding the differences, see
+                 :meth:`Histogram.delta`.
+        :rtype: Registry
+        """
+        l_previous = {} if _previous is None else _previous.histograms_
+        l_delta = Registry()
+        for ikey, ihist in self.copy().histograms_.items():
+            l_delta.histograms_[ikey] = ihist.delta(l_previous.get(ikey))
+        return l_delta
+
+    def dump(self) -> dict[tuple[str, str], tuple]:
+        """
+        Return the state of every non-empty histogram as picklable data.
+
+        :return: States keyed by histogram ``(name, kind)``, see
+                 :meth:`Histogram.dump`.
+        :rtype: dict[tuple[str, str], tuple]
+        """
+        with self.lock_:
+            l_histograms = list(self.histograms_.items())
+        l_dumps = {ikey: ihist.dump() for ikey, ihist in l_histograms}
+        return {ikey: idump for ikey, idump in l_dumps.items() if idump[1]}
+
+    def merge(self, _dump: dict[tuple[str, str], tuple]) -> None:
+        """
+        Add the values of another registry, e.g. of another process.
+
+        Histograms missing from this registry are created.
+
+        :param _dump: State of the other registry, from :meth:`dump`.
+        :type _dump: dict[tuple[str, str], tuple]
+        """
+        for (iname, ikind), idump in _dump.items():
+            self.histogram(iname, ikind).merge(idump)
+
+    def reset(self) -> None:
+        """Forget the values recorded by every histogram."""
+        with self.lock_:
+            l_histograms = list(self.histograms_.values())
+        for ihist in l_histograms:
+            ihist.reset()
+
+
+def _label(_name: str, _kind: str) -> str:
+    """Return the name of a histogram in a snapshot."""
+    return _name if _kind == DURATION else f"{_name}.{_kind}"
+
+
+REGISTRY = Registry()
+"""Default registry used by :func:`metric.observer.measure`."""
@@ -0,0 +1,342 @@
+"""tracer module."""
+
+import contextvars
+import os
+import threading
+
+from collections import deque
+from functools import wraps
+from inspect import iscoroutinefunction
+from itertools import count
+from time import perf_counter_ns
+
+from fio.jsonmgr import JsonMgr
+
+
+class Tracer:
+    r"""
+    Recorder of nested spans, exportable to the Chrome trace format.
+
+    A span is a named, timed section of code, opened with :func:`span` as a
+    context manager or as a decorator. Every span records the span that was
+    open when it started as its parent, so a trace shows that e.g.
+    ``ConfMgr.load`` time is dominated by ``JsonMgr.read``.
+
+    The current span is kept in a :class:`contextvars.ContextVar`, which
+    makes parent/child relationships follow asyncio tasks, since each task
+    starts with a copy of the context of its creator. Threads start with an
+    empty context: wrap their target with :meth:`propagate` to attach their
+    spans to the span open in the spawning thread.
+
+    Finished spans are appended to a ring buffer of ``_capacity`` entries,
+    so a long-running process keeps only its most recent spans.
+
+    :param _capacity: Maximum number of finished spans kept.
+    :type _capacity: int
+
+    **Examples**
+
+    .. code-block:: python
+
+        from tracer import TRACER, span
+
+        @span
+        def load(path):
+            with span("parse"):
+                ...
+
+        load("conf.json")
+        TRACER.export_chrome("trace.json")  # open in chrome://tracing
+
+    Tracing library calls without touching their source::
+
+        from confmgr import ConfMgr
+        from jsonmgr import JsonMgr
+
+        JsonMgr.read = span(JsonMgr.read)
+        ConfMgr.load = staticmethod(span(ConfMgr.load))
+    """
+
+    def __init__(self, _capacity: int = 100000):
+        """
+        Initialize an enabled tracer with an empty ring buffer.
+
+        :param _capacity: Maximum number of finished spans kept.
+        :type _capacity: int
+        """
+        self.events_ = deque(maxlen=_capacity)
+        self.enabled_ = True
+        self.current_ = contextvars.ContextVar(f"span_{id(self)}", default=0)
+        self.ids_ = count(1).__next__
+
+    def enable(self) -> None:
+        """Start recording spans."""
+        self.enabled_ = True
+
+    def disable(self) -> None:
+        """Stop recording spans, including the spans still open."""
+        self.enabled_ = False
+
+    def is_enabled(self) -> bool:
+        """
+        Tell whether spans are recorded.
+
+        :return: ``True`` if the tracer is enabled.
+        :rtype: bool
+        """
+        return self.enabled_
+
+    def events(self) -> list[tuple]:
+        """
+        Return the finished spans, oldest first.
+
+        :return: ``(name, id, parent_id, start_ns, duration_ns, thread_id)``
+                 tuples, ``parent_id`` being ``0`` for a root span.
+        :rtype: list[tuple]
+        """
+        return list(self.events_)
+
+    def clear(self) -> None:
+        """Drop every finished span."""
+        self.events_.clear()
+
+    def propagate(self, _func: callable) -> callable:
+        """
+        Bind a callable to the current context, e.g. for another thread.
+
+        Spans opened by the returned callable are children of the span open
+        when :meth:`propagate` was called.
+
+        :param _func: Callable to run later, possibly in another thread.
+        :type _func: Callable
+        :return: Callable running ``_func`` in a copy of the current context.
+        :rtype: Callable
+
+        **Example**
+
+        .. code-block:: python
+
+            with span("fan-out"):
+                worker = threading.Thread(target=TRACER.propagate(job))
+                worker.start()
+        """
+        l_context = contextvars.copy_context()
+
+        @wraps(_func)
+        def wrapper(*args, **kwargs):
+            return l_context.copy().run(_func, *args, **kwargs)
+
+        return wrapper
+
+    def to_chrome(self) -> dict:
+        """
+        Convert the finished spans to the Chrome Trace Event format.
+
+        Every span becomes a complete (``"X"``) event, timestamps and
+        durations being in microseconds. The span and parent ids are kept in
+        the ``args`` of the event.
+
+        The viewers require the complete events of a thread to nest, while
+        the spans of concurrent asyncio tasks overlap on the thread running
+        the event loop. Such spans are moved to additional tracks of their
+        thread, named ``<thread> #<n>``, each track holding spans that nest,
+        a span staying on the track of its parent whenever possible.
+
+        :return: JSON-serializable trace, with a ``traceEvents`` list.
+        :rtype: dict
+        """
+        l_pid = os.getpid()
+        l_spans = self.events()
+        l_tracks = _tracks(l_spans)
+        l_events = [
+            {
+                "name": iname,
+                "ph": "X",
+                "ts": istart / 1000,
+                "dur": iduration / 1000,
+                "pid": l_pid,
+                "tid": l_tracks[iid],
+                "args": {"id": iid, "parent": iparent},
+            }
+            for iname, iid, iparent, istart, iduration, _ in l_spans
+        ]
+
+        l_names = {
+            ithread.native_id: ithread.name
+            for ithread in threading.enumerate()
+        }
+        for itrack in sorted(set(l_tracks.values()) | set(l_names)):
+            l_tid = itrack & _TID_MASK
+            l_name = l_names.get(l_tid)
+            if itrack >> _TRACK_SHIFT:
+                l_name = f"{l_name or l_tid} #{itrack >> _TRACK_SHIFT}"
+            if l_name is None:
+                continue
+            l_events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": l_pid,
+                    "tid": itrack,
+                    "args": {"name": l_name},
+                }
+            )
+        return {"traceEvents": l_events, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, _filepath: str) -> None:
+        """
+        Write the finished spans to a Chrome trace JSON file.
+
+        The file can be opened with ``chrome://tracing`` or Perfetto.
+
+        :param _filepath: Path of the trace file.
+        :type _filepath: str
+        :raises FileNotFoundError: If the file path is invalid.
+        """
+        JsonMgr(_filepath).write(self.to_chrome())
+
+
+# Additional tracks of a thread get the tid (n << _TRACK_SHIFT) | native id.
+_TRACK_SHIFT = 32
+_TID_MASK = (1 << _TRACK_SHIFT) - 1
+
+
+def _tracks(_spans: list[tuple]) -> dict[int, int]:
+    """Return the Chrome tid of every span, so that spans of a tid nest."""
+    l_tracks = {}
+    # Per thread, the stack of the spans open on each of its tracks, as
+    # (end, id) pairs.
+    l_stacks = {}
+    for _, iid, iparent, istart, iduration, itid in sorted(
+        _spans, key=lambda e: (e[5], e[3], -e[4])
+    ):
+        l_end = istart + iduration
+        l_lanes = l_stacks.setdefault(itid, [])
+        l_fits = []
+        for ilane, istack in enumerate(l_lanes):
+            while istack and istack[-1][0] <= istart:
+                istack.pop()
+            if not istack or istack[-1][0] >= l_end:
+                l_fits.append(ilane)
+
+        l_lane = next(
+            (
+                ilane
+                for ilane in l_fits
+                if l_lanes[ilane] and l_lanes[ilane][-1][1] == iparent
+            ),
+            l_fits[0] if l_fits else len(l_lanes),
+        )
+        if l_lane == len(l_lanes):
+            l_lanes.append([])
+        l_lanes[l_lane].append((l_end, iid))
+        l_tracks[iid] = (l_lane << _TRACK_SHIFT) | itid
+    return l_tracks
+
+
+class _Span:
+    """One opening of a span, used as a context manager or a decorator."""
+
+    __slots__ = ("tracer_", "name_", "id_", "parent_", "token_", "start_")
+
+    def __init__(self, _tracer: Tracer, _name: str):
+        """Prepare the span ``_name`` of ``_tracer``."""
+        self.tracer_ = _tracer
+        self.name_ = _name
+        self.token_ = None
+
+    def __enter__(self) -> "_Span":
+        """Open the span, making it the current one."""
+        l_tracer = self.tracer_
+        if l_tracer.enabled_:
+            self.id_ = l_tracer.ids_()
+            self.parent_ = l_tracer.current_.get()
+            self.token_ = l_tracer.current_.set(self.id_)
+            self.start_ = perf_counter_ns()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        """Close the span and record it."""
+        if self.token_ is None:
+            return
+
+        l_duration = perf_counter_ns() - self.start_
+        self.tracer_.current_.reset(self.token_)
+        if not self.tracer_.enabled_:
+            return
+        self.tracer_.events_.append(
+            (
+                self.name_,
+                self.id_,
+                self.parent_,
+                self.start_,
+                l_duration,
+                threading.get_native_id(),
+            )
+        )
+
+    def __call__(self, _func: callable) -> callable:
+        """Decorate ``_func``, every call opening a new span."""
+        return _decorate(_func, self.tracer_, self.name_)
+
+
+def span(_name: object = None, _tracer: Tracer | None = None) -> object:
+    """
+    Open a span, as a context manager or as a decorator.
+
+    - ``with span("name"):`` records the enclosed block.
+    - ``@span`` records every call of the decorated function, under its
+      module and qualified name.
+    - ``@span("name")`` does the same under an explicit name.
+
+    Decorated coroutine functions are recorded until their result is
+    available. The object returned by ``span("name")`` opens the span once:
+    call :func:`span` again for every ``with`` statement.
+
+    :param _name: Name of the span, or the function to decorate.
+    :type _name: str | Callable, optional
+    :param _tracer: Tracer recording the span, :data:`TRACER` by default.
+    :type _tracer: Tracer, optional
+    :return: A context manager, or a decorator, or the decorated function.
+    :rtype: object
+
+    **Example**
+
+    .. code-block:: python
+
+        @span
+        async def fetch(url):
+            with span("decode"):
+                ...
+    """
+    l_tracer = TRACER if _tracer is None else _tracer
+
+    if callable(_name):
+        return _decorate(_name, l_tracer, None)
+
+    return _Span(l_tracer, _name)
+
+
+def _decorate(_func: callable, _tracer: Tracer, _name: str | None) -> callable:
+    """Wrap ``_func`` so that every call is recorded as a span."""
+    l_name = _name or f"{_func.__module__}.{_func.__qualname__}"
+
+    if iscoroutinefunction(_func):
+
+        @wraps(_func)
+        async def awrapper(*args, **kwargs):
+            with _Span(_tracer, l_name):
+                return await _func(*args, **kwargs)
+
+        return awrapper
+
+    @wraps(_func)
+    def wrapper(*args, **kwargs):
+        with _Span(_tracer, l_name):
+            return _func(*args, **kwargs)
+
+    return wrapper
+
+
+TRACER = Tracer()
+"""Default tracer used by :func:`span`."""
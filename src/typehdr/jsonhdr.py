@@ -1,33 +1,76 @@
 """jsonhdr module."""
 
+import json
+import re
+
 from functools import wraps
+from inspect import iscoroutinefunction
 
+from typehdr.recordhdr import RecordHdr
 
-def json_str_to_dict(func: callable) -> callable:
-    """
+STRICT = "strict"
+TOLERANT = "tolerant"
+JSON_LINES = "json_lines"
+RECORDS = "records"
+
+# First characters of the JSON texts: objects, arrays, strings, numbers and
+# the true, false and null literals.
+_JSON_FIRST = frozenset('{["-0123456789tfn')
+_BLANKS = frozenset(" \t\n\r")
+_FIRST_RE = re.compile(r"[ \t\n\r]*(.?)")
+_SKIP_RE = re.compile(r"[ \t\n\r]*")
+
+
+def json_str_to_dict(
+    func: callable = None, *, _strategy: str = STRICT
+) -> callable:
+    r"""
     Decorate to convert a JSON string returned by a function into a dict.
 
     This decorator wraps a function that is expected to return a JSON-formatted
     string. It parses the JSON string and returns a dictionary. If the wrapped
-    function returns None, None is returned. If the result is not a string,
-    a TypeError is raised.
+    function returns None, None is returned. If the result is not a string or
+    bytes, a TypeError is raised.
+
+    The decoding strategy is chosen once per decorated function, either as
+    ``@json_str_to_dict`` or as ``@json_str_to_dict(_strategy=...)``:
+
+    - ``STRICT`` (default): the result must be one JSON document.
+    - ``TOLERANT``: the first non-blank character is checked, and text that
+      cannot start a JSON document, e.g. ``hello``, is returned unchanged
+      without being parsed. Text that looks like JSON but is not valid is
+      returned unchanged as well.
+    - ``JSON_LINES``: the result is a sequence of JSON documents, such as
+      JSON Lines, and the list of the documents is returned.
+    - ``RECORDS``: like ``STRICT``, but objects are decoded as compact
+      records, see :meth:`RecordHdr.loads`.
+
+    Bytes results are accepted by every strategy and decoded as UTF-8.
+
+    Coroutine functions are supported as well: the wrapper is then itself a
+    coroutine function and the awaited result is converted.
 
     Parameters
     ----------
-    func : callable
+    func : callable, optional
         The function to wrap. It should return a JSON-formatted string.
+    _strategy : str, optional
+        ``STRICT``, ``TOLERANT``, ``JSON_LINES`` or ``RECORDS``.
 
     Returns
     -------
     callable
-        The wrapped function, which returns a dict or None.
+        The wrapped function, which returns a dict or None, or a decorator
+        if ``func`` is not given.
 
     Raises
     ------
+    ValueError
+        If the strategy is unknown.
     TypeError
-        If the wrapped function does not return a string or None.
+        If the wrapped function does not return a string, bytes or None.
     json.JSONDecodeError
-        If the returned string is not valid JSON.
+        If the returned string is not valid JSON, except with ``TOLERANT``.
 
     Examples
     --------
@@ -44,21 +87,104 @@ def json_str_to_dict(func: callable) -> callable:
     ...
     >>> get_none() is None
     True
+
+    >>> @json_str_to_dict(_strategy=TOLERANT)
+    ... def get_text():
+    ...     return "hello\n"
+    ...
+    >>> get_text()
+    'hello\n'
+
+    >>> @json_str_to_dict(_strategy=JSON_LINES)
+    ... def get_lines():
+    ...     return b'{"a": 1}\n{"a": 2}\n'
+    ...
+    >>> get_lines()
+    [{'a': 1}, {'a': 2}]
     """
+    l_decode = _STRATEGIES.get(_strategy)
+    if l_decode is None:
+        raise ValueError(f"Unknown JSON decode strategy '{_strategy}'")
+
+    if func is None:
+        return lambda f: json_str_to_dict(f, _strategy=_strategy)
+
+    if iscoroutinefunction(func):
+
+        @wraps(func)
+        async def awrapper(*args, **kwargs):
+            return _to_dict(func, await func(*args, **kwargs), l_decode)
+
+        return awrapper
 
     @wraps(func)
     def wrapper(*args, **kwargs):
-        result = func(*args, **kwargs)
+        return _to_dict(func, func(*args, **kwargs), l_decode)
+
+    return wrapper
 
-        if result is None:
-            return None
 
-        if isinstance(result, str):
-            return __import__("json").loads(result)
+def _to_dict(func: callable, result: object, decode: callable) -> object:
+    """Convert the result returned by ``func`` as described above."""
+    if result is None:
+        return None
 
-        l_fname = func.__name__
-        l_rname = type(result).__name__
+    if isinstance(result, (str, bytes, bytearray)):
+        return decode(result)
 
-        raise TypeError(f"Expected JSON string from {l_fname},got {l_rname}")
+    l_fname = func.__name__
+    l_rname = type(result).__name__
 
-    return wrapper
+    raise TypeError(f"Expected JSON string from {l_fname},got {l_rname}")
+
+
+def _strict(_result: str | bytes) -> object:
+    """Decode one JSON document."""
+    return json.loads(_result)
+
+
+def _tolerant(_result: str | bytes) -> object:
+    """Decode one JSON document, or return text that is not JSON as is."""
+    l_text = _result if isinstance(_result, str) else _utf8(_result)
+    if l_text is None:
+        return _result
+
+    l_first = l_text[:1]
+    if l_first in _BLANKS:
+        l_first = _FIRST_RE.match(l_text).group(1)
+    if l_first not in _JSON_FIRST:
+        return _result
+
+    try:
+        return json.loads(l_text)
+    except json.JSONDecodeError:
+        return _result
+
+
+def _json_lines(_result: str | bytes) -> list[object]:
+    """Decode a sequence of JSON documents into a list."""
+    l_text = _result if isinstance(_result, str) else bytes(_result).decode()
+    l_decoder = json.JSONDecoder()
+    l_docs = []
+    l_pos = _SKIP_RE.match(l_text).end()
+    while l_pos < len(l_text):
+        l_doc, l_pos = l_decoder.raw_decode(l_text, l_pos)
+        l_docs.append(l_doc)
+        l_pos = _SKIP_RE.match(l_text, l_pos).end()
+    return l_docs
+
+
+def _utf8(_result: bytes) -> str | None:
+    """Decode UTF-8 bytes, ``None`` if they are not valid UTF-8."""
+    try:
+        return bytes(_result).decode()
+    except UnicodeDecodeError:
+        return None
+
+
+_STRATEGIES = {
+    STRICT: _strict,
+    TOLERANT: _tolerant,
+    JSON_LINES: _json_lines,
+    RECORDS: RecordHdr.loads,
+}
@@ -1,5 +1,11 @@
 """listhdr module."""
 
+from itertools import islice
+
+_MAP = 0
+_FILTER = 1
+_WHERE = 2
+
 
 class ListHdr:
     """
@@ -15,8 +21,28 @@ class ListHdr:
 
     >>> ListHdr.mutate([], lambda s: True)
     []
+
+    **Examples: pipeline**
+
+    >>> p = ListHdr.pipeline().filter(None).map(str.strip).unquote(
+    ...     lambda s: s.startswith("'")
+    ... )
+    >>> p.run(["  'abc' ", "", " def"])
+    ['abc', 'def']
     """
 
+    @staticmethod
+    def pipeline() -> "ListPipeline":
+        """
+        Start an empty lazy pipeline of list transforms.
+
+        Returns
+        -------
+        ListPipeline
+            A pipeline without stages, see :class:`ListPipeline`.
+        """
+        return ListPipeline()
+
     @staticmethod
     def mutate(_data: list[str], _predicat: callable) -> list[str]:
         """
@@ -63,3 +89,252 @@ class ListHdr:
             else:
                 l_data.append(element)
         return l_data
+
+
+class ListPipeline:
+    """
+    Lazy, chainable sequence of predicates and transforms.
+
+    Stages are added with :meth:`map`, :meth:`filter`, :meth:`where` and
+    :meth:`unquote`. Nothing is evaluated until the pipeline is run on an
+    iterable, and the stages are then fused into a single pass over the
+    items: no intermediate list is built between two stages.
+
+    Adding a stage returns a new pipeline, so a pipeline can be built once
+    and reused, from several threads as well.
+
+    The pipeline is run with one of:
+
+    - :meth:`stream`: an iterator, for inputs of any size
+    - :meth:`run`: a new list
+    - :meth:`apply`: the input list modified in place
+    - :meth:`batches`: lists of ``_size`` processed items
+
+    The stages run as built-in :func:`map` and :func:`filter` iterators, so
+    passing ``str`` methods such as ``str.strip`` rather than lambdas keeps
+    the per-item work in C.
+
+    **Examples**
+
+    >>> tokens = ListHdr.pipeline().map(str.split).run(["a b", "c"])
+    >>> tokens
+    [['a', 'b'], ['c']]
+
+    >>> p = ListHdr.pipeline().filter(str.isdigit).map(int)
+    >>> list(p.stream(iter(["1", "x", "22"])))
+    [1, 22]
+
+    >>> data = ["'a'", "b", ""]
+    >>> p = ListHdr.pipeline().filter(None).unquote(lambda s: s[:1] == "'")
+    >>> p.apply(data) is data
+    True
+    >>> data
+    ['a', 'b']
+
+    >>> list(ListHdr.pipeline().map(str.upper).batches("abcde", 2))
+    [['A', 'B'], ['C', 'D'], ['E']]
+    """
+
+    def __init__(self, _stages: tuple = ()):
+        """
+        Initialize a pipeline from its stages.
+
+        Parameters
+        ----------
+        _stages : tuple, optional
+            ``(kind, predicate, transform)`` stages, in order.
+        """
+        self.stages_ = _stages
+
+    def __len__(self) -> int:
+        """Return the number of stages."""
+        return len(self.stages_)
+
+    def map(self, _func: callable) -> "ListPipeline":
+        """
+        Add a stage transforming every item.
+
+        Parameters
+        ----------
+        _func : callable
+            Function applied to every item.
+
+        Returns
+        -------
+        ListPipeline
+            A new pipeline ending with this stage.
+        """
+        return ListPipeline(self.stages_ + ((_MAP, None, _func),))
+
+    def filter(self, _predicat: callable = None) -> "ListPipeline":
+        """
+        Add a stage dropping the items not matching a predicate.
+
+        Parameters
+        ----------
+        _predicat : callable, optional
+            Function telling whether an item is kept. ``None`` keeps the
+            truthy items, like :func:`filter`.
+
+        Returns
+        -------
+        ListPipeline
+            A new pipeline ending with this stage.
+        """
+        l_predicat = bool if _predicat is None else _predicat
+        return ListPipeline(self.stages_ + ((_FILTER, l_predicat, None),))
+
+    def where(self, _predicat: callable, _func: callable) -> "ListPipeline":
+        """
+        Add a stage transforming the items matching a predicate only.
+
+        The other items are left unchanged.
+
+        Parameters
+        ----------
+        _predicat : callable
+            Function telling whether an item is transformed.
+        _func : callable
+            Function applied to the matching items.
+
+        Returns
+        -------
+        ListPipeline
+            A new pipeline ending with this stage.
+        """
+        return ListPipeline(self.stages_ + ((_WHERE, _predicat, _func),))
+
+    def unquote(self, _predicat: callable) -> "ListPipeline":
+        """
+        Add a stage removing the first and last characters of some items.
+
+        This is the transform of :meth:`ListHdr.mutate`, as a stage.
+
+        Parameters
+        ----------
+        _predicat : callable
+            Function telling whether an item is stripped, e.g.
+            :meth:`StrHdr.detect_embedded_str`.
+
+        Returns
+        -------
+        ListPipeline
+            A new pipeline ending with this stage.
+        """
+        return self.where(_predicat, _strip_ends)
+
+    def stream(self, _data: object) -> object:
+        """
+        Run the pipeline lazily over an iterable.
+
+        The stages are chained as built-in :func:`map` and :func:`filter`
+        iterators, so every item flows through all of them before the next
+        one is read, and the per-item work stays in C as far as possible.
+
+        Parameters
+        ----------
+        _data : Iterable
+            Items to process, consumed once.
+
+        Returns
+        -------
+        Iterator
+            Iterator over the processed items.
+        """
+        l_iter = iter(_data)
+        for ikind, ipredicat, ifunc in self.stages_:
+            if ikind == _MAP:
+                l_iter = map(ifunc, l_iter)
+            elif ikind == _FILTER:
+                l_iter = filter(ipredicat, l_iter)
+            else:
+                l_iter = _where(ipredicat, ifunc, l_iter)
+        return l_iter
+
+    def run(self, _data: object) -> list:
+        """
+        Run the pipeline over an iterable into a new list.
+
+        Parameters
+        ----------
+        _data : Iterable
+            Items to process.
+
+        Returns
+        -------
+        list
+            The processed items.
+        """
+        return list(self.stream(_data))
+
+    def apply(self, _data: list) -> list:
+        """
+        Run the pipeline over a list, replacing its content in place.
+
+        Items are written back as they are produced, at an index never
+        greater than the one being read, so no copy of the list is made.
+        If a stage raises an exception, the list is left partially updated.
+
+        Parameters
+        ----------
+        _data : list
+            List to process.
+
+        Returns
+        -------
+        list
+            ``_data`` itself.
+        """
+        l_end = 0
+        for iitem in self.stream(_data):
+            _data[l_end] = iitem
+            l_end += 1
+        del _data[l_end:]
+        return _data
+
+    def batches(self, _data: object, _size: int = 1024) -> object:
+        """
+        Run the pipeline lazily, grouping the processed items in lists.
+
+        Every list holds ``_size`` processed items, except the last one,
+        so memory use is bounded by the size of a batch whatever the size
+        of the input, while the consumer handles whole lists, e.g. to write
+        them with one call.
+
+        Parameters
+        ----------
+        _data : Iterable
+            Items to process.
+        _size : int, optional
+            Number of processed items per batch.
+
+        Returns
+        -------
+        Iterator[list]
+            Generator over the batches.
+
+        Raises
+        ------
+        ValueError
+            If ``_size`` is not positive.
+        """
+        if _size < 1:
+            raise ValueError(f"Batch size must be positive, got {_size}")
+
+        return _batches(self.stream(_data), _size)
+
+
+def _batches(_iter: object, _size: int) -> object:
+    """Group the items of ``_iter`` in lists of ``_size`` items."""
+    while l_batch := list(islice(_iter, _size)):
+        yield l_batch
+
+
+def _where(_predicat: callable, _func: callable, _iter: object) -> object:
+    """Transform the items of ``_iter`` matching ``_predicat`` only."""
+    return (_func(iitem) if _predicat(iitem) else iitem for iitem in _iter)
+
+
+def _strip_ends(_s: str) -> str:
+    """Remove the first and last characters of a string."""
+    return _s[1:-1]
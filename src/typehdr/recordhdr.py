@@ -0,0 +1,467 @@
+"""recordhdr module."""
+
+import json
+import keyword
+import sys
+
+from array import array
+from collections import namedtuple
+from functools import lru_cache
+from itertools import repeat
+from operator import attrgetter
+
+SLOTS = "slots"
+NAMEDTUPLE = "namedtuple"
+MAX_SHAPES = 256
+MIN_RECORDS = 8
+
+_KINDS = (SLOTS, NAMEDTUPLE)
+
+
+class RecordHdr:
+    r"""
+    Compact decoding of large arrays of same-shaped JSON objects.
+
+    Decoded with :func:`json.loads`, every JSON object becomes a ``dict``
+    with its own hash table. For arrays of hundreds of thousands of records
+    sharing the same keys, most of the memory goes to these tables. This
+    class materializes such objects as instances of a record class instead:
+
+    - ``SLOTS``: a ``__slots__`` dataclass, with mutable attributes
+    - ``NAMEDTUPLE``: a :func:`collections.namedtuple`, immutable and
+      indexable as well
+
+    Record classes are created once per shape, i.e. per tuple of keys, and
+    their field names are interned. Numeric fields can also be stored as
+    columns backed by :class:`array.array`, see :meth:`to_columns`.
+
+    This class is designed as a namespace for static methods and is not
+    intended to be instantiated.
+
+    **Examples**
+
+    >>> doc = json.dumps([{"id": i, "x": i / 2} for i in range(100)])
+    >>> data = RecordHdr.loads(doc)
+    >>> data[3].id, data[3].x
+    (3, 1.5)
+
+    >>> rows = RecordHdr.loads('{"rows": [{"a": 1}]}', ("a",), NAMEDTUPLE)
+    >>> rows["rows"][0]
+    Record(a=1)
+
+    >>> cols = RecordHdr.to_columns([{"id": 1, "x": 0.5}, {"id": 2, "x": 2}])
+    >>> cols["id"], cols["x"]
+    (array('q', [1, 2]), array('d', [0.5, 2.0]))
+    """
+
+    @staticmethod
+    def record_class(
+        _fields: tuple[str, ...], _kind: str = SLOTS, _name: str = "Record"
+    ) -> type:
+        """
+        Return the record class of a shape, creating it on first use.
+
+        The classes of the :data:`MAX_SHAPES` most recently used shapes are
+        kept, so a shape used again after many others may get a new class.
+
+        :param _fields: Field names, valid Python identifiers not starting
+                        with an underscore.
+        :type _fields: tuple[str, ...]
+        :param _kind: ``SLOTS`` or ``NAMEDTUPLE``.
+        :type _kind: str
+        :param _name: Name of the class.
+        :type _name: str
+        :return: The record class, taking the field values in order.
+        :rtype: type
+        :raises ValueError: If the kind is unknown, or a field name is not a
+            valid identifier.
+        """
+        if _kind not in _KINDS:
+            raise ValueError(f"Unknown record kind '{_kind}'")
+        return _record_class(tuple(_fields), _kind, _name)
+
+    @staticmethod
+    def infer_fields(
+        _items: list[dict], _sample: int = 100
+    ) -> tuple[str, ...]:
+        """
+        Infer the shape of records from the first items.
+
+        :param _items: Decoded JSON objects.
+        :type _items: list[dict]
+        :param _sample: Number of items inspected.
+        :type _sample: int
+        :return: The keys of the sampled items, in order of first
+                 appearance.
+        :rtype: tuple[str, ...]
+        """
+        l_fields = {}
+        for iitem in _items[:_sample]:
+            l_fields.update(dict.fromkeys(iitem))
+        return tuple(l_fields)
+
+    @staticmethod
+    def to_records(
+        _items: list[dict],
+        _fields: tuple[str, ...] | None = None,
+        _kind: str = SLOTS,
+        _name: str = "Record",
+    ) -> list:
+        """
+        Convert decoded JSON objects into records.
+
+        Keys missing from an item give ``None``; keys that are not fields
+        are dropped.
+
+        :param _items: Decoded JSON objects.
+        :type _items: list[dict]
+        :param _fields: Field names, inferred with :meth:`infer_fields` if
+                        ``None``.
+        :type _fields: tuple[str, ...], optional
+        :param _kind: ``SLOTS`` or ``NAMEDTUPLE``.
+        :type _kind: str
+        :param _name: Name of the record class.
+        :type _name: str
+        :return: One record per item.
+        :rtype: list
+        :raises ValueError: If the kind is unknown, or a field name is not a
+            valid identifier.
+        """
+        l_fields = _fields or RecordHdr.infer_fields(_items)
+        l_class = RecordHdr.record_class(l_fields, _kind, _name)
+        return [
+            l_class(*map(iitem.get, l_fields)) for iitem in _items
+        ]
+
+    @staticmethod
+    def loads(
+        _s: str | bytes,
+        _fields: tuple[str, ...] | None = None,
+        _kind: str = SLOTS,
+        _name: str = "Record",
+    ) -> object:
+        """
+        Decode a JSON document, turning objects into records as it goes.
+
+        Every object is converted as soon as it is decoded, so the
+        intermediate ``dict`` objects are freed at once and the peak memory
+        stays close to the memory of the records.
+
+        - With ``_fields``, only the objects having exactly these keys, in
+          any order, become records; the others stay ``dict`` objects.
+        - Without, only the elements of arrays become records: the objects
+          of an array sharing a set of keys, valid identifiers, become
+          records if there are at least :data:`MIN_RECORDS` of them. One
+          class is created per set of keys, with the fields in the order
+          of the first object of that set. The top-level object, the
+          objects nested as values and the few objects of a shape stay
+          ``dict`` objects. Past :data:`MAX_SHAPES` distinct sets in a
+          document, objects of a new set stay ``dict`` objects, so that a
+          document of varied objects does not create classes without
+          limit.
+
+        :param _s: JSON document.
+        :type _s: str | bytes
+        :param _fields: Keys of the objects converted.
+        :type _fields: tuple[str, ...], optional
+        :param _kind: ``SLOTS`` or ``NAMEDTUPLE``.
+        :type _kind: str
+        :param _name: Name of the record classes.
+        :type _name: str
+        :return: The decoded document.
+        :rtype: object
+        :raises ValueError: If the kind is unknown, or a field name is not a
+            valid identifier.
+        :raises json.JSONDecodeError: If the document is not valid JSON.
+        """
+        l_hook, l_finish = _hooks(_fields, _kind, _name)
+        return l_finish(json.loads(_s, object_pairs_hook=l_hook))
+
+    @staticmethod
+    def load(
+        _fp: object,
+        _fields: tuple[str, ...] | None = None,
+        _kind: str = SLOTS,
+        _name: str = "Record",
+    ) -> object:
+        """
+        Decode a JSON file object like :meth:`loads`.
+
+        :param _fp: Readable text or binary file object.
+        :type _fp: file object
+        :param _fields: Keys of the objects converted.
+        :type _fields: tuple[str, ...], optional
+        :param _kind: ``SLOTS`` or ``NAMEDTUPLE``.
+        :type _kind: str
+        :param _name: Name of the record classes.
+        :type _name: str
+        :return: The decoded document.
+        :rtype: object
+        :raises json.JSONDecodeError: If the document is not valid JSON.
+        """
+        l_hook, l_finish = _hooks(_fields, _kind, _name)
+        return l_finish(json.load(_fp, object_pairs_hook=l_hook))
+
+    @staticmethod
+    def to_columns(
+        _items: list,
+        _fields: tuple[str, ...] | None = None,
+        _types: dict[str, str] | None = None,
+    ) -> dict[str, array | list]:
+        """
+        Store records column by column.
+
+        Every column holding only integers becomes an ``array('q')``, every
+        column holding only numbers an ``array('d')``, and any other column
+        a ``list``. A typecode can be forced per column with ``_types``.
+        An ``array`` stores a number in 8 bytes, instead of an 8-byte
+        pointer to a Python object of 24 to 32 bytes, and can be handed to
+        :func:`sum`, :func:`max` or :mod:`numpy` without conversion.
+
+        :param _items: Decoded JSON objects, or records.
+        :type _items: list
+        :param _fields: Columns to build, inferred from the items if
+                        ``None``.
+        :type _fields: tuple[str, ...], optional
+        :param _types: :mod:`array` typecodes forced per column.
+        :type _types: dict[str, str], optional
+        :return: One column per field, of the length of ``_items``.
+        :rtype: dict[str, array | list]
+        :raises TypeError: If a value does not fit a forced typecode.
+        :raises OverflowError: If a value does not fit a forced typecode.
+        """
+        if not _items:
+            return {ifield: [] for ifield in _fields or ()}
+
+        l_dicts = isinstance(_items[0], dict)
+        if l_dicts:
+            l_fields = _fields or RecordHdr.infer_fields(_items)
+        else:
+            l_fields = _fields or _record_fields(_items[0])
+
+        l_types = _types or {}
+        l_columns = {}
+        for ifield in l_fields:
+            if l_dicts:
+                l_values = list(map(dict.get, _items, repeat(ifield)))
+            else:
+                l_values = list(map(attrgetter(ifield), _items))
+            l_code = l_types.get(ifield) or _typecode(l_values)
+            l_columns[ifield] = (
+                l_values if l_code is None else array(l_code, l_values)
+            )
+        return l_columns
+
+
+def _hooks(
+    _fields: tuple[str, ...] | None, _kind: str, _name: str
+) -> tuple[callable, callable]:
+    """Return the ``object_pairs_hook`` and the finishing function."""
+    if _kind not in _KINDS:
+        raise ValueError(f"Unknown record kind '{_kind}'")
+
+    if _fields is not None:
+        l_fields = tuple(_fields)
+        l_keys = frozenset(l_fields)
+        l_class = _record_class(l_fields, _kind, _name)
+
+        def hook(_pairs: list[tuple]) -> object:
+            l_names, l_values = zip(*_pairs) if _pairs else ((), ())
+            if l_names == l_fields:
+                return l_class(*l_values)
+            # Same keys in another order: JSON objects are unordered.
+            if len(l_names) == len(l_fields) and l_keys == set(l_names):
+                return l_class(*map(dict(_pairs).__getitem__, l_fields))
+            return dict(_pairs)
+
+        return hook, _identity
+
+    return _Inference(_kind, _name).hooks()
+
+
+class _Inference:
+    """
+    Records inferred while decoding one document.
+
+    The hook of an object does not know whether the object is an element
+    of an array. Objects of a tuple of keys met :data:`MIN_RECORDS` times
+    are built as records at once, so that large arrays never exist as
+    ``dict`` objects; the other objects are built as ``dict`` objects.
+    Every array is then fixed by the hook of the object holding it, or
+    at the end for the arrays outside any object: its large groups of
+    objects sharing a set of keys become records and the other records
+    go back to ``dict`` objects, as do records held outside any array.
+    """
+
+    def __init__(self, _kind: str, _name: str):
+        """Initialize the inference of a document."""
+        self.kind_ = _kind
+        self.name_ = _name
+        # Occurrences of every tuple of keys, and its shape once frequent:
+        # (record class, fields), or None if it stays a dict.
+        self.counts_ = {}
+        self.orders_ = {}
+        # Shape of every set of keys, and set of keys of every class.
+        self.sets_ = {}
+        self.classes_ = {}
+
+    def hooks(self) -> tuple[callable, callable]:
+        """Return the object hook and the function finishing a document."""
+        l_counts = self.counts_
+        l_orders = self.orders_
+        l_classes = self.classes_
+        l_fix = self.fix
+
+        def infer_hook(_pairs: list[tuple]) -> object:
+            l_names, l_values = zip(*_pairs) if _pairs else ((), ())
+            l_types = set(map(type, l_values))
+            if list in l_types or not l_types.isdisjoint(l_classes):
+                l_values = tuple(map(l_fix, l_values))
+
+            l_count = l_counts[l_names] = l_counts.get(l_names, 0) + 1
+            if l_count >= MIN_RECORDS:
+                l_shape = l_orders.get(l_names, False)
+                if l_shape is False:
+                    l_shape = l_orders[l_names] = self.shape(l_names)
+                if l_shape is not None:
+                    l_class, l_fields = l_shape
+                    if l_fields == l_names:
+                        return l_class(*l_values)
+                    l_object = dict(zip(l_names, l_values))
+                    return l_class(*map(l_object.__getitem__, l_fields))
+            return dict(zip(l_names, l_values))
+
+        return infer_hook, l_fix
+
+    def shape(
+        self, _names: tuple[str, ...]
+    ) -> tuple[type, tuple[str, ...]] | None:
+        """Return the class and fields of a tuple of keys, if any."""
+        l_shape = _shape(_names, self.sets_, self.kind_, self.name_)
+        if l_shape is not None:
+            self.classes_[l_shape[0]] = frozenset(l_shape[1])
+        return l_shape
+
+    def fix(self, _value: object) -> object:
+        """Fix the arrays of a value, turning a record into a ``dict``."""
+        if type(_value) is list:
+            self.fix_array(_value)
+        elif type(_value) in self.classes_:
+            return _to_dict(_value)
+        return _value
+
+    def fix_array(self, _items: list) -> None:
+        """Fix the records of an array in place."""
+        l_types = set(map(type, _items))
+        if dict not in l_types and l_types.isdisjoint(self.classes_):
+            if list in l_types:
+                for iitem in _items:
+                    if type(iitem) is list:
+                        self.fix_array(iitem)
+            return
+
+        l_groups = {}
+        for iindex, iitem in enumerate(_items):
+            l_type = type(iitem)
+            if l_type is dict:
+                l_keys = frozenset(iitem)
+            elif l_type in self.classes_:
+                l_keys = self.classes_[l_type]
+            else:
+                if l_type is list:
+                    self.fix_array(iitem)
+                continue
+            l_groups.setdefault(l_keys, []).append(iindex)
+
+        for ikeys, iindexes in l_groups.items():
+            l_shape = None
+            if len(iindexes) >= MIN_RECORDS:
+                l_shape = self.sets_.get(ikeys)
+                if l_shape is None:
+                    l_shape = self.shape(tuple(_items[iindexes[0]]))
+            for iindex in iindexes:
+                l_item = _items[iindex]
+                if l_shape is None:
+                    if type(l_item) is not dict:
+                        _items[iindex] = _to_dict(l_item)
+                elif type(l_item) is dict:
+                    l_class, l_fields = l_shape
+                    _items[iindex] = l_class(
+                        *map(l_item.__getitem__, l_fields)
+                    )
+
+
+def _shape(
+    _names: tuple[str, ...], _sets: dict, _kind: str, _name: str
+) -> tuple[type, tuple[str, ...]] | None:
+    """Return the class and fields of a tuple of keys, ``None`` if none."""
+    if not _names or len(set(_names)) != len(_names):
+        return None
+    if not all(map(_is_field, _names)):
+        return None
+
+    l_keys = frozenset(_names)
+    if l_keys not in _sets:
+        if len(_sets) >= MAX_SHAPES:
+            return None
+        _sets[l_keys] = (_record_class(_names, _kind, _name), _names)
+    return _sets[l_keys]
+
+
+def _identity(_value: object) -> object:
+    """Return a value unchanged."""
+    return _value
+
+
+def _to_dict(_record: object) -> dict:
+    """Return the fields of a record as a ``dict``."""
+    l_fields = _record_fields(_record)
+    return dict(zip(l_fields, map(getattr, repeat(_record), l_fields)))
+
+
+@lru_cache(maxsize=MAX_SHAPES)
+def _record_class(_fields: tuple[str, ...], _kind: str, _name: str) -> type:
+    """Create the record class of a shape."""
+    for ifield in _fields:
+        if not _is_field(ifield):
+            raise ValueError(f"Field '{ifield}' is not a valid identifier")
+    if len(set(_fields)) != len(_fields):
+        raise ValueError(f"Duplicate field in {_fields}")
+
+    l_fields = tuple(sys.intern(ifield) for ifield in _fields)
+    if _kind == NAMEDTUPLE:
+        return namedtuple(_name, l_fields)
+
+    # dataclasses pulls in inspect: keep it off the import of JsonMgr.
+    from dataclasses import make_dataclass  # pylint: disable=C0415
+
+    return make_dataclass(_name, l_fields, slots=True)
+
+
+def _is_field(_name: str) -> bool:
+    """Tell whether a key can name a field of every kind of record."""
+    return (
+        _name.isidentifier()
+        and not keyword.iskeyword(_name)
+        and not _name.startswith("_")
+    )
+
+
+def _record_fields(_record: object) -> tuple[str, ...]:
+    """Return the field names of a record instance."""
+    l_fields = getattr(_record, "_fields", None)
+    if l_fields is None:
+        l_fields = type(_record).__slots__
+    return tuple(l_fields)
+
+
+def _typecode(_values: list) -> str | None:
+    """Return the :mod:`array` typecode fitting every value, if any."""
+    l_types = set(map(type, _values))
+    if l_types == {int}:
+        if min(_values) >= -(1 << 63) and max(_values) < 1 << 63:
+            return "q"
+        return None
+    if l_types and l_types <= {int, float}:
+        return "d"
+    return None
@@ -1,5 +1,31 @@
 """strdhdr module."""
 
+import re
+
+from array import array
+from functools import lru_cache
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+    | '(?P<sq>[^']*)'
+    | "(?P<dq>(?:[^"\\]|\\.)*)"
+    | \\(?P<esc>.)
+    | (?P<word>[^\s'"\\]+)
+    | (?P<bad>['"\\])
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+_DQ_ESCAPE_RE = re.compile(r'\\(["\\])')
+_QUOTES = frozenset("\"'")
+# Whitespace-separated tokens, the "q" group holding the quoted ones.
+_CLASSIFY_PATTERN = r"""(?P<q>"\S*"(?!\S)|'\S*'(?!\S))|\S+"""
+_CLASSIFY_RE = re.compile(_CLASSIFY_PATTERN)
+_CLASSIFY_BYTES_RE = re.compile(_CLASSIFY_PATTERN.encode())
+_SPANS_PATTERN = r"""(?<!\S)(?:"\S*"|'\S*')(?!\S)"""
+_SPANS_RE = re.compile(_SPANS_PATTERN)
+_SPANS_BYTES_RE = re.compile(_SPANS_PATTERN.encode())
+
 
 class StrHdr:
     r"""
@@ -26,6 +52,23 @@ class StrHdr:
 
         StrHdr.detect_embedded_str('"mismatch\'')
         # False
+
+    **Examples: classify**
+
+    .. code-block:: python
+
+        StrHdr.classify(["'a'", "b"])
+        # bytearray(b'\x01\x00')
+
+        StrHdr.embedded_spans('say "hi"')
+        # array('q', [4, 8])
+
+    **Examples: tokenize**
+
+    .. code-block:: python
+
+        StrHdr.tokenize('echo "hello world" it\\\'s')
+        # ('echo', 'hello world', "it's")
     """
 
     @staticmethod
@@ -51,16 +94,84 @@ class StrHdr:
         **Notes**
 
         - Empty strings safely return ``False``.
+        - Only the first and last characters are inspected, so the check
+          runs in constant time whatever the length of the string.
+        - Quotes inside the string are ignored: ``'I am "blue"'`` and
+          ``'a"b"c'`` are not embedded strings.
         - Escape sequences are not interpreted.
-        - Nested or mixed quotation marks are not supported.
         """
-        QUOTES = ['"', "'"]
-        if isinstance(_s, str) and len(_s) != 0:
-            for quote in QUOTES:
-                if _s.count(quote) == 2:
-                    return True
-            return False
-        return False
+        return (
+            isinstance(_s, str)
+            and len(_s) > 1
+            and _s[0] == _s[-1]
+            and _s[0] in _QUOTES
+        )
+
+    @staticmethod
+    def classify(_data: object) -> bytearray:
+        r"""
+        Flag the embedded strings among many tokens.
+
+        ``_data`` is either:
+
+        - an iterable of tokens, each checked with
+          :meth:`detect_embedded_str`
+        - a whole text buffer, as ``str`` or ``bytes``, split into
+          whitespace-separated tokens like :meth:`str_to_list` does. The
+          buffer is scanned once by a compiled regular expression, without
+          building the list of tokens.
+
+        :param _data: Tokens, or a text buffer.
+        :type _data: Iterable[str] | str | bytes
+        :return: One byte per token, ``1`` for an embedded string and ``0``
+                 otherwise.
+        :rtype: bytearray
+
+        **Examples**
+
+        >>> StrHdr.classify(["'a'", "b", '"c"'])
+        bytearray(b'\x01\x00\x01')
+
+        >>> list(StrHdr.classify('run "x"  a"b"c \'y\'\n'))
+        [0, 1, 0, 1]
+        """
+        if isinstance(_data, str):
+            return bytearray(map(bool, _CLASSIFY_RE.findall(_data)))
+        if isinstance(_data, (bytes, bytearray, memoryview)):
+            return bytearray(map(bool, _CLASSIFY_BYTES_RE.findall(_data)))
+        return bytearray(map(StrHdr.detect_embedded_str, _data))
+
+    @staticmethod
+    def embedded_spans(_text: object) -> array:
+        r"""
+        Locate the embedded strings of a text buffer.
+
+        The buffer is split into whitespace-separated tokens, and the offsets
+        of the tokens wrapped in matching quotes are returned. The buffer is
+        scanned once by a compiled regular expression and no substring is
+        created, so the offsets of millions of tokens fit in a compact array
+        of integers.
+
+        :param _text: Text buffer, as ``str`` or ``bytes``.
+        :type _text: str | bytes
+        :return: Flat ``start, end`` pairs of offsets, ``end`` excluded,
+                 i.e. ``_text[a[2 * i] : a[2 * i + 1]]`` is the ``i``-th
+                 embedded string.
+        :rtype: array.array
+
+        **Examples**
+
+        >>> StrHdr.embedded_spans('say "hi" to \'you\'').tolist()
+        [4, 8, 12, 17]
+
+        >>> StrHdr.embedded_spans(b"no quotes").tolist()
+        []
+        """
+        l_re = _SPANS_RE if isinstance(_text, str) else _SPANS_BYTES_RE
+        l_spans = array("q")
+        for imatch in l_re.finditer(_text):
+            l_spans.extend(imatch.span())
+        return l_spans
 
     @staticmethod
     def str_to_list(_s: str) -> list[str]:
@@ -99,3 +210,70 @@ class StrHdr:
         []
         """
         return _s.split()
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def tokenize(_s: str) -> tuple[str, ...]:
+        r"""
+        Split a command line into arguments, following POSIX shell quoting.
+
+        The string is scanned once with a compiled regular expression, and
+        the quoting rules of :func:`shlex.split` are applied:
+
+        - Unquoted whitespace separates arguments.
+        - Single quotes preserve every enclosed character literally.
+        - Double quotes preserve enclosed characters, except that a backslash
+          escapes a following ``"`` or ``\``.
+        - Outside quotes, a backslash escapes the following character.
+        - Adjacent quoted and unquoted parts form a single argument, e.g.
+          ``a"b c"d`` gives ``ab cd``, and ``""`` gives an empty argument.
+
+        Results are kept in an LRU cache, so a command line issued
+        repeatedly is tokenized only once. Cache statistics are available
+        through ``StrHdr.tokenize.cache_info()``.
+
+        :param _s: Command line to split.
+        :type _s: str
+        :return: The arguments, as a tuple since it is shared by the cache.
+        :rtype: tuple[str, ...]
+        :raises ValueError: If a quote is not closed, or if the string ends
+            with an unescaped backslash.
+
+        **Examples**
+
+        >>> StrHdr.tokenize("cat 'my file.json'")
+        ('cat', 'my file.json')
+
+        >>> StrHdr.tokenize('echo "say \\"hi\\"" a\\ b')
+        ('echo', 'say "hi"', 'a b')
+
+        >>> StrHdr.tokenize("")
+        ()
+        """
+        l_tokens = []
+        l_parts = None
+        for imatch in _TOKEN_RE.finditer(_s):
+            l_kind = imatch.lastgroup
+            if l_kind == "ws":
+                if l_parts is not None:
+                    l_tokens.append("".join(l_parts))
+                    l_parts = None
+                continue
+
+            if l_kind == "bad":
+                if imatch.group() == "\\":
+                    raise ValueError("No escaped character")
+                raise ValueError("No closing quotation")
+
+            l_part = imatch.group(l_kind)
+            if l_kind == "dq" and "\\" in l_part:
+                l_part = _DQ_ESCAPE_RE.sub(r"\1", l_part)
+
+            if l_parts is None:
+                l_parts = [l_part]
+            else:
+                l_parts.append(l_part)
+
+        if l_parts is not None:
+            l_tokens.append("".join(l_parts))
+        return tuple(l_tokens)
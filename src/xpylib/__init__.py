@@ -0,0 +1,56 @@
+"""xpylib package.
+
+Facade of the most used entry points of the xpylib packages:
+
+- :class:`fs.fsmgr.FsMgr`
+- :class:`fio.jsonmgr.JsonMgr`
+- :class:`config.confmgr.ConfMgr`
+- :func:`cli.clihdr.runc`
+- :func:`metric.observer.measure`
+
+Importing this package imports none of them: every name is resolved by
+the module ``__getattr__`` on first access, then cached in the module
+namespace, so a command-line tool only pays for the modules it uses.
+
+>>> import xpylib
+>>> xpylib.FsMgr.__name__
+'FsMgr'
+"""
+
+_LAZY = {
+    "FsMgr": "fs.fsmgr",
+    "JsonMgr": "fio.jsonmgr",
+    "ConfMgr": "config.confmgr",
+    "runc": "cli.clihdr",
+    "measure": "metric.observer",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(_name: str) -> object:
+    """
+    Import and return a name of the facade on first access.
+
+    :param _name: Name of the attribute.
+    :type _name: str
+    :return: The object named ``_name`` in its module.
+    :rtype: object
+    :raises AttributeError: If the name is not part of the facade.
+    """
+    l_module = _LAZY.get(_name)
+    if l_module is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{_name}'")
+
+    # importlib itself is not loaded by a bare interpreter: import it late.
+    import importlib  # pylint: disable=C0415
+
+    l_value = getattr(importlib.import_module(l_module), _name)
+    # Later accesses find the name without calling __getattr__ again.
+    globals()[_name] = l_value
+    return l_value
+
+
+def __dir__() -> list[str]:
+    """Return the names of the module, resolved or not."""
+    return sorted(set(globals()) | set(_LAZY))
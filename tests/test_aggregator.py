@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import time
+
+from metric.aggregator import Aggregator, queue_sink, worker_init
+from metric.observer import measure
+from metric.registry import DURATION, REGISTRY, Registry
+
+
+@measure
+def square(x):
+    return x * x
+
+
+def square_pid(x):
+    return square(x), os.getpid()
+
+
+def name_of(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def test_registry_dump_and_merge():
+    source = Registry()
+    for value in (1, 100, 10000):
+        source.histogram("a").record(value)
+    source.histogram("empty")
+
+    dump = source.dump()
+    assert list(dump) == [("a", DURATION)]
+
+    target = Registry()
+    target.histogram("a").record(50)
+    target.merge(dump)
+    target.merge(dump)
+    snap = target.snapshot()["a"]
+    assert snap["count"] == 7
+    assert snap["sum"] == 50 + 2 * 10101
+    assert snap["min"] == 1
+    assert snap["max"] == 10000
+
+
+def test_queue_sink_skips_empty_deltas():
+    queue = multiprocessing.Queue()
+    sink = queue_sink(queue)
+    registry = Registry()
+    sink(registry, registry)
+    registry.histogram("a").record(3)
+    sink(registry, registry)
+
+    pid, dump = queue.get(timeout=5)
+    assert pid == os.getpid()
+    assert dump["a", DURATION][1] == 1
+    assert queue.empty()
+
+
+def test_aggregator_merges_pool_metrics():
+    registry = Registry()
+    REGISTRY.histogram(name_of(square)).reset()
+    square(0)  # Recorded by the parent only.
+
+    with Aggregator(registry) as agg:
+        with agg.pool(2, _interval=60) as pool:
+            results = pool.map(square_pid, range(50))
+            pool.close()
+            pool.join()
+
+    assert [r[0] for r in results] == [x * x for x in range(50)]
+    snap = registry.snapshot()[name_of(square)]
+    assert snap["count"] == 50
+    assert agg.workers_ == {r[1] for r in results}
+    assert agg.messages_ == len(agg.workers_)
+
+
+def push_from_worker(queue, pushed):
+    # A worker_init of the pytest process would leave its Finalize behind.
+    worker_init(queue, 0.01)
+    REGISTRY.histogram("w").record(5)
+    pushed.wait(5)
+    REGISTRY.histogram("w").record(7)
+
+
+def test_aggregator_uses_no_fork_by_default():
+    assert Aggregator().context_.get_start_method() != "fork"
+
+
+def test_worker_init_pushes_periodically_and_on_exit():
+    registry = Registry()
+    with Aggregator(registry) as agg:
+        pushed = agg.context_.Event()
+        child = agg.context_.Process(
+            target=push_from_worker, args=(agg.queue_, pushed)
+        )
+        child.start()
+        deadline = time.time() + 5
+        while "w" not in registry.snapshot() and time.time() < deadline:
+            time.sleep(0.01)
+        assert registry.snapshot()["w"]["count"] == 1
+        pushed.set()
+        child.join(5)
+
+    assert child.exitcode == 0
+    assert registry.snapshot()["w"]["count"] == 2
+    assert registry.snapshot()["w"]["sum"] == 12
+    assert agg.workers_ == {child.pid}
@@ -1,7 +1,20 @@
 
+import asyncio
+import subprocess
+import time
+
 import pytest
 
-from cli.clihdr import runc 
+from cli.clihdr import (
+    PipelineError,
+    arunc,
+    arunc_many,
+    runc,
+    runc_many,
+    runc_pipe,
+    runc_spill,
+    runc_stream,
+)
 from fs.fsmgr import FsMgr 
 
 @pytest.fixture(name="_path_decoy")
@@ -21,3 +34,167 @@ def test_run_list_str(_path_decoy):
     list_cmd = ['cat',_path_decoy]
     res = runc(list_cmd)
     assert res['spectrum'] == 'blue'
+
+def test_runc_many_preserves_input_order(_path_decoy):
+    cmds = [
+        ['sh', '-c', 'sleep 0.2; echo \'{"i": 0}\''],
+        'cat {}'.format(_path_decoy),
+        ['echo', '{"i": 2}'],
+    ]
+    res = runc_many(cmds, _max_workers=3)
+    assert res[0] == {'i': 0}
+    assert res[1]['spectrum'] == 'blue'
+    assert res[2] == {'i': 2}
+
+def test_runc_many_keeps_per_command_errors(_path_decoy):
+    res = runc_many([['sh', '-c', 'exit 3'], ['cat', _path_decoy]])
+    assert isinstance(res[0], subprocess.CalledProcessError)
+    assert res[0].returncode == 3
+    assert res[1]['spectrum'] == 'blue'
+
+def test_runc_many_fail_fast_raises_first_error(_path_decoy):
+    cmds = [['sh', '-c', 'exit 2']] + [['cat', _path_decoy]] * 8
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        runc_many(cmds, _max_workers=1, _fail_fast=True)
+    assert excinfo.value.returncode == 2
+
+def test_runc_many_empty():
+    assert runc_many([]) == []
+
+def test_arunc_list_str(_path_decoy):
+    res = asyncio.run(arunc(['cat', _path_decoy]))
+    assert res['spectrum'] == 'blue'
+
+def test_arunc_decodes_like_runc():
+    cmd = ['printf', 'a\r\nb\rc']
+    assert asyncio.run(arunc(cmd)) == runc(cmd) == 'a\nb\nc'
+
+def test_arunc_str_with_embedded_str(_path_decoy):
+    res = asyncio.run(arunc('cat "{}"'.format(_path_decoy)))
+    assert res['spectrum'] == 'blue'
+
+def test_arunc_raises_on_non_zero_exit():
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        asyncio.run(arunc(['sh', '-c', 'echo oops >&2; exit 4']))
+    assert excinfo.value.returncode == 4
+    assert excinfo.value.stderr == 'oops\n'
+
+def test_arunc_timeout_kills_child():
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(arunc(['sleep', '5'], _timeout=0.2))
+    assert time.monotonic() - start < 2
+
+@pytest.mark.parametrize('cmd', [['true'], 'true'])
+def test_arunc_options_are_keyword_only(cmd):
+    with pytest.raises(TypeError, match='1 positional argument but 2'):
+        arunc(cmd, 1.0)
+
+def test_arunc_many_limits_concurrency(_path_decoy):
+    res = asyncio.run(
+        arunc_many([['cat', _path_decoy]] * 20 + [['false']], _limit=4)
+    )
+    assert len(res) == 21
+    assert all(r['spectrum'] == 'blue' for r in res[:20])
+    assert isinstance(res[20], subprocess.CalledProcessError)
+
+def test_arunc_many_fail_fast_cancels_remaining():
+    cmds = [['sh', '-c', 'exit 5']] + [['sleep', '5']] * 3
+    start = time.monotonic()
+    with pytest.raises(subprocess.CalledProcessError):
+        asyncio.run(arunc_many(cmds, _fail_fast=True))
+    assert time.monotonic() - start < 2
+
+def test_runc_stream_yields_lines():
+    res = list(runc_stream(['printf', 'a\nb\nc\n']))
+    assert res == ['a\n', 'b\n', 'c\n']
+
+def test_runc_stream_str_cmd(_path_decoy):
+    res = list(runc_stream('cat "{}"'.format(_path_decoy)))
+    assert res[1] == '"spectrum":"blue",\n'
+
+def test_runc_stream_json_lines():
+    cmd = ['printf', '{"i": 0}\n\n{"i": 1}\n']
+    assert list(runc_stream(cmd, _json_lines=True)) == [{'i': 0}, {'i': 1}]
+
+def test_runc_stream_first_line_before_exit():
+    start = time.monotonic()
+    it = runc_stream(['sh', '-c', 'echo first; sleep 5; echo last'])
+    assert next(it) == 'first\n'
+    it.close()
+    assert time.monotonic() - start < 2
+
+def test_runc_stream_does_not_deadlock_on_stderr():
+    cmd = ['sh', '-c', 'head -c 1000000 /dev/zero >&2; echo done']
+    assert list(runc_stream(cmd)) == ['done\n']
+
+def test_runc_stream_raises_on_non_zero_exit():
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        list(runc_stream(['sh', '-c', 'echo out; echo err >&2; exit 6']))
+    assert excinfo.value.returncode == 6
+    assert excinfo.value.stderr == 'err\n'
+
+@pytest.mark.parametrize('cmd', [['echo', '{}'], 'echo {}'])
+def test_runc_stream_options_are_keyword_only(cmd):
+    with pytest.raises(TypeError, match='1 positional argument but 2'):
+        runc_stream(cmd, True)
+
+def test_run_str_cmd_keeps_quoted_spaces():
+    res = runc('echo \'{"count": 3, "msg": "a  b"}\'')
+    assert res == {'count': 3, 'msg': 'a  b'}
+
+def test_runc_returns_plain_text_output():
+    assert runc(['echo', 'hello']) == 'hello\n'
+    assert runc('echo hello world') == 'hello world\n'
+
+def test_runc_pipe_connects_stages():
+    res = runc_pipe([['printf', '{"a": 1}\n{"a": 2}\n'], ['tail', '-n', '1']])
+    assert res == {'a': 2}
+
+def test_runc_pipe_str_stages(_path_decoy):
+    res = runc_pipe(['cat "{}"'.format(_path_decoy), 'grep -c spectrum'])
+    assert res == 1
+
+def test_runc_pipe_large_intermediate_output():
+    res = runc_pipe([['head', '-c', '10000000', '/dev/zero'], ['wc', '-c']])
+    assert res == 10000000
+
+def test_runc_pipe_tolerates_sigpipe_in_producer():
+    assert runc_pipe([['yes', '{"y": 1}'], ['head', '-n', '1']]) == {'y': 1}
+
+def test_runc_pipe_reports_per_stage_status():
+    stages = [['echo', '1'], ['sh', '-c', 'cat >/dev/null; echo bad >&2; exit 3'],
+              ['cat']]
+    with pytest.raises(PipelineError) as excinfo:
+        runc_pipe(stages)
+    assert excinfo.value.returncodes == [0, 3, 0]
+    assert excinfo.value.returncode == 3
+    assert excinfo.value.stderr == 'bad\n'
+    assert isinstance(excinfo.value, subprocess.CalledProcessError)
+
+def test_runc_pipe_empty_raises():
+    with pytest.raises(ValueError):
+        runc_pipe([])
+
+def test_runc_spill_small_output(_path_decoy):
+    with runc_spill(['cat', _path_decoy]) as out:
+        assert not out.is_spilled()
+        assert out.json()['spectrum'] == 'blue'
+
+def test_runc_spill_large_output_goes_to_disk():
+    cmd = 'sh -c "echo [; seq -s, 1 200000; echo ]"'
+    with runc_spill(cmd, _threshold=4096) as out:
+        assert out.is_spilled()
+        assert len(out) > 4096
+        assert sum(out.iter_items()) == 200000 * 200001 // 2
+
+def test_runc_spill_raises_on_non_zero_exit():
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        runc_spill(['sh', '-c', 'echo nope >&2; exit 7'])
+    assert excinfo.value.returncode == 7
+    assert excinfo.value.stderr == 'nope\n'
+
+@pytest.mark.parametrize('cmd', [['echo', '1'], 'echo 1'])
+def test_runc_spill_threshold_is_keyword_only(cmd):
+    with pytest.raises(TypeError, match='1 positional argument but 2'):
+        runc_spill(cmd, 4096)
@@ -0,0 +1,156 @@
+import json
+import os
+import subprocess
+import threading
+
+import pytest
+
+from cli.clihdr import runc
+from cli.cmdcache import CmdCache
+
+
+def test_get_missing_key_counts_a_miss():
+    cache = CmdCache()
+    assert cache.get(cache.key(["uname"])) is None
+    assert cache.stats() == {"hits": 0, "misses": 1, "size": 0, "maxsize": 128}
+
+
+def test_put_then_get_counts_a_hit():
+    cache = CmdCache()
+    key = cache.key(["uname"])
+    cache.put(key, "Linux\n")
+    assert cache.get(key) == "Linux\n"
+    assert cache.stats()["hits"] == 1
+
+
+def test_key_depends_on_cwd_and_selected_env(tmp_path, monkeypatch):
+    cache = CmdCache(_env=("XPYLIB_TEST_VAR",))
+    monkeypatch.setenv("XPYLIB_TEST_VAR", "a")
+    key_a = cache.key(["ls"])
+    monkeypatch.setenv("XPYLIB_TEST_VAR", "b")
+    key_b = cache.key(["ls"])
+    monkeypatch.chdir(tmp_path)
+    key_c = cache.key(["ls"])
+    assert len({key_a, key_b, key_c}) == 3
+
+
+def test_key_ignores_unselected_env(monkeypatch):
+    cache = CmdCache()
+    key_a = cache.key(["ls"])
+    monkeypatch.setenv("XPYLIB_TEST_VAR", "changed")
+    assert cache.key(["ls"]) == key_a
+
+
+def test_lru_eviction():
+    cache = CmdCache(_maxsize=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    cache.get("a")
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("cli.cmdcache.time.time", lambda: now[0])
+    cache = CmdCache(_ttl=10)
+    cache.put("a", "1")
+    now[0] += 5
+    assert cache.get("a") == "1"
+    now[0] += 6
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_invalid_size_raises():
+    with pytest.raises(ValueError):
+        CmdCache(_maxsize=0)
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = CmdCache(_filepath=path)
+    cache.put("a", "1")
+
+    reloaded = CmdCache(_filepath=path)
+    assert reloaded.get("a") == "1"
+
+
+def test_load_invalid_cache_file_raises(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps({"not": "a cache"}))
+    cache = CmdCache(_filepath=str(path))
+    assert cache.stats()["size"] == 0
+    with pytest.raises(ValueError):
+        cache.load()
+
+
+def test_truncated_cache_file_starts_empty(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text('[["a", "1", ')
+    cache = CmdCache(_filepath=str(path))
+    assert cache.get("a") is None
+    cache.put("a", "1")
+    assert json.loads(path.read_text())[0][:2] == ["a", "1"]
+
+
+def test_concurrent_puts_keep_the_file_valid(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = CmdCache(_maxsize=1000, _filepath=path)
+
+    def put(start):
+        for i in range(start, start + 50):
+            cache.put(str(i), "x" * 1000)
+
+    threads = [
+        threading.Thread(target=put, args=(i * 50,)) for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(CmdCache(_maxsize=1000, _filepath=path).entries_) == 400
+    assert os.listdir(tmp_path) == ["cache.json"]
+
+
+def test_save_without_file_raises():
+    with pytest.raises(ValueError):
+        CmdCache().save()
+
+
+def test_runc_reuses_cached_output(tmp_path):
+    counter = tmp_path / "count"
+    cmd = ["sh", "-c", f'echo x >> {counter}; echo \'{{"ok": true}}\'']
+    cache = CmdCache()
+
+    assert runc(cmd, _cache=cache) == {"ok": True}
+    assert runc(cmd, _cache=cache) == {"ok": True}
+
+    assert counter.read_text() == "x\n"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_runc_str_cmd_with_cache(tmp_path):
+    decoy = tmp_path / "decoy.json"
+    decoy.write_text('{"spectrum": "blue"}')
+    cache = CmdCache()
+    assert runc(f"cat {decoy}", _cache=cache)["spectrum"] == "blue"
+    decoy.write_text('{"spectrum": "red"}')
+    assert runc(f"cat {decoy}", _cache=cache)["spectrum"] == "blue"
+
+
+def test_runc_does_not_cache_failures():
+    cache = CmdCache()
+    with pytest.raises(subprocess.CalledProcessError):
+        runc(["false"], _cache=cache)
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.parametrize("cmd", [["echo", "1"], "echo 1"])
+def test_runc_options_are_keyword_only(cmd):
+    with pytest.raises(TypeError, match="1 positional argument but 2"):
+        runc(cmd, CmdCache())
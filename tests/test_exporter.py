@@ -0,0 +1,248 @@
+import json
+import time
+import urllib.request
+
+import pytest
+
+from metric.exporter import (
+    Flusher,
+    file_sink,
+    serve,
+    to_json,
+    to_prometheus,
+    write,
+)
+from metric.observer import measure
+from metric.registry import (
+    FIRST_ITEM,
+    ITEMS,
+    NET_BYTES,
+    PEAK_BYTES,
+    Registry,
+)
+
+
+def make_registry():
+    registry = Registry()
+    for value in (100, 200, 300):
+        registry.histogram("app.parse").record(value)
+    registry.histogram('odd"name').record(7)
+    return registry
+
+
+def test_to_prometheus_renders_cumulative_buckets():
+    text = to_prometheus(make_registry())
+    lines = text.splitlines()
+    family = "xpylib_measure_duration_seconds"
+    assert f"# TYPE {family} histogram" in lines
+    buckets = [
+        line for line in lines
+        if line.startswith(f'{family}_bucket{{name="app.parse"')
+    ]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)
+    assert counts[0] == 3
+    assert buckets[-1] == f'{family}_bucket{{name="app.parse",le="+Inf"}} 3'
+    assert f'{family}_sum{{name="app.parse"}} 6e-07' in lines
+    assert f'{family}_count{{name="app.parse"}} 3' in lines
+    assert f'{family}_count{{name="odd\\"name"}} 1' in lines
+    assert text.endswith("\n")
+
+
+def test_to_prometheus_has_one_family_per_unit():
+    registry = Registry()
+    registry.histogram("f").record(2_000_000_000)
+    registry.histogram("f", FIRST_ITEM).record(1000)
+    registry.histogram("f", ITEMS).record(3)
+    registry.histogram("f", PEAK_BYTES).record(4096)
+    registry.histogram("f", NET_BYTES).record(0)
+    lines = to_prometheus(registry, "m").splitlines()
+
+    types = [line.split()[2] for line in lines if line.startswith("# TYPE")]
+    assert types == [
+        "m_duration_seconds",
+        "m_first_item_seconds",
+        "m_items",
+        "m_peak_bytes",
+        "m_net_bytes",
+    ]
+    assert 'm_duration_seconds_sum{name="f"} 2' in lines
+    assert 'm_first_item_seconds_sum{name="f"} 1e-06' in lines
+    assert 'm_items_bucket{name="f",le="3"} 1' in lines
+    assert 'm_peak_bytes_bucket{name="f",le="4095"} 0' in lines
+    assert 'm_peak_bytes_bucket{name="f",le="16383"} 1' in lines
+    assert 'm_net_bytes_bucket{name="f",le="1023"} 1' in lines
+
+
+def test_to_prometheus_keeps_method_named_items_a_duration():
+    registry = Registry()
+
+    class Bag:
+        @measure(_registry=registry)
+        def items(self):
+            return [1, 2]
+
+    Bag().items()
+    name = f"{Bag.items.__module__}.{Bag.items.__qualname__}"
+    assert name.endswith(".items")
+    lines = to_prometheus(registry, "m").splitlines()
+    assert f'm_duration_seconds_count{{name="{name}"}} 1' in lines
+    assert not any(line.startswith("m_items") for line in lines)
+
+
+def test_to_prometheus_boundaries_are_fixed():
+    def bounds(registry):
+        return [
+            line.split("le=")[1].split("}")[0]
+            for line in to_prometheus(registry, "m").splitlines()
+            if line.startswith("m_duration_seconds_bucket")
+        ]
+
+    small = Registry()
+    small.histogram("x").record(10)
+    large = Registry()
+    large.histogram("x").record(10**10)
+    assert bounds(small) == bounds(large)
+    assert len(bounds(small)) == 15
+
+
+def test_to_prometheus_bucket_bounds_are_inclusive():
+    registry = Registry()
+    registry.histogram("x", ITEMS).record(255)
+    registry.histogram("x", ITEMS).record(256)
+    lines = to_prometheus(registry, "m").splitlines()
+    assert 'm_items_bucket{name="x",le="255"} 1' in lines
+    assert 'm_items_bucket{name="x",le="1023"} 2' in lines
+
+
+def test_to_json_snapshot():
+    data = to_json(make_registry())
+    assert data["metrics"]["app.parse"]["count"] == 3
+    assert data["timestamp"] <= time.time()
+    json.dumps(data)
+
+
+def test_write_prometheus_and_json(tmp_path):
+    registry = make_registry()
+    prom = tmp_path / "metrics.prom"
+    write(str(prom), registry)
+    assert "xpylib_measure_duration_seconds_sum" in prom.read_text()
+
+    out = tmp_path / "metrics.json"
+    write(str(out), registry, "json")
+    assert json.loads(out.read_text())["metrics"]["app.parse"]["sum"] == 600
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "metrics.json",
+        "metrics.prom",
+    ]
+
+
+def test_write_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write(str(tmp_path / "x"), Registry(), "xml")
+    with pytest.raises(ValueError):
+        file_sink(str(tmp_path / "x"), "xml")
+
+
+def test_flusher_flush_computes_deltas():
+    registry = Registry()
+    seen = []
+    flusher = Flusher(60, registry, [lambda c, d: seen.append((c, d))])
+
+    registry.histogram("a").record(10)
+    flusher.flush()
+    registry.histogram("a").record(20)
+    cumulative, delta = flusher.flush()
+
+    assert cumulative.snapshot()["a"]["count"] == 2
+    assert delta.snapshot()["a"]["count"] == 1
+    assert delta.snapshot()["a"]["sum"] == 20
+    assert len(seen) == 2
+    assert flusher.delta_ is delta
+
+
+def test_flusher_thread_writes_files(tmp_path):
+    registry = make_registry()
+    target = tmp_path / "delta.json"
+    with Flusher(0.01, registry, [file_sink(str(target), "json", True)]) as f:
+        assert f.is_running()
+        deadline = time.time() + 5
+        while not target.exists() and time.time() < deadline:
+            time.sleep(0.01)
+    assert not f.is_running()
+    # The final flush on stop holds no new values.
+    assert json.loads(target.read_text())["metrics"]["app.parse"]["count"] == 0
+
+
+def test_flusher_keeps_running_after_sink_error():
+    registry = Registry()
+    calls = []
+
+    def broken(_cumulative, _delta):
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    flusher = Flusher(0.01, registry, [broken])
+    flusher.start()
+    deadline = time.time() + 5
+    while len(calls) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    flusher.stop(_flush=False)
+    assert len(calls) >= 2
+    assert isinstance(flusher.error_, RuntimeError)
+    with pytest.raises(RuntimeError):
+        flusher.flush()
+
+
+def test_flusher_rejects_non_positive_interval():
+    with pytest.raises(ValueError):
+        Flusher(0)
+
+
+def fetch(server, path):
+    host, port = server.server_address[:2]
+    with urllib.request.urlopen(f"http://{host}:{port}{path}") as resp:
+        return resp.headers["Content-Type"], resp.read().decode()
+
+
+def test_serve_exposes_live_registry():
+    server = serve(0, make_registry())
+    try:
+        ctype, body = fetch(server, "/metrics")
+        assert ctype.startswith("text/plain")
+        assert (
+            'xpylib_measure_duration_seconds_count{name="app.parse"} 3'
+            in body
+        )
+
+        ctype, body = fetch(server, "/metrics.json?x=1")
+        assert ctype == "application/json"
+        assert json.loads(body)["metrics"]["app.parse"]["count"] == 3
+
+        with pytest.raises(urllib.error.HTTPError):
+            fetch(server, "/delta")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_serve_exposes_flusher_snapshots():
+    registry = make_registry()
+    flusher = Flusher(60, registry)
+    flusher.flush()
+    registry.histogram("app.parse").record(400)
+    flusher.flush()
+
+    server = serve(0, _flusher=flusher)
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        _, body = fetch(server, "/delta.json")
+        assert json.loads(body)["metrics"]["app.parse"]["sum"] == 400
+        _, body = fetch(server, "/metrics")
+        assert (
+            'xpylib_measure_duration_seconds_count{name="app.parse"} 4'
+            in body
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import harness  # noqa: E402
+import suite  # noqa: E402
+
+
+def run(samples):
+    result = harness.new_run("quick")
+    harness.add_result(result, "bench", samples)
+    return result
+
+
+def spread(median):
+    return [median * (1 + i / 100) for i in range(-5, 5)]
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        # One-sided normal approximation with continuity correction, as
+        # scipy.stats.mannwhitneyu(b, a, alternative="greater",
+        # method="asymptotic").
+        ([1, 2, 3, 4, 5], [6, 7, 8, 9, 10], 0.006093),
+        ([1, 2, 3], [4, 5, 6], 0.040428),
+        ([6, 7, 8, 9, 10], [1, 2, 3, 4, 5], 0.996692),
+        # Ties get their mean rank and shrink the variance.
+        ([1, 2, 2, 3], [2, 3, 3, 4], 0.086017),
+    ],
+)
+def test_mann_whitney_p_values(a, b, expected):
+    assert harness.mann_whitney(a, b) == pytest.approx(expected, abs=1e-6)
+
+
+def test_mann_whitney_without_evidence():
+    assert harness.mann_whitney([], [1.0]) == 1.0
+    assert harness.mann_whitney([1.0] * 5, [1.0] * 5) == 1.0
+
+
+def test_compare_passes_within_threshold():
+    rows = harness.compare(run(spread(1.0)), run(spread(1.05)), 0.10)
+    assert [row["status"] for row in rows] == ["same"]
+    assert rows[0]["ratio"] == pytest.approx(1.05)
+
+
+def test_compare_flags_significant_slowdown_and_speedup():
+    rows = harness.compare(run(spread(1.0)), run(spread(1.5)), 0.10)
+    assert rows[0]["status"] == "regression"
+    assert rows[0]["p"] < harness.DEFAULT_ALPHA
+
+    rows = harness.compare(run(spread(1.5)), run(spread(1.0)), 0.10)
+    assert rows[0]["status"] == "improvement"
+
+
+def test_compare_needs_significance():
+    # Twice slower in median, but too few samples to rule out noise.
+    rows = harness.compare(run([1.0, 2.0]), run([2.0, 1.0, 3.0]), 0.10)
+    assert rows[0]["status"] == "same"
+
+
+def test_main_exits_non_zero_on_regression(tmp_path, monkeypatch, capsys):
+    median = {"value": 1.0}
+    monkeypatch.setattr(
+        suite, "workloads", lambda *_: [("bench", lambda: None)]
+    )
+    monkeypatch.setattr(
+        harness, "sample", lambda *_: spread(median["value"])
+    )
+    baseline = str(tmp_path / "baseline.json")
+    args = ["--workdir", str(tmp_path), "--threshold", "0.10"]
+
+    assert suite.main(args + ["--save", baseline]) == 0
+    median["value"] = 1.05
+    assert suite.main(args + ["--compare", baseline]) == 0
+    median["value"] = 1.5
+    assert suite.main(args + ["--compare", baseline]) == 1
+    assert "regression" in capsys.readouterr().out
+
+
+def test_workloads_generate_data_of_selected_benchmarks_only(tmp_path):
+    benches = dict(suite.workloads("huge", str(tmp_path)))
+    assert "jsonmgr.read[1GB]" in benches
+    assert os.listdir(tmp_path) == []
+
+    assert len(benches["strhdr.tokenize"]()()) == len(suite.CMDS)
+    assert os.listdir(tmp_path) == []
@@ -1,7 +1,14 @@
+import asyncio
 import json
 import pytest
 
-from typehdr.jsonhdr  import json_str_to_dict
+from typehdr.jsonhdr  import (
+    JSON_LINES,
+    RECORDS,
+    STRICT,
+    TOLERANT,
+    json_str_to_dict,
+)
 
 
 def test_returns_none_when_func_returns_none():
@@ -82,3 +89,119 @@ def test_preserves_wrapped_function_name_via_wraps():
     l_var = original_name()
     assert original_name.__name__ == "original_name"
     assert l_var['ok'] == True
+
+
+def test_parses_json_string_returned_by_coroutine():
+    @json_str_to_dict
+    async def f():
+        return json.dumps({"a": 1})
+
+    assert asyncio.iscoroutinefunction(f)
+    assert asyncio.run(f()) == {"a": 1}
+
+
+def test_raises_type_error_for_coroutine_returning_non_str():
+    @json_str_to_dict
+    async def f():
+        return 123
+
+    with pytest.raises(TypeError) as excinfo:
+        asyncio.run(f())
+
+    assert str(excinfo.value) == "Expected JSON string from f,got int"
+
+
+def test_tolerant_returns_plain_text_unchanged():
+    @json_str_to_dict(_strategy=TOLERANT)
+    def f(s):
+        return s
+
+    assert f("hello\n") == "hello\n"
+    assert f("") == ""
+    assert f("   \n") == "   \n"
+    assert f("  {\"a\": 1}\n") == {"a": 1}
+    assert f("3\n") == 3
+    assert f("null") is None
+
+
+def test_tolerant_returns_invalid_json_unchanged():
+    @json_str_to_dict(_strategy=TOLERANT)
+    def f(s):
+        return s
+
+    assert f("no such file") == "no such file"
+    assert f("[WARN] disk full") == "[WARN] disk full"
+
+
+def test_tolerant_skips_parse_for_text(monkeypatch):
+    calls = []
+    monkeypatch.setattr(json, "loads", lambda s: calls.append(s))
+
+    @json_str_to_dict(_strategy=TOLERANT)
+    def f():
+        return "hello"
+
+    assert f() == "hello"
+    assert calls == []
+
+
+def test_tolerant_accepts_bytes():
+    @json_str_to_dict(_strategy=TOLERANT)
+    def f(b):
+        return b
+
+    assert f(b'{"a": 1}') == {"a": 1}
+    assert f(b"hello") == b"hello"
+    assert f(b"\xff\xfe") == b"\xff\xfe"
+
+
+def test_strict_accepts_bytes():
+    @json_str_to_dict
+    def f():
+        return bytearray(b'[1, 2]')
+
+    assert f() == [1, 2]
+
+
+def test_json_lines_returns_every_document():
+    @json_str_to_dict(_strategy=JSON_LINES)
+    def f(s):
+        return s
+
+    assert f('{"a": 1}\n{"a": 2}\n') == [{"a": 1}, {"a": 2}]
+    assert f(b'1 2\n[3]') == [1, 2, [3]]
+    assert f("\n") == []
+    with pytest.raises(json.JSONDecodeError):
+        f('{"a": 1}\nnope\n')
+
+
+def test_strategy_applies_to_coroutines():
+    @json_str_to_dict(_strategy=TOLERANT)
+    async def f():
+        return "plain"
+
+    assert asyncio.run(f()) == "plain"
+
+
+def test_unknown_strategy_raises_value_error():
+    with pytest.raises(ValueError):
+        json_str_to_dict(_strategy="yaml")
+
+
+def test_explicit_strict_strategy_raises_on_text():
+    @json_str_to_dict(_strategy=STRICT)
+    def f():
+        return "hello"
+
+    with pytest.raises(json.JSONDecodeError):
+        f()
+
+
+def test_records_strategy_decodes_objects_as_records():
+    @json_str_to_dict(_strategy=RECORDS)
+    def f():
+        return json.dumps([{"a": i, "b": 2} for i in range(10)])
+
+    records = f()
+    assert [r.a for r in records] == list(range(10))
+    assert not hasattr(records[0], "__dict__")
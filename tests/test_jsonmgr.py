@@ -76,3 +76,19 @@ def test_write_file_not_found():
     
     with pytest.raises(FileNotFoundError):
         mgr.write(payload)
+
+
+def test_read_records_decodes_compact_records(tmp_path):
+    p = tmp_path / "records.json"
+    JsonMgr(str(p)).write({"hosts": [{"name": "a", "port": 1}] * 10})
+
+    data = JsonMgr(str(p)).read_records()
+    assert [h.port for h in data["hosts"]] == [1] * 10
+
+    data = JsonMgr(str(p)).read_records(("name", "port"))
+    assert data["hosts"][2].name == "a"
+
+
+def test_read_records_raises_on_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        JsonMgr(str(tmp_path / "missing.json")).read_records()
@@ -23,3 +23,84 @@ def test_mutate(_l, expected):
 
 def test_mutate_empty():
     assert ListHdr.mutate([], StrHdr.detect_embedded_str) == []
+
+
+def test_pipeline_matches_mutate():
+    data = ["I", "am", "the", "'blue'", '"spectrum"']
+    predicat = StrHdr.detect_embedded_str
+    pipeline = ListHdr.pipeline().unquote(predicat)
+    assert pipeline.run(data) == ListHdr.mutate(data, predicat)
+
+
+def test_pipeline_fuses_stages_in_one_pass():
+    seen = []
+
+    def trace(s):
+        seen.append(s)
+        return s
+
+    pipeline = (
+        ListHdr.pipeline()
+        .map(trace)
+        .filter(lambda s: s != "x")
+        .map(str.upper)
+        .where(lambda s: s.startswith("B"), lambda s: s * 2)
+    )
+    stream = pipeline.stream(iter(["a", "x", "b"]))
+    assert next(stream) == "A"
+    assert seen == ["a"]
+    assert list(stream) == ["BB"]
+    assert seen == ["a", "x", "b"]
+
+
+def test_pipeline_is_immutable_and_reusable():
+    base = ListHdr.pipeline().map(str.strip)
+    upper = base.map(str.upper)
+    assert len(base) == 1
+    assert len(upper) == 2
+    assert base.run([" a "]) == ["a"]
+    assert upper.run([" a "]) == ["A"]
+    assert upper.run([" b "]) == ["B"]
+
+
+def test_pipeline_filter_none_keeps_truthy_items():
+    assert ListHdr.pipeline().filter().run(["", "a", "", "b"]) == ["a", "b"]
+
+
+def test_pipeline_apply_in_place():
+    data = ["  a", "", "'b' ", "c  "]
+    keep = data
+    result = (
+        ListHdr.pipeline()
+        .map(str.strip)
+        .filter(None)
+        .unquote(StrHdr.detect_embedded_str)
+        .apply(data)
+    )
+    assert result is keep
+    assert data == ["a", "b", "c"]
+
+
+def test_pipeline_batches():
+    pipeline = ListHdr.pipeline().filter(str.isdigit).map(int)
+    data = (str(i) if i % 3 else "x" for i in range(10))
+    batches = list(pipeline.batches(data, 4))
+    assert batches == [[1, 2, 4, 5], [7, 8]]
+    assert [i for b in pipeline.batches("x1x", 1) for i in b] == [1]
+
+
+def test_pipeline_batches_matches_stream():
+    pipeline = (
+        ListHdr.pipeline()
+        .map(str.strip)
+        .filter(None)
+        .unquote(StrHdr.detect_embedded_str)
+    )
+    data = [" 'a' ", "", "b", '"c"', "  "] * 50
+    flat = [i for b in pipeline.batches(data, 7) for i in b]
+    assert flat == pipeline.run(data)
+
+
+def test_pipeline_batches_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        ListHdr.pipeline().batches([1], 0)
@@ -1,9 +1,27 @@
+import asyncio
+import os
 import re
+import signal
+import sys
+import time
+import tracemalloc
+import types
 
-from metric.observer import measure
+import pytest
+
+from metric import observer
+from metric.observer import measure, print_sink
+from metric.registry import (
+    FIRST_ITEM,
+    ITEMS,
+    NET_BYTES,
+    PEAK_BYTES,
+    REGISTRY,
+    Registry,
+)
 
 def test_measure_returns_result_and_prints_timing(capsys):
-    @measure
+    @measure(_sink=print_sink)
     def add(a, b):
         return a + b
 
@@ -13,3 +31,353 @@ def test_measure_returns_result_and_prints_timing(capsys):
     captured = capsys.readouterr().out.strip()
     # Example: "add executed in 0.000001 seconds"
     assert re.match(r"^add executed in \d+\.\d{6} seconds$", captured)
+
+def test_measure_does_not_print_by_default(capsys):
+    @measure
+    def add(a, b):
+        return a + b
+
+    assert add(2, 3) == 5
+    assert capsys.readouterr().out == ""
+
+def test_measure_records_into_default_registry():
+    @measure
+    def mul(a, b):
+        return a * b
+
+    name = f"{__name__}.test_measure_records_into_default_registry.<locals>.mul"
+    REGISTRY.histogram(name).reset()
+    for i in range(10):
+        mul(i, i)
+
+    stats = REGISTRY.get(name).snapshot()
+    assert stats["count"] == 10
+    assert 0 < stats["min"] <= stats["p50"] <= stats["p99"] <= stats["max"]
+
+def test_measure_records_into_given_registry():
+    registry = Registry()
+
+    @measure(_registry=registry)
+    def noop():
+        pass
+
+    noop()
+    (stats,) = registry.snapshot().values()
+    assert stats["count"] == 1
+
+def test_measure_records_failing_calls():
+    registry = Registry()
+
+    @measure(_registry=registry)
+    def fail():
+        raise KeyError("x")
+
+    with pytest.raises(KeyError):
+        fail()
+    (stats,) = registry.snapshot().values()
+    assert stats["count"] == 1
+
+def test_measure_preserves_metadata():
+    @measure
+    def documented():
+        """Doc."""
+
+    assert documented.__name__ == "documented"
+    assert documented.__doc__ == "Doc."
+
+def test_measure_sampling_times_one_call_out_of_n():
+    registry = Registry()
+
+    @measure(_registry=registry, _sample=10)
+    def noop():
+        pass
+
+    for _ in range(100):
+        noop()
+    (stats,) = registry.snapshot().values()
+    assert stats["count"] == 10
+
+def test_measure_invalid_sample_raises():
+    with pytest.raises(ValueError):
+        measure(lambda: None, _sample=0)
+
+SOURCE = '''
+from metric.observer import measure
+
+@measure(_registry=REG)
+def compute(x):
+    return x + 1
+
+class Holder:
+    @staticmethod
+    @measure(_registry=REG)
+    def static(x):
+        return x * 2
+'''
+
+@pytest.fixture(name="_module")
+def module_fixture():
+    module = types.ModuleType("measured_mod")
+    module.REG = Registry()
+    sys.modules["measured_mod"] = module
+    yield module
+    del sys.modules["measured_mod"]
+    observer.enable()
+    observer.reset_switches()
+
+def load(module):
+    exec(compile(SOURCE, "measured_mod", "exec"), module.__dict__)
+    return module
+
+def test_disable_swaps_wrapper_for_original(_module):
+    mod = load(_module)
+    wrapped = mod.compute
+    assert hasattr(wrapped, "__wrapped__")
+
+    observer.disable("measured_mod.compute")
+    assert mod.compute is wrapped.__wrapped__
+    assert not observer.is_enabled("measured_mod.compute")
+    assert observer.is_enabled()
+    assert mod.compute(1) == 2
+
+    observer.enable("measured_mod.compute")
+    assert mod.compute is wrapped
+    mod.compute(1)
+    assert mod.REG.get("measured_mod.compute").snapshot()["count"] == 1
+
+def test_global_disable_swaps_static_methods(_module):
+    mod = load(_module)
+    observer.disable()
+    assert not hasattr(mod.Holder.static, "__wrapped__")
+    assert mod.Holder.static(3) == 6
+
+    observer.enable()
+    assert hasattr(mod.Holder.static, "__wrapped__")
+    assert mod.Holder.static(3) == 6
+    assert mod.REG.get("measured_mod.Holder.static").snapshot()["count"] == 1
+
+def test_decorating_while_disabled_returns_original(_module):
+    observer.disable()
+    mod = load(_module)
+    assert not hasattr(mod.compute, "__wrapped__")
+
+    observer.enable()
+    assert mod.compute(1) == 2
+    assert mod.REG.get("measured_mod.compute").snapshot()["count"] == 1
+
+def test_per_function_setting_overrides_global(_module):
+    mod = load(_module)
+    observer.disable()
+    observer.enable("measured_mod.compute")
+    assert hasattr(mod.compute, "__wrapped__")
+    assert not hasattr(mod.Holder.static, "__wrapped__")
+
+    observer.reset_switches()
+    assert not hasattr(mod.compute, "__wrapped__")
+
+def test_disabled_local_function_is_not_measured():
+    registry = Registry()
+
+    @measure(_registry=registry)
+    def local():
+        return 1
+
+    observer.disable()
+    try:
+        assert local() == 1
+    finally:
+        observer.enable()
+    assert local() == 1
+    (stats,) = registry.snapshot().values()
+    assert stats["count"] == 1
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="no SIGUSR2")
+def test_toggle_on_signal():
+    previous = signal.getsignal(signal.SIGUSR2)
+    observer.toggle_on_signal()
+    try:
+        os.kill(os.getpid(), signal.SIGUSR2)
+        assert not observer.is_enabled()
+        os.kill(os.getpid(), signal.SIGUSR2)
+        assert observer.is_enabled()
+    finally:
+        signal.signal(signal.SIGUSR2, previous)
+
+def test_measure_coroutine_times_awaited_duration():
+    registry = Registry()
+
+    @measure(_registry=registry)
+    async def nap():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    assert asyncio.iscoroutinefunction(nap)
+    assert asyncio.run(nap()) == "done"
+    (stats,) = registry.snapshot().values()
+    assert stats["count"] == 1
+    assert stats["min"] >= 40_000_000
+
+def test_measure_generator_times_iteration():
+    registry = Registry()
+
+    @measure(_registry=registry)
+    def produce(n):
+        time.sleep(0.02)
+        for i in range(n):
+            yield i
+        time.sleep(0.02)
+
+    assert list(produce(5)) == [0, 1, 2, 3, 4]
+    name = min(registry.snapshot(), key=len)
+    total = registry.get(name).snapshot()
+    first = registry.get(name, FIRST_ITEM).snapshot()
+    items = registry.get(name, ITEMS).snapshot()
+    assert total["count"] == 1
+    assert first["min"] >= 15_000_000
+    assert total["min"] >= first["min"] + 15_000_000
+    assert items["sum"] == 5
+
+def test_measure_generator_supports_send_and_return():
+    registry = Registry()
+
+    @measure(_registry=registry)
+    def echo():
+        received = []
+        while True:
+            value = yield len(received)
+            if value is None:
+                return received
+            received.append(value)
+
+    gen = echo()
+    assert next(gen) == 0
+    assert gen.send("a") == 1
+    with pytest.raises(StopIteration) as excinfo:
+        gen.send(None)
+    assert excinfo.value.value == ["a"]
+
+def test_measure_generator_closed_early_is_recorded():
+    registry = Registry()
+
+    @measure(_registry=registry)
+    def forever():
+        while True:
+            yield 1
+
+    gen = forever()
+    next(gen)
+    gen.close()
+    name = min(registry.snapshot(), key=len)
+    assert registry.get(name, ITEMS).snapshot()["sum"] == 1
+
+def test_measure_async_generator_times_iteration():
+    registry = Registry()
+
+    @measure(_registry=registry)
+    async def ticks(n):
+        for i in range(n):
+            await asyncio.sleep(0.01)
+            yield i
+
+    async def consume():
+        return [i async for i in ticks(3)]
+
+    assert asyncio.run(consume()) == [0, 1, 2]
+    name = min(registry.snapshot(), key=len)
+    assert registry.get(name).snapshot()["min"] >= 25_000_000
+    assert registry.get(name, FIRST_ITEM).snapshot()["count"] == 1
+    assert registry.get(name, ITEMS).snapshot()["sum"] == 3
+
+def test_measure_memory_records_peak_and_net_bytes():
+    registry = Registry()
+    kept = []
+
+    @measure(_registry=registry, _memory=1)
+    def build(n):
+        data = [bytes(1000) for _ in range(n)]
+        kept.append(data[0])
+        return len(data)
+
+    assert build(1000) == 1000
+    name = min(registry.snapshot(), key=len)
+    peak = registry.get(name, PEAK_BYTES).snapshot()
+    net = registry.get(name, NET_BYTES).snapshot()
+    assert peak["count"] == 1
+    assert peak["max"] >= 1_000_000
+    assert 0 < net["max"] < peak["max"]
+    assert registry.get(name).snapshot()["count"] == 1
+    assert not tracemalloc.is_tracing()
+
+def test_measure_memory_samples_calls():
+    registry = Registry()
+
+    @measure(_registry=registry, _memory=3)
+    def noop():
+        return None
+
+    for _ in range(7):
+        noop()
+    name = min(registry.snapshot(), key=len)
+    assert registry.get(name).snapshot()["count"] == 7
+    assert registry.get(name, PEAK_BYTES).snapshot()["count"] == 3
+
+def test_measure_memory_keeps_outer_peak_of_nested_calls():
+    registry = Registry()
+
+    @measure(_registry=registry, _memory=1)
+    def inner():
+        return None
+
+    @measure(_registry=registry, _memory=1)
+    def outer():
+        data = bytearray(2_000_000)
+        del data
+        inner()
+
+    outer()
+    stats = {
+        iname.rsplit(".", 1)[-1]: istats
+        for iname, istats in registry.snapshot(PEAK_BYTES).items()
+    }
+    assert stats["outer"]["max"] >= 2_000_000
+    assert stats["inner"]["max"] < 2_000_000
+
+def test_measure_memory_leaves_running_tracemalloc_on():
+    registry = Registry()
+
+    @measure(_registry=registry, _memory=1)
+    def noop():
+        return None
+
+    tracemalloc.start()
+    try:
+        noop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+def test_measure_memory_rejects_generators_and_negative_rates():
+    def gen():
+        yield 1
+
+    with pytest.raises(ValueError):
+        measure(gen, _memory=1)
+    with pytest.raises(ValueError):
+        measure(lambda: None, _memory=-1)
+
+def test_top_allocators_ranks_functions():
+    registry = Registry()
+
+    @measure(_registry=registry, _memory=1)
+    def small():
+        return bytearray(1000)
+
+    @measure(_registry=registry, _memory=1)
+    def large():
+        return bytearray(1_000_000)
+
+    small()
+    large()
+    names = [iname for iname, _ in observer.top_allocators(_registry=registry)]
+    assert [iname.rsplit(".", 1)[-1] for iname in names] == ["large", "small"]
+    assert len(observer.top_allocators(1, registry)) == 1
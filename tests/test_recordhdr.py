@@ -0,0 +1,189 @@
+import io
+import json
+from array import array
+
+import pytest
+
+from typehdr.recordhdr import (
+    MAX_SHAPES,
+    MIN_RECORDS,
+    NAMEDTUPLE,
+    SLOTS,
+    RecordHdr,
+)
+
+ITEMS = [
+    {"id": 1, "name": "a", "score": 0.5},
+    {"id": 2, "name": "b", "score": 2},
+    {"id": 3, "name": "c", "score": 1.25},
+]
+
+
+def test_record_class_is_cached_per_shape():
+    first = RecordHdr.record_class(("a", "b"))
+    assert RecordHdr.record_class(["a", "b"]) is first
+    assert RecordHdr.record_class(("b", "a")) is not first
+    assert RecordHdr.record_class(("a", "b"), NAMEDTUPLE) is not first
+
+
+def test_slots_records_have_no_dict():
+    record = RecordHdr.record_class(("a", "b"))(1, 2)
+    assert not hasattr(record, "__dict__")
+    assert (record.a, record.b) == (1, 2)
+    record.a = 5
+    assert record.a == 5
+    with pytest.raises(AttributeError):
+        record.c = 3
+
+
+def test_record_class_rejects_invalid_shapes():
+    with pytest.raises(ValueError):
+        RecordHdr.record_class(("a-b",))
+    with pytest.raises(ValueError):
+        RecordHdr.record_class(("class",))
+    with pytest.raises(ValueError):
+        RecordHdr.record_class(("_private",))
+    with pytest.raises(ValueError):
+        RecordHdr.record_class(("a", "a"))
+    with pytest.raises(ValueError):
+        RecordHdr.record_class(("a",), "struct")
+
+
+def test_infer_fields_merges_sampled_keys():
+    items = [{"a": 1}, {"a": 2, "b": 3}, {"c": 4}]
+    assert RecordHdr.infer_fields(items) == ("a", "b", "c")
+    assert RecordHdr.infer_fields(items, 2) == ("a", "b")
+
+
+@pytest.mark.parametrize("kind", [SLOTS, NAMEDTUPLE])
+def test_to_records(kind):
+    items = ITEMS + [{"id": 4, "extra": 1}]
+    records = RecordHdr.to_records(items, ("id", "name", "score"), kind)
+    assert [r.id for r in records] == [1, 2, 3, 4]
+    assert records[3].name is None
+    assert not hasattr(records[3], "extra")
+
+
+@pytest.mark.parametrize("kind", [SLOTS, NAMEDTUPLE])
+def test_loads_infers_shapes(kind):
+    doc = json.dumps({"total": 9, "items": ITEMS * 3, "odd": [{"a-b": 1}]})
+    data = RecordHdr.loads(doc, _kind=kind)
+    assert data["total"] == 9
+    assert [r.name for r in data["items"]] == ["a", "b", "c"] * 3
+    assert type(data["items"][0]) is type(data["items"][8])
+    assert not isinstance(data["items"][0], dict)
+    assert data["odd"] == [{"a-b": 1}]
+
+
+def test_loads_keeps_top_level_and_nested_objects_as_dicts():
+    doc = json.dumps({"status": "ok", "data": {"x": 1}})
+    assert RecordHdr.loads(doc) == {"status": "ok", "data": {"x": 1}}
+
+    doc = json.dumps([{"id": i, "pos": {"x": i}} for i in range(20)])
+    data = RecordHdr.loads(doc)
+    assert data[19].id == 19
+    assert data[19].pos == {"x": 19}
+
+
+def test_loads_keeps_short_and_mixed_arrays_as_dicts():
+    short = [{"a": i} for i in range(MIN_RECORDS - 1)]
+    assert RecordHdr.loads(json.dumps(short)) == short
+
+    mixed = [{"a": i} if i % 2 else {"b": i} for i in range(MIN_RECORDS)]
+    assert RecordHdr.loads(json.dumps(mixed)) == mixed
+
+    # A shape frequent elsewhere in the document stays a dict in a short
+    # array, and every object of a long array becomes a record.
+    doc = json.dumps({"few": [{"a": 0}], "many": [{"a": 1}] * MIN_RECORDS})
+    data = RecordHdr.loads(doc)
+    assert data["few"] == [{"a": 0}]
+    assert [type(r) for r in data["many"]] == [type(data["many"][0])] * 8
+    assert data["many"][0].a == 1
+
+
+def test_loads_fixes_nested_arrays():
+    doc = json.dumps([[{"a": i}] * MIN_RECORDS for i in range(3)])
+    data = RecordHdr.loads(doc)
+    assert [r.a for r in data[2]] == [2] * MIN_RECORDS
+
+
+def test_loads_with_fields_converts_matching_objects_only():
+    doc = json.dumps({"items": ITEMS, "meta": {"id": 1}, "empty": {}})
+    data = RecordHdr.loads(doc, ("id", "name", "score"), NAMEDTUPLE)
+    assert isinstance(data, dict)
+    assert data["items"][1] == (2, "b", 2)
+    assert data["items"][1].score == 2
+    assert data["meta"] == {"id": 1}
+    assert data["empty"] == {}
+
+
+@pytest.mark.parametrize("kind", [SLOTS, NAMEDTUPLE])
+def test_loads_with_fields_ignores_key_order(kind):
+    doc = '[{"a": 1, "b": 2}, {"b": 3, "a": 4}]'
+    data = RecordHdr.loads(doc, ("a", "b"), kind)
+    assert type(data[0]) is type(data[1])
+    assert (data[1].a, data[1].b) == (4, 3)
+    assert RecordHdr.to_columns(data)["a"] == array("q", [1, 4])
+
+
+def test_loads_infers_one_shape_per_key_set():
+    doc = '[{"a": 1, "b": 2}, {"b": 3, "a": 4}]'
+    data = RecordHdr.loads(json.dumps(json.loads(doc) * 4))
+    assert type(data[0]) is type(data[1])
+    assert (data[1].a, data[1].b) == (4, 3)
+
+
+def test_loads_bounds_the_inferred_shapes():
+    items = [[{f"k{i}": i}] * MIN_RECORDS for i in range(MAX_SHAPES + 10)]
+    data = RecordHdr.loads(json.dumps(items))
+    assert type(data[MAX_SHAPES - 1][0]) is not dict
+    assert all(type(i[0]) is dict for i in data[MAX_SHAPES:])
+
+
+def test_load_reads_file_objects():
+    data = RecordHdr.load(io.BytesIO(json.dumps(ITEMS * 3).encode()))
+    assert data[0].score == 0.5
+
+
+def test_loads_keeps_peak_memory_low():
+    import tracemalloc
+
+    doc = json.dumps([{"id": i, "value": i * 0.5} for i in range(20000)])
+
+    def peak(func):
+        tracemalloc.start()
+        try:
+            result = func()
+            return tracemalloc.get_traced_memory()[1], result
+        finally:
+            tracemalloc.stop()
+
+    dict_peak, _ = peak(lambda: json.loads(doc))
+    record_peak, records = peak(lambda: RecordHdr.loads(doc))
+    assert records[-1].id == 19999
+    assert record_peak < dict_peak * 0.7
+
+
+def test_to_columns_types_columns():
+    columns = RecordHdr.to_columns(ITEMS)
+    assert columns["id"] == array("q", [1, 2, 3])
+    assert columns["score"] == array("d", [0.5, 2.0, 1.25])
+    assert columns["name"] == ["a", "b", "c"]
+
+
+def test_to_columns_from_records_and_forced_types():
+    records = RecordHdr.to_records(ITEMS, _kind=NAMEDTUPLE)
+    columns = RecordHdr.to_columns(records, ("id", "score"), {"id": "i"})
+    assert columns["id"].typecode == "i"
+    assert list(columns) == ["id", "score"]
+
+    slots = RecordHdr.to_records(ITEMS)
+    assert RecordHdr.to_columns(slots)["id"] == array("q", [1, 2, 3])
+
+
+def test_to_columns_keeps_lists_for_mixed_or_huge_values():
+    items = [{"a": 1, "b": True}, {"a": 1 << 70, "b": False}, {"a": None}]
+    columns = RecordHdr.to_columns(items)
+    assert columns["a"] == [1, 1 << 70, None]
+    assert columns["b"] == [True, False, None]
+    assert RecordHdr.to_columns([], ("a",)) == {"a": []}
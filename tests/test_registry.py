@@ -0,0 +1,156 @@
+import threading
+
+import pytest
+
+from metric.registry import (
+    ITEMS,
+    PEAK_BYTES,
+    Histogram,
+    Registry,
+    bucket_bounds,
+    bucket_index,
+)
+
+
+@pytest.mark.parametrize(
+    "value", [0, 1, 3, 4, 7, 8, 9, 100, 1000, 123456789, 2**63, 2**64 - 1]
+)
+def test_bucket_bounds_contain_value(value):
+    lower, upper = bucket_bounds(bucket_index(value))
+    assert lower <= value < upper
+    assert upper - lower <= max(1, lower // 4)
+
+
+def test_bucket_index_is_monotonic():
+    indexes = [bucket_index(v) for v in range(5000)]
+    assert indexes == sorted(indexes)
+
+
+def test_empty_histogram_snapshot():
+    assert Histogram("h").snapshot() == {
+        "count": 0, "sum": 0, "min": 0, "max": 0,
+        "mean": 0.0, "p50": 0, "p95": 0, "p99": 0,
+    }
+
+
+def test_histogram_statistics():
+    h = Histogram("h")
+    for v in range(1, 1001):
+        h.record(v)
+    stats = h.snapshot()
+    assert stats["count"] == 1000
+    assert stats["sum"] == 500500
+    assert stats["min"] == 1
+    assert stats["max"] == 1000
+    assert stats["mean"] == 500.5
+    assert stats["p50"] == pytest.approx(500, rel=0.25)
+    assert stats["p95"] == pytest.approx(950, rel=0.25)
+    assert stats["p99"] == pytest.approx(990, rel=0.25)
+
+
+def test_percentile_is_clamped_to_extremes():
+    h = Histogram("h")
+    h.record(1000)
+    assert h.percentile(0.5) == 1000
+
+
+def test_histogram_reset():
+    h = Histogram("h")
+    h.record(5)
+    h.reset()
+    assert h.snapshot()["count"] == 0
+
+
+def test_histogram_is_thread_safe():
+    h = Histogram("h")
+
+    def work():
+        for _ in range(10000):
+            h.record(42)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert h.snapshot()["count"] == 40000
+
+
+def test_registry_returns_same_histogram():
+    registry = Registry()
+    assert registry.histogram("a") is registry.histogram("a")
+    assert registry.get("b") is None
+
+
+def test_registry_keeps_kinds_apart():
+    registry = Registry()
+    registry.histogram("a").record(10)
+    registry.histogram("a", ITEMS).record(3)
+    assert registry.get("a") is not registry.get("a", ITEMS)
+    assert registry.get("a", ITEMS).kind_ == ITEMS
+    assert registry.get("a", PEAK_BYTES) is None
+    assert set(registry.snapshot()) == {"a", "a.items"}
+    assert list(registry.snapshot(ITEMS)) == ["a"]
+    assert registry.copy().get("a", ITEMS).snapshot()["sum"] == 3
+
+
+def test_registry_snapshot_and_reset():
+    registry = Registry()
+    registry.histogram("a").record(10)
+    assert registry.snapshot()["a"]["count"] == 1
+    registry.reset()
+    assert registry.snapshot()["a"]["count"] == 0
+
+
+def test_histogram_copy_is_independent():
+    h = Histogram("x")
+    h.record(10)
+    c = h.copy()
+    h.record(20)
+    assert c.snapshot()["count"] == 1
+    assert c.name_ == "x"
+    assert h.snapshot()["count"] == 2
+
+
+def test_histogram_delta_holds_new_values_only():
+    h = Histogram("x")
+    h.record(10)
+    before = h.copy()
+    h.record(1000)
+    h.record(2000)
+
+    d = h.delta(before)
+    snap = d.snapshot()
+    assert snap["count"] == 2
+    assert snap["sum"] == 3000
+    assert 768 <= snap["min"] <= 1000
+    assert 2000 <= snap["max"] <= 2047
+
+
+def test_histogram_delta_after_reset_and_without_previous():
+    h = Histogram("x")
+    h.record(10)
+    h.record(20)
+    before = h.copy()
+    h.reset()
+    h.record(5)
+    assert h.delta(before).snapshot()["count"] == 1
+    assert h.delta(None).snapshot()["sum"] == 5
+    empty = h.delta(h.copy()).snapshot()
+    assert empty["count"] == 0
+    assert empty["min"] == 0
+
+
+def test_registry_copy_and_delta():
+    r = Registry()
+    r.histogram("a").record(1)
+    before = r.copy()
+    r.histogram("a").record(2)
+    r.histogram("b").record(3)
+
+    delta = r.delta(before).snapshot()
+    assert delta["a"]["count"] == 1
+    assert delta["a"]["sum"] == 2
+    assert delta["b"]["sum"] == 3
+    assert before.snapshot()["a"]["count"] == 1
+    assert "b" not in before.snapshot()
@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from cli.spillmgr import SpillMgr, _JsonReader
+
+
+def filled(payload: bytes, threshold: int, chunk: int = 7) -> SpillMgr:
+    mgr = SpillMgr(threshold)
+    for i in range(0, len(payload), chunk):
+        mgr.write(payload[i:i + chunk])
+    mgr.seal()
+    return mgr
+
+
+def test_small_output_stays_in_memory():
+    with filled(b'{"a": 1}', 1024) as mgr:
+        assert not mgr.is_spilled()
+        assert len(mgr) == 8
+        assert mgr.json() == {"a": 1}
+
+
+def test_large_output_is_spilled_and_mapped():
+    payload = json.dumps(list(range(1000))).encode()
+    with filled(payload, 64) as mgr:
+        assert mgr.is_spilled()
+        with mgr.buffer() as view:
+            assert view.tobytes() == payload
+        assert mgr.text() == payload.decode()
+        assert mgr.json() == list(range(1000))
+
+
+def test_json_is_decoded_once():
+    with filled(b'{"a": [1, 2]}', 4) as mgr:
+        assert mgr.json() is mgr.json()
+
+
+def test_buffer_is_read_only():
+    with filled(b"abc", 1024) as mgr:
+        with mgr.buffer() as view:
+            assert view.readonly
+
+
+@pytest.mark.parametrize("threshold", [1 << 20, 16])
+@pytest.mark.parametrize("chunk_size", [1, 3, 4096])
+def test_iter_items_streams_array_elements(threshold, chunk_size):
+    items = [{"id": i, "name": "héte-%d" % i} for i in range(50)]
+    items += [12345678, -1.5e3, "x", None, True, [1, [2]]]
+    payload = json.dumps(items, ensure_ascii=False).encode()
+    with filled(payload, threshold) as mgr:
+        assert list(mgr.iter_items(_chunk_size=chunk_size)) == items
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 4096])
+def test_iter_items_streams_json_lines(chunk_size):
+    docs = [{"i": i} for i in range(20)] + [42]
+    payload = "\n".join(json.dumps(d) for d in docs).encode() + b"\n"
+    with filled(payload, 32) as mgr:
+        assert list(mgr.iter_items(_chunk_size=chunk_size)) == docs
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4096])
+def test_iter_items_streams_member_array(chunk_size):
+    doc = {"kind": "List", "meta": {"n": [1, 2]}, "items": [{"a": 1}, {"b": 2}]}
+    with filled(json.dumps(doc).encode(), 16) as mgr:
+        assert list(mgr.iter_items("items", chunk_size)) == doc["items"]
+
+
+def test_iter_items_missing_member_raises():
+    with filled(b'{"items": 3}', 1024) as mgr:
+        with pytest.raises(ValueError):
+            list(mgr.iter_items("items"))
+
+
+def test_iter_items_empty_array():
+    with filled(b" [ ] ", 1024) as mgr:
+        assert list(mgr.iter_items()) == []
+
+
+def test_iter_items_unterminated_array_raises():
+    with filled(b"[1, 2", 1024) as mgr:
+        with pytest.raises(ValueError):
+            list(mgr.iter_items())
+
+
+def test_iter_items_invalid_json_raises():
+    with filled(b"[1, nope]", 1024) as mgr:
+        with pytest.raises(json.JSONDecodeError):
+            list(mgr.iter_items())
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [b"[1,,2]", b"[,1]", b"[1,]", b"[1 2]", b'{"a": 1,, "items": []}'],
+)
+def test_iter_items_rejects_bad_separators(payload):
+    with filled(payload, 1024) as mgr:
+        with pytest.raises(ValueError):
+            list(mgr.iter_items("items" if payload[:1] == b"{" else None))
+
+
+def test_iter_items_skips_large_member_in_linear_time():
+    big = [{"id": i, "name": "x" * 20} for i in range(50000)]
+    payload = json.dumps({"big": big, "items": [1, 2]}).encode()
+    calls = []
+    with filled(payload, 1 << 16) as mgr:
+        reader = _JsonReader(mgr._chunks(4096))
+        more = reader.more
+        reader.more = lambda *args: calls.append(args) or more(*args)
+        reader.seek_member("items")
+        assert list(reader.values()) == [1, 2]
+    # Every retry at least doubles the pending text.
+    assert len(calls) < 40
+
+
+def test_close_releases_content():
+    mgr = filled(b"x" * 100, 10)
+    mgr.close()
+    assert not mgr.is_spilled()
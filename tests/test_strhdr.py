@@ -1,3 +1,8 @@
+import random
+import shlex
+
+from array import array
+
 import pytest
 
 from typehdr.strhdr import StrHdr
@@ -20,7 +25,11 @@ from typehdr.strhdr import StrHdr
         ('a"', False),  # missing opening quote
         ("`a`", False),  # unsupported quote type
         (" ", False),  # single char, not a quote
-        ('I am the "blue" spectrum', True),
+        ('I am the "blue" spectrum', False),  # quotes inside only
+        ('a"b"c', False),  # quoted middle, not wrapped
+        ('"a"b"', True),  # wrapped, inner quotes ignored
+        ('"', False),  # a lone quote does not wrap anything
+        (None, False),
     ],
 )
 
@@ -55,3 +64,72 @@ def test_str_to_list_returns_list_type() -> None:
     result = StrHdr.str_to_list("a b")
     assert isinstance(result, list)
     assert all(isinstance(x, str) for x in result)
+
+@pytest.mark.parametrize(
+    "input_s",
+    [
+        "",
+        "   ",
+        "echo hello",
+        'echo "hello world"',
+        "cat 'my file.json' -n",
+        'a"b c"d',
+        'x "" y',
+        "'a\\b'",
+        '"a\\nb"',
+        'echo "say \\"hi\\"" and \\\\',
+        "a\\ b",
+        "it\\'s",
+        'echo \'{"count": 3}\'',
+        "a\tb\nc",
+    ],
+)
+def test_tokenize_matches_shlex(input_s: str) -> None:
+    assert StrHdr.tokenize(input_s) == tuple(shlex.split(input_s))
+
+@pytest.mark.parametrize("input_s", ['echo "open', "echo 'open", "echo \\"])
+def test_tokenize_raises_on_unterminated_input(input_s: str) -> None:
+    with pytest.raises(ValueError):
+        StrHdr.tokenize(input_s)
+
+def test_tokenize_caches_parsed_commands() -> None:
+    StrHdr.tokenize.cache_clear()
+    first = StrHdr.tokenize("git rev-parse HEAD")
+    second = StrHdr.tokenize("git rev-parse HEAD")
+    assert first is second
+    assert StrHdr.tokenize.cache_info().hits == 1
+
+@pytest.mark.parametrize(
+    "tokens",
+    [
+        [],
+        ["'a'", "b", '"c"', 'a"b"c', "'", '""'],
+        ["x" * 10000, '"' + "y" * 10000 + '"'],
+    ],
+)
+def test_classify_tokens(tokens):
+    flags = StrHdr.classify(iter(tokens))
+    assert isinstance(flags, bytearray)
+    assert list(flags) == [StrHdr.detect_embedded_str(t) for t in tokens]
+
+def test_classify_buffer_matches_split_tokens():
+    rng = random.Random(7)
+    alphabet = "ab'\" \t\n"
+    text = "".join(rng.choice(alphabet) for _ in range(20000))
+    expected = [StrHdr.detect_embedded_str(t) for t in text.split()]
+    assert list(StrHdr.classify(text)) == expected
+    assert list(StrHdr.classify(text.encode())) == expected
+
+def test_embedded_spans_locate_quoted_tokens():
+    text = "run 'a b' \"c\"\n'd' e\"f\" \"\" '"
+    spans = StrHdr.embedded_spans(text)
+    assert isinstance(spans, array)
+    found = [text[spans[i]:spans[i + 1]] for i in range(0, len(spans), 2)]
+    assert found == ['"c"', "'d'", '""']
+    assert StrHdr.embedded_spans(text.encode()).tolist() == spans.tolist()
+
+def test_embedded_spans_match_classify():
+    rng = random.Random(11)
+    text = "".join(rng.choice("ab'\" \n") for _ in range(20000))
+    spans = StrHdr.embedded_spans(text)
+    assert len(spans) // 2 == sum(StrHdr.classify(text))
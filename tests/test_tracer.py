@@ -0,0 +1,197 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from metric.tracer import TRACER, Tracer, span
+
+
+@pytest.fixture(name="_tracer")
+def tracer_fixture():
+    return Tracer()
+
+
+def by_name(tracer):
+    return {event[0]: event for event in tracer.events()}
+
+
+def test_context_manager_records_nested_spans(_tracer):
+    with span("outer", _tracer):
+        with span("inner", _tracer):
+            pass
+
+    events = by_name(_tracer)
+    outer, inner = events["outer"], events["inner"]
+    assert outer[2] == 0
+    assert inner[2] == outer[1]
+    assert outer[3] <= inner[3]
+    assert inner[3] + inner[4] <= outer[3] + outer[4]
+
+
+def test_decorator_uses_qualified_name(_tracer):
+    @span(_tracer=_tracer)
+    def work():
+        with span("step", _tracer):
+            return 42
+
+    assert work() == 42
+    events = by_name(_tracer)
+    name = f"{__name__}.test_decorator_uses_qualified_name.<locals>.work"
+    assert events["step"][2] == events[name][1]
+
+
+def test_bare_decorator_records_into_default_tracer():
+    TRACER.clear()
+
+    @span
+    def work():
+        return 1
+
+    work()
+    assert TRACER.events()[-1][0].endswith("<locals>.work")
+    TRACER.clear()
+
+
+def test_named_decorator(_tracer):
+    @span("custom", _tracer)
+    def work():
+        pass
+
+    work()
+    work()
+    assert [event[0] for event in _tracer.events()] == ["custom", "custom"]
+
+
+def test_spans_follow_asyncio_tasks(_tracer):
+    @span("child", _tracer)
+    async def child():
+        await asyncio.sleep(0.01)
+
+    async def main():
+        with span("parent", _tracer):
+            await asyncio.gather(child(), child())
+
+    asyncio.run(main())
+    parent = by_name(_tracer)["parent"]
+    children = [e for e in _tracer.events() if e[0] == "child"]
+    assert len(children) == 2
+    assert all(e[2] == parent[1] for e in children)
+    assert all(e[4] >= 5_000_000 for e in children)
+
+
+def test_propagate_links_spans_across_threads(_tracer):
+    def job():
+        with span("job", _tracer):
+            pass
+
+    with span("spawn", _tracer):
+        linked = threading.Thread(target=_tracer.propagate(job))
+        unlinked = threading.Thread(target=job)
+        linked.start()
+        unlinked.start()
+        linked.join()
+        unlinked.join()
+
+    spawn = by_name(_tracer)["spawn"]
+    jobs = sorted(e[2] for e in _tracer.events() if e[0] == "job")
+    assert jobs == [0, spawn[1]]
+    assert all(e[5] != spawn[5] for e in _tracer.events() if e[0] == "job")
+
+
+def test_ring_buffer_is_bounded():
+    tracer = Tracer(_capacity=3)
+    for i in range(10):
+        with span(str(i), tracer):
+            pass
+    assert [e[0] for e in tracer.events()] == ["7", "8", "9"]
+
+
+def test_disabled_tracer_records_nothing(_tracer):
+    _tracer.disable()
+    with span("ignored", _tracer):
+        pass
+    assert _tracer.events() == []
+    _tracer.enable()
+    assert _tracer.is_enabled()
+
+
+def test_disable_drops_open_spans(_tracer):
+    with span("outer", _tracer):
+        with span("inner", _tracer):
+            pass
+        _tracer.disable()
+    assert [e[0] for e in _tracer.events()] == ["inner"]
+
+
+def test_span_is_recorded_on_exception(_tracer):
+    with pytest.raises(KeyError):
+        with span("failing", _tracer):
+            raise KeyError("x")
+    assert by_name(_tracer)["failing"][2] == 0
+
+
+def test_export_chrome(_tracer, tmp_path):
+    with span("outer", _tracer):
+        with span("inner", _tracer):
+            pass
+
+    path = tmp_path / "trace.json"
+    _tracer.export_chrome(str(path))
+    trace = json.loads(path.read_text())
+
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert [e["name"] for e in complete] == ["inner", "outer"]
+    inner, outer = complete
+    assert inner["args"]["parent"] == outer["args"]["id"]
+    assert outer["ts"] <= inner["ts"]
+    assert outer["dur"] >= inner["dur"]
+    assert {"pid", "tid"} <= set(inner)
+    assert any(e["ph"] == "M" for e in trace["traceEvents"])
+
+
+def assert_nested(events):
+    """Check that the complete events of every tid nest, as viewers need."""
+    by_tid = {}
+    for event in events:
+        by_tid.setdefault(event["tid"], []).append(event)
+    for tid_events in by_tid.values():
+        open_ends = []
+        for event in sorted(tid_events, key=lambda e: (e["ts"], -e["dur"])):
+            end = event["ts"] + event["dur"]
+            while open_ends and open_ends[-1] <= event["ts"]:
+                open_ends.pop()
+            assert not open_ends or end <= open_ends[-1], event["name"]
+            open_ends.append(end)
+
+
+def test_to_chrome_puts_overlapping_tasks_on_nesting_tracks(_tracer):
+    async def job(name, delay):
+        with span(name, _tracer):
+            with span(f"{name}.step", _tracer):
+                await asyncio.sleep(delay)
+
+    async def main():
+        with span("main", _tracer):
+            await asyncio.gather(job("job0", 0.01), job("job1", 0.02))
+
+    asyncio.run(main())
+    trace = _tracer.to_chrome()["traceEvents"]
+    complete = {e["name"]: e for e in trace if e["ph"] == "X"}
+    assert_nested(complete.values())
+
+    assert complete["job0"]["tid"] != complete["job1"]["tid"]
+    assert complete["job0"]["tid"] == complete["main"]["tid"]
+    assert complete["job1.step"]["tid"] == complete["job1"]["tid"]
+    names = {e["tid"]: e["args"]["name"] for e in trace if e["ph"] == "M"}
+    assert names[complete["job1"]["tid"]].endswith(" #1")
+
+
+def test_to_chrome_keeps_sequential_spans_on_the_thread(_tracer):
+    for name in ("a", "b"):
+        with span(name, _tracer):
+            with span(f"{name}.inner", _tracer):
+                pass
+    tids = {e["tid"] for e in _tracer.to_chrome()["traceEvents"]
+            if e["ph"] == "X"}
+    assert tids == {threading.get_native_id()}
@@ -0,0 +1,115 @@
+import signal
+import subprocess
+
+import pytest
+
+from cli.clihdr import runc
+from cli.usagemgr import USAGE_MGR, Usage, UsageMgr
+
+
+def usage(wall=1.0, maxrss=100, returncode=0):
+    return Usage(wall, 0.5, 0.25, maxrss, 10, 2, returncode)
+
+
+def test_record_aggregates_per_command():
+    mgr = UsageMgr()
+    mgr.record("git", usage(wall=1.0, maxrss=100))
+    mgr.record("git", usage(wall=2.0, maxrss=50, returncode=1))
+
+    stats = mgr.get("git")
+    assert stats["calls"] == 2
+    assert stats["errors"] == 1
+    assert stats["wall"] == 3.0
+    assert stats["utime"] == 1.0
+    assert stats["stime"] == 0.5
+    assert stats["maxrss"] == 100
+    assert stats["out_bytes"] == 20
+    assert stats["err_bytes"] == 4
+
+
+def test_get_unknown_command_returns_none():
+    assert UsageMgr().get("nope") is None
+
+
+def test_top_sorts_on_key():
+    mgr = UsageMgr()
+    mgr.record("fast", usage(wall=0.1, maxrss=900))
+    mgr.record("slow", usage(wall=5.0, maxrss=10))
+    assert [name for name, _ in mgr.top("wall")] == ["slow", "fast"]
+    assert [name for name, _ in mgr.top("maxrss", 1)] == ["fast"]
+
+
+def test_top_unknown_key_raises():
+    with pytest.raises(ValueError):
+        UsageMgr().top("nope")
+
+
+def test_reset_and_snapshot():
+    mgr = UsageMgr()
+    mgr.record("ls", usage())
+    assert list(mgr.snapshot()) == ["ls"]
+    mgr.reset()
+    assert mgr.snapshot() == {}
+
+
+def test_runc_records_into_given_registry():
+    mgr = UsageMgr()
+    res = runc(["sh", "-c", "echo '{\"a\": 1}'; echo warn >&2"], _usage=mgr)
+    assert res == {"a": 1}
+
+    stats = mgr.get("sh")
+    assert stats["calls"] == 1
+    assert stats["out_bytes"] == len('{"a": 1}\n')
+    assert stats["err_bytes"] == len("warn\n")
+    assert stats["wall"] > 0
+    assert stats["maxrss"] > 0
+
+
+def test_runc_records_cpu_time():
+    mgr = UsageMgr()
+    runc(["sh", "-c", "i=0; while [ $i -lt 20000 ]; do i=$((i+1)); done; echo 1"],
+         _usage=mgr)
+    stats = mgr.get("sh")
+    assert stats["utime"] + stats["stime"] > 0
+
+
+def test_runc_records_failures():
+    mgr = UsageMgr()
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        runc("sh -c 'echo boom >&2; exit 9'", _usage=mgr)
+    assert excinfo.value.returncode == 9
+    assert excinfo.value.stderr == "boom\n"
+    assert mgr.get("sh")["errors"] == 1
+
+
+def test_runc_records_into_default_registry_when_enabled():
+    USAGE_MGR.reset()
+    USAGE_MGR.enable()
+    try:
+        runc(["echo", "1"])
+        runc("echo 2")
+    finally:
+        USAGE_MGR.disable()
+    runc(["echo", "3"])
+    assert USAGE_MGR.get("echo")["calls"] == 2
+    USAGE_MGR.reset()
+
+
+@pytest.mark.parametrize(
+    "cmd", ['printf "a\\r\\nb\\rc"', "printf 'caf\\303\\251'"]
+)
+def test_runc_output_does_not_depend_on_recording(cmd):
+    assert runc(cmd, _usage=UsageMgr()) == runc(cmd)
+
+
+def test_runc_kills_child_when_reading_fails(monkeypatch):
+    procs = []
+
+    def fail(proc):
+        procs.append(proc)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr("cli.clihdr._read_pipes", fail)
+    with pytest.raises(KeyboardInterrupt):
+        runc(["sleep", "5"], _usage=UsageMgr())
+    assert procs[0].returncode == -signal.SIGKILL
@@ -0,0 +1,126 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import xpylib
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+
+# Cold-start budgets in milliseconds, about three times the import times
+# measured by benchmarks/bench_import.py, to absorb slow CI machines.
+BUDGETS_MS = {
+    "": 5,
+    "FsMgr": 10,
+    "JsonMgr": 40,
+    "ConfMgr": 40,
+    "runc": 100,
+    "measure": 60,
+}
+
+
+def run(code, *options):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+
+
+def loaded_modules(code):
+    """Return the modules loaded by ``code`` on top of a bare interpreter."""
+    dump = "import json, sys; print(json.dumps(sorted(sys.modules)))"
+    before = set(json.loads(run(dump).stdout))
+    after = set(json.loads(run(f"{code}; {dump}").stdout))
+    return after - before
+
+
+def import_time_ms(code):
+    """Return the cumulative import time of ``code``, startup excluded."""
+    startup = set(top_level_imports(run("pass", "-X", "importtime")))
+    times = top_level_imports(run(code, "-X", "importtime"))
+    return sum(
+        itime for iname, itime in times.items() if iname not in startup
+    ) / 1e3
+
+
+def top_level_imports(proc):
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_attributes_resolve_to_their_modules():
+    from cli.clihdr import runc
+    from config.confmgr import ConfMgr
+    from fio.jsonmgr import JsonMgr
+    from fs.fsmgr import FsMgr
+    from metric.observer import measure
+
+    assert xpylib.FsMgr is FsMgr
+    assert xpylib.JsonMgr is JsonMgr
+    assert xpylib.ConfMgr is ConfMgr
+    assert xpylib.runc is runc
+    assert xpylib.measure is measure
+
+
+def test_resolved_attribute_is_cached():
+    xpylib.FsMgr
+    assert "FsMgr" in vars(xpylib)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError, match="no attribute 'nope'"):
+        xpylib.nope
+
+
+def test_dir_and_all():
+    assert set(xpylib.__all__) == {
+        "FsMgr",
+        "JsonMgr",
+        "ConfMgr",
+        "runc",
+        "measure",
+    }
+    assert set(xpylib.__all__) <= set(dir(xpylib))
+
+
+def test_import_loads_nothing():
+    assert loaded_modules("import xpylib") == {"xpylib"}
+
+
+def test_attribute_loads_only_its_module():
+    modules = loaded_modules("import xpylib; xpylib.FsMgr")
+    assert {"fs", "fs.fsmgr"} <= modules
+    assert not any(imodule.startswith("cli") for imodule in modules)
+    assert not any(imodule.startswith("metric") for imodule in modules)
+
+
+@pytest.mark.parametrize(
+    "name, heavy",
+    [
+        ("JsonMgr", {"dataclasses", "inspect"}),
+        ("runc", {"asyncio", "concurrent.futures"}),
+        ("measure", {"tracemalloc"}),
+    ],
+)
+def test_heavy_modules_are_loaded_on_use(name, heavy):
+    assert not heavy & loaded_modules(f"import xpylib; xpylib.{name}")
+
+
+@pytest.mark.parametrize("name", list(BUDGETS_MS))
+def test_import_time_budget(name):
+    code = "import xpylib" + (f"; xpylib.{name}" if name else "")
+    # The best of a few runs filters out the noise of the machine.
+    elapsed = min(import_time_ms(code) for _ in range(3))
+    assert elapsed <= BUDGETS_MS[name], f"{code}: {elapsed:.1f} ms"